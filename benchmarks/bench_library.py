@@ -0,0 +1,241 @@
+"""End-to-end library benchmark: scan, index, link, summary, load, open and reopen at several sizes.
+
+Usage:
+    python benchmarks/bench_library.py [--sizes 100,1000,10000] [--work-dir DIR]
+                                       [--save results/NAME.json] [--compare results/OLD.json]
+
+Libraries are generated once per size (synthetic PDFs, see library_generator.py) and reused.
+Semantic Scholar is replaced by a local stub serving the same manifest, so runs are
+repeatable and need no network. Each stage reports wall time and peak memory; with
+--compare, stages that got slower than the threshold are listed and the exit code is 1.
+A run that does not index every paper also exits with 1.
+"""
+import os
+import sys
+import gc
+import json
+import time
+import shutil
+import argparse
+import platform
+import threading
+import tempfile
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+
+from library_generator import generate_library  # noqa: E402
+from stub_semantic_scholar import StubSemanticScholar  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Stages faster than this are too noisy to call regressions
+MIN_COMPARABLE_SECONDS = 0.05
+OPEN_SAMPLES = 50
+
+
+def _peak_rss_mb(who):
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class StageRecorder:
+    def __init__(self, trace_memory):
+        self.trace_memory = trace_memory
+        self.results = {}
+
+    def run(self, name, fn):
+        gc.collect()
+        if self.trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        value = fn()
+        elapsed = time.perf_counter() - started
+        result = {"seconds": round(elapsed, 4)}
+        if self.trace_memory:
+            result["python_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+            tracemalloc.stop()
+        result["process_peak_rss_mb"] = _peak_rss_mb(resource.RUSAGE_SELF) if resource else None
+        self.results[name] = result
+        print(f"  {name:<8} {elapsed:9.3f}s" + (f"  py peak {result['python_peak_mb']:.1f} MB" if self.trace_memory else ""), flush=True)
+        return value
+
+
+def _reset_library_state(library_dir):
+    """Removes index data left by a previous run so every run starts cold, and backdates the
+    PDFs so the scan indexes them right away instead of waiting for them to settle."""
+    for name in ("papers_index.db", "papers_index.db-wal", "papers_index.db-shm"):
+        path = os.path.join(library_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+    shutil.rmtree(os.path.join(library_dir, ".paper_reader"), ignore_errors=True)
+    old = time.time() - 3600
+    for name in os.listdir(library_dir):
+        if name.endswith((".json.journal",)):
+            os.remove(os.path.join(library_dir, name))
+        elif name.lower().endswith(".pdf"):
+            os.utime(os.path.join(library_dir, name), (old, old))
+
+
+def _make_api(manager):
+    """An Api bound to an existing IndexManager, without a window or config lookups."""
+    from main import Api
+    from annotation_store import AnnotationStore
+    from file_server import LocalFileServer
+    from document_cache import DocumentCache
+    api = Api.__new__(Api)
+    api._window = None
+    api.current_pdf_path = None
+    api._library_version = 0
+    api._event_lock = threading.Lock()
+    api._queued_events = []
+    api._flush_timer = None
+    api._snapshot = None
+    api._load_lock = threading.Lock()
+    api._manager_ready = threading.Event()
+    api.index_manager = manager
+    api.file_server = LocalFileServer()
+    api.annotations = AnnotationStore()
+    api.documents = DocumentCache(api._prepare_document)
+    return api
+
+
+def bench_size(size, args, cache_root):
+    from index_manager import IndexManager
+
+    library_dir = os.path.join(args.work_dir, f"library_{size}")
+    print(f"Library of {size} papers ({library_dir})", flush=True)
+    started = time.perf_counter()
+    manifest = generate_library(library_dir, size, overlap=args.overlap, korean_ratio=args.korean_ratio)
+    print(f"  generated/reused in {time.perf_counter() - started:.1f}s", flush=True)
+    _reset_library_state(library_dir)
+
+    stub = StubSemanticScholar(manifest, latency_ms=args.stub_latency_ms)
+    options = {
+        "semantic_scholar_api_url": stub.url,
+        "semantic_scholar_requests_per_second": 10000,
+        "api_workers": args.api_workers,
+        "indexing_workers": args.workers,
+        # Fresh caches per size, so every run measures real work
+        "response_cache_path": os.path.join(cache_root, f"responses_{size}.sqlite"),
+        "thumbnail_cache_path": os.path.join(cache_root, f"thumbnails_{size}")
+    }
+    recorder = StageRecorder(args.memory)
+    try:
+        manager = IndexManager(library_dir, autostart=False, options=options)
+        recorder.run("scan", manager.scan_now)
+        recorder.run("index", manager.wait_until_idle)
+        recorder.run("rescan", manager.scan_now)
+        recorder.run("link", manager._update_network_links)
+        recorder.run("summary", manager.get_all_papers_summary)
+        manager.close()
+
+        from library_snapshot import load_snapshot
+        recorder.run("snapshot", lambda: load_snapshot(library_dir))
+        manager = recorder.run("load", lambda: IndexManager(library_dir, autostart=False, options=options))
+        api = _make_api(manager)
+        sampled = manifest["papers"][::max(1, len(manifest["papers"]) // OPEN_SAMPLES)][:OPEN_SAMPLES]
+        paths = [os.path.join(library_dir, p["filename"]) for p in sampled]
+        recorder.run("open", lambda: [api.open_specific_pdf(path) for path in paths])
+        recorder.results["open"]["per_open_ms"] = round(recorder.results["open"]["seconds"] * 1000 / len(paths), 2)
+        # Going back to recently opened papers; the later ones are still in the document cache
+        recorder.run("reopen", lambda: [api.open_specific_pdf(path) for path in reversed(paths)])
+        recorder.results["reopen"]["per_open_ms"] = round(recorder.results["reopen"]["seconds"] * 1000 / len(paths), 2)
+        manager.wait_until_idle()
+        links = sum(len(e.get("cites", [])) for e in manager.index_data.values())
+        ready = sum(1 for e in manager.index_data.values() if e.get("status") == "ready")
+        manager.close()
+        api.annotations.close()
+        api.file_server.shutdown()
+    finally:
+        stub.shutdown()
+
+    recorder.results["_library"] = {"papers": size, "ready": ready, "links": links, "api_requests": stub.requests,
+                                   "worker_peak_rss_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None}
+    print(f"  {ready}/{size} ready, {links} citation links, {stub.requests} API requests", flush=True)
+    return recorder.results
+
+
+def compare(current, baseline, threshold):
+    """Returns a list of (size, stage, old_seconds, new_seconds) that got slower than threshold."""
+    regressions = []
+    print(f"\nComparison with {baseline.get('label')} ({baseline.get('timestamp')}):")
+    for size, stages in current["sizes"].items():
+        old_stages = baseline.get("sizes", {}).get(size, {})
+        for stage, result in stages.items():
+            old = old_stages.get(stage)
+            if stage.startswith("_") or not old:
+                continue
+            ratio = result["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+            flag = ""
+            if ratio > 1 + threshold and max(result["seconds"], old["seconds"]) >= MIN_COMPARABLE_SECONDS:
+                flag = "  <-- REGRESSION"
+                regressions.append((size, stage, old["seconds"], result["seconds"]))
+            print(f"  {size:>6} {stage:<8} {old['seconds']:9.3f}s -> {result['seconds']:9.3f}s  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000,10000", help="Comma-separated library sizes")
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "paper_reader_bench"),
+                        help="Where generated libraries are kept between runs")
+    parser.add_argument("--overlap", type=float, default=0.2, help="Share of references citing other library papers")
+    parser.add_argument("--korean-ratio", type=float, default=0.3)
+    parser.add_argument("--workers", type=int, help="Extraction worker processes")
+    parser.add_argument("--api-workers", type=int, default=8)
+    parser.add_argument("--stub-latency-ms", type=float, default=0, help="Artificial latency per stub API request")
+    parser.add_argument("--memory", action="store_true", help="Trace Python allocations per stage (slows stages down)")
+    parser.add_argument("--label", default=None, help="Name stored with the results")
+    parser.add_argument("--save", help="Write results as JSON to this path")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before flagging (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    os.makedirs(args.work_dir, exist_ok=True)
+    cache_root = tempfile.mkdtemp(prefix="paper_reader_bench_cache_")
+    results = {
+        "label": args.label or time.strftime("%Y%m%d-%H%M%S"),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": {}
+    }
+    try:
+        for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+            results["sizes"][str(size)] = bench_size(size, args, cache_root)
+            ready = results["sizes"][str(size)]["_library"]["ready"]
+            if ready != size:
+                # The stage timings would not measure indexing the whole library
+                print(f"\nFAILED: only {ready} of {size} papers were indexed; results are not saved")
+                return 1
+    finally:
+        shutil.rmtree(cache_root, ignore_errors=True)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) slower than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()
+    sys.exit(main())
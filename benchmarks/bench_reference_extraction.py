@@ -0,0 +1,102 @@
+"""Throughput and accuracy of local reference extraction on a synthetic corpus.
+
+Usage: python benchmarks/bench_reference_extraction.py [--papers 40] [--out DIR]
+
+Compares the layout-based extractor (reference_extractor) with the text-regex locator it
+replaced, on papers with known reference lists: numbered/unnumbered, English/Korean, long
+reference lists and back matter after the references.
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import fitz  # noqa: E402
+from extraction import locate_reference_section, parse_references  # noqa: E402
+from reference_extractor import extract_references  # noqa: E402
+from synthetic import make_paper_pdf  # noqa: E402
+
+
+def _normalize(text):
+    return re.sub(r'[\s\-]+', '', text).lower()
+
+
+def build_corpus(out_dir, papers):
+    corpus = []
+    for i in range(papers):
+        variant = {
+            "numbered": i % 4 != 3,
+            "korean": i % 3 == 1,
+            "back_matter": i % 5 == 2,
+            "reference_count": 20 + (i * 17) % 160,  # some lists are longer than the old 80 cap
+            "body_pages": 4 + i % 10
+        }
+        path = os.path.join(out_dir, f"paper_{i:03d}.pdf")
+        corpus.append((path, variant, make_paper_pdf(path, seed=i, **variant)))
+    return corpus
+
+
+def legacy_extract(doc):
+    page_texts = [page.get_text() for page in doc]
+    return parse_references(page_texts, locate_reference_section(page_texts))[:80]
+
+
+def layout_extract(doc):
+    page_texts = [page.get_text() for page in doc]
+    return extract_references(doc, page_texts)[1]
+
+
+def score(expected, extracted):
+    expected_set = {_normalize(r) for r in expected}
+    extracted_norm = [_normalize(r["text"]) for r in extracted]
+    correct = sum(1 for r in extracted_norm if r in expected_set)
+    precision = correct / len(extracted_norm) if extracted_norm else 0.0
+    recall = correct / len(expected_set) if expected_set else 1.0
+    return precision, recall
+
+
+def run(corpus, extractor):
+    total_pages = 0
+    precisions, recalls = [], []
+    started = time.perf_counter()
+    for path, _variant, expected in corpus:
+        doc = fitz.open(path)
+        total_pages += len(doc)
+        extracted = extractor(doc)
+        doc.close()
+        p, r = score(expected, extracted)
+        precisions.append(p)
+        recalls.append(r)
+    elapsed = time.perf_counter() - started
+    return {
+        "seconds": elapsed,
+        "papers_per_second": len(corpus) / elapsed if elapsed else 0,
+        "pages_per_second": total_pages / elapsed if elapsed else 0,
+        "precision": sum(precisions) / len(precisions),
+        "recall": sum(recalls) / len(recalls)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--papers", type=int, default=40)
+    parser.add_argument("--out", help="Directory for the generated corpus (default: a temp dir)")
+    args = parser.parse_args()
+
+    out_dir = args.out or tempfile.mkdtemp(prefix="paper_reader_refs_")
+    print(f"Generating {args.papers} synthetic papers in {out_dir}...")
+    corpus = build_corpus(out_dir, args.papers)
+
+    print(f"{'extractor':<10} {'papers/s':>9} {'pages/s':>9} {'precision':>10} {'recall':>8}")
+    for name, extractor in (("legacy", legacy_extract), ("layout", layout_extract)):
+        result = run(corpus, extractor)
+        print(f"{name:<10} {result['papers_per_second']:>9.1f} {result['pages_per_second']:>9.1f} "
+              f"{result['precision']:>10.3f} {result['recall']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import os
+import json
+import random
+from synthetic import KOREAN_WORDS, SURNAMES, WORDS, make_paper_pdf, random_title
+
+# Synthetic libraries: N papers (English and Korean) whose reference lists cite each other
+# with a controlled overlap. The manifest is what the stub Semantic Scholar server serves.
+
+MANIFEST = "manifest.json"
+
+
+def _paper_record(rng, paper_id, korean, index):
+    words = KOREAN_WORDS if korean else WORDS
+    return {
+        "paperId": paper_id,
+        # The index keeps titles (and file names) unique across large libraries
+        "title": f"{random_title(rng, words, (4, 8))} {index}",
+        "authors": [{"name": f"{rng.choice(SURNAMES)} {rng.choice('ABCDEFGHJK')}."} for _ in range(rng.randint(1, 4))],
+        "year": rng.randint(1990, 2024),
+        "abstract": " ".join(rng.choice(words) for _ in range(40))
+    }
+
+
+def _reference_text(record):
+    authors = ", ".join(a["name"] for a in record["authors"])
+    return f"{authors} ({record['year']}). {record['title']}. Journal of {record['title'].split()[0]}."
+
+
+def generate_library(out_dir, count, overlap=0.2, references_per_paper=30, korean_ratio=0.3, body_pages=2, seed=0,
+                     arxiv_ratio=0.5):
+    """Creates (or reuses) a library of `count` PDFs in out_dir and returns its manifest.
+
+    overlap is the fraction of each paper's references that point at other papers in the
+    library, which is what produces Cites / Cited By links. arxiv_ratio of the (non-Korean)
+    papers carry an arXiv id on their first page, so they are looked up without a search.
+    """
+    params = {"count": count, "overlap": overlap, "references_per_paper": references_per_paper,
+              "korean_ratio": korean_ratio, "body_pages": body_pages, "seed": seed, "arxiv_ratio": arxiv_ratio}
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("params") == params:
+            return manifest
+
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    papers = []
+    for i in range(count):
+        korean = rng.random() < korean_ratio
+        record = _paper_record(rng, f"bench{i:06d}", korean, i)
+        record["filename"] = f"{record['title']}.pdf"
+        record["korean"] = korean
+        if not korean and rng.random() < arxiv_ratio:
+            record["externalIds"] = {"ArXiv": f"{rng.randint(15, 24)}{rng.randint(1, 12):02d}.{i:05d}"}
+        papers.append(record)
+
+    local_refs = min(count - 1, round(references_per_paper * overlap))
+    external = {}
+    for i, paper in enumerate(papers):
+        cited = [j for j in rng.sample(range(count), min(count, local_refs + 1)) if j != i][:local_refs]
+        refs = [papers[j]["paperId"] for j in cited]
+        for k in range(references_per_paper - len(refs)):
+            ext = _paper_record(rng, f"ext{i:06d}_{k:03d}", False, f"x{i}.{k}")
+            external[ext["paperId"]] = ext
+            refs.append(ext["paperId"])
+        rng.shuffle(refs)
+        paper["references"] = refs
+
+    by_id = dict(external, **{p["paperId"]: p for p in papers})
+    for i, paper in enumerate(papers):
+        make_paper_pdf(
+            os.path.join(out_dir, paper["filename"]), seed=seed * 100003 + i, body_pages=body_pages, korean=paper["korean"],
+            title=paper["title"], references=[_reference_text(by_id[ref]) for ref in paper["references"]],
+            identifier=f"arXiv:{paper['externalIds']['ArXiv']}v1" if "externalIds" in paper else None
+        )
+
+    manifest = {"params": params, "papers": papers, "external": list(external.values())}
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    return manifest
@@ -0,0 +1,152 @@
+import os
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+# A local stand-in for the Semantic Scholar Graph API, answering from a library manifest.
+# Point the app at it with the `semantic_scholar_api_url` setting.
+
+# Same limits as the real API
+BATCH_MAX_IDS = 500
+BATCH_REFERENCE_LIMIT = 9999
+
+
+class StubSemanticScholar:
+    """Serves /paper/search, /paper/{id}/references (with offset/limit paging) and
+    POST /paper/batch (by paper id or ARXIV:/DOI: id) from a manifest, optionally with
+    artificial latency."""
+
+    def __init__(self, manifest, latency_ms=0, host="127.0.0.1", port=0):
+        self.latency = latency_ms / 1000
+        self.records = {}
+        for paper in manifest["papers"] + manifest.get("external", []):
+            self.records[paper["paperId"]] = paper
+            for kind, value in (paper.get("externalIds") or {}).items():
+                # Batch lookups also accept "ARXIV:2101.00042" / "DOI:10.1000/xyz"
+                self.records[f"{kind.upper()}:{value}"] = paper
+        # The app searches by file name stem (see extraction.guess_title)
+        self.by_query = {}
+        for paper in manifest["papers"]:
+            self.by_query[_normalize(os.path.splitext(paper["filename"])[0])] = paper
+            self.by_query.setdefault(_normalize(paper["title"]), paper)
+        self.requests = 0
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class _Handler(_StubHandler):
+            server_stub = stub
+
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/graph/v1"
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def public(self, paper_id, fields):
+        """The record as the API returns it. Nested "references.x" fields embed the reference list."""
+        record = self.records.get(paper_id)
+        if record is None:
+            return None
+        out = {"paperId": record["paperId"]}
+        nested = []
+        for field in fields:
+            if field.startswith("references."):
+                nested.append(field.split(".", 1)[1])
+            elif field in record and field != "references":
+                out[field] = record[field]
+        if nested:
+            refs = record.get("references", [])[:BATCH_REFERENCE_LIMIT]
+            out["references"] = [self.public(ref, nested) for ref in refs]
+        return out
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _normalize(text):
+    return " ".join(text.lower().split())
+
+
+def _fields(query):
+    return [f for f in (query.get("fields", [""])[0]).split(",") if f]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server_stub = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        stub = self.server_stub
+        stub.count_request()
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        parts = [unquote(p) for p in parsed.path.strip('/').split('/')]
+        fields = _fields(query)
+
+        if parts[-2:] == ["paper", "search"]:
+            paper = stub.by_query.get(_normalize(query.get("query", [""])[0]))
+            limit = int(query.get("limit", ["10"])[0])
+            data = [stub.public(paper["paperId"], fields)] if paper and limit > 0 else []
+            self._send_json(200, {"total": len(data), "offset": 0, "data": data})
+            return
+
+        if len(parts) >= 3 and parts[-1] == "references" and parts[-3] == "paper":
+            record = stub.records.get(parts[-2])
+            if record is None:
+                self._send_json(404, {"error": "Paper not found"})
+                return
+            offset = int(query.get("offset", ["0"])[0])
+            limit = int(query.get("limit", ["100"])[0])
+            refs = record.get("references", [])
+            page = refs[offset:offset + limit]
+            payload = {"offset": offset, "data": [{"citedPaper": stub.public(ref, fields)} for ref in page]}
+            if offset + limit < len(refs):
+                payload["next"] = offset + limit
+            self._send_json(200, payload)
+            return
+
+        self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        stub = self.server_stub
+        stub.count_request()
+        parsed = urlparse(self.path)
+        if not parsed.path.rstrip('/').endswith("/paper/batch"):
+            self._send_json(404, {"error": "Not found"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            ids = json.loads(self.rfile.read(length) or b"{}").get("ids", [])
+        except ValueError:
+            self._send_json(400, {"error": "Invalid JSON"})
+            return
+        if len(ids) > BATCH_MAX_IDS:
+            self._send_json(400, {"error": f"At most {BATCH_MAX_IDS} ids per request"})
+            return
+        fields = _fields(parse_qs(parsed.query))
+        self._send_json(200, [stub.public(paper_id, fields) for paper_id in ids])
@@ -0,0 +1,115 @@
+import os
+import random
+import textwrap
+import fitz  # PyMuPDF
+
+# Synthetic paper PDFs with a known reference list, used as ground truth by the benchmarks.
+
+WORDS = ("learning model network analysis system data method study neural graph retrieval "
+         "language attention efficient robust adaptive semantic document citation evaluation").split()
+SURNAMES = ["Kim", "Lee", "Park", "Choi", "Smith", "Jones", "Garcia", "Chen", "Wang", "Müller"]
+KOREAN_WORDS = "연구 분석 시스템 데이터 방법 학습 모델 문서 인용 평가".split()
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+MARGIN = 72
+LINE_HEIGHT = 13
+WRAP = 90
+
+
+def random_title(rng, words=WORDS, length=(5, 10)):
+    return " ".join(rng.choice(words) for _ in range(rng.randint(*length))).capitalize()
+
+
+def random_reference(rng, korean=False):
+    authors = ", ".join(f"{rng.choice(SURNAMES)}, {rng.choice('ABCDEFGHJK')}." for _ in range(rng.randint(1, 4)))
+    title = random_title(rng, KOREAN_WORDS if korean and rng.random() < 0.5 else WORDS)
+    return f"{authors} ({rng.randint(1990, 2024)}). {title}. Journal of {rng.choice(WORDS).capitalize()}, {rng.randint(1, 40)}({rng.randint(1, 12)}), {rng.randint(1, 300)}-{rng.randint(301, 600)}."
+
+
+_KOREAN_FONT = []
+
+
+def _korean_font():
+    if not _KOREAN_FONT:
+        _KOREAN_FONT.append(fitz.Font("korea"))
+    return _KOREAN_FONT[0]
+
+
+class _Writer:
+    """Writes lines top to bottom, starting new pages as needed."""
+
+    def __init__(self, doc, fontname):
+        self.doc = doc
+        self.fontname = fontname
+        self.page = None
+        self.y = PAGE_HEIGHT
+
+    def _ensure_room(self, height):
+        if self.page is None or self.y + height > PAGE_HEIGHT - MARGIN:
+            self.page = self.doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+            self.page.insert_text((PAGE_WIDTH / 2, PAGE_HEIGHT - 36), f"- {len(self.doc)} -", fontname="helv", fontsize=9)
+            self.y = MARGIN
+
+    def line(self, text, size=10, fontname=None, indent=0):
+        self._ensure_room(LINE_HEIGHT)
+        fontname = fontname or self.fontname
+        if fontname == "korea":
+            # insert_text() with the built-in CJK font drops Latin characters (ü) and cuts runs
+            # of mixed text; a TextWriter with the font object writes the line as given
+            writer = fitz.TextWriter(self.page.rect)
+            writer.append((MARGIN + indent, self.y), text, font=_korean_font(), fontsize=size)
+            writer.write_text(self.page)
+        else:
+            self.page.insert_text((MARGIN + indent, self.y), text, fontname=fontname, fontsize=size)
+        self.y += LINE_HEIGHT * size / 10
+
+    def gap(self, lines=1):
+        self.y += LINE_HEIGHT * lines
+
+    def new_page(self):
+        self.page = None
+        self._ensure_room(0)
+
+
+def make_paper_pdf(path, seed=0, body_pages=6, reference_count=30, numbered=True, korean=False, back_matter=False,
+                   title=None, references=None, identifier=None):
+    """Writes a paper to path and returns the ground-truth list of reference strings.
+
+    title and references (strings) can be given explicitly; otherwise they are random.
+    identifier (e.g. "arXiv:2101.00042v1") is printed under the title.
+    """
+    rng = random.Random(seed)
+    doc = fitz.open()
+    writer = _Writer(doc, "korea" if korean else "helv")
+    writer.line(title or random_title(rng), size=16, fontname="hebo")
+    if identifier:
+        writer.line(identifier, size=8)
+    writer.gap()
+    for _ in range(body_pages * 45):
+        # Body text occasionally mentions the word "references" to trip naive locators
+        sentence = " ".join(rng.choice(WORDS + ["references"]) for _ in range(14))
+        writer.line(sentence)
+
+    writer.new_page()
+    writer.line("참 고 문 헌" if korean else "References", size=14, fontname="korea" if korean else "hebo")
+    writer.gap()
+    if references is None:
+        references = [random_reference(rng, korean) for _ in range(reference_count)]
+    for i, ref in enumerate(references, 1):
+        prefix = f"[{i}] " if numbered else ""
+        wrapped = textwrap.wrap(prefix + ref, WRAP)
+        for j, part in enumerate(wrapped):
+            writer.line(part, indent=0 if j == 0 or numbered else 18)
+        writer.gap(0.6)
+
+    if back_matter:
+        writer.new_page()
+        writer.line("ABSTRACT", size=14, fontname="hebo")
+        writer.gap()
+        for _ in range(20):
+            writer.line(" ".join(rng.choice(WORDS) for _ in range(14)))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    doc.save(path)
+    doc.close()
+    return references
@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+# Pending journal entries are folded into the sidecar after this many seconds without
+# new edits, or sooner once the journal gets long
+COMPACT_DELAY = 5
+COMPACT_AFTER_OPS = 200
+
+
+def sidecar_path(pdf_path):
+    base, ext = os.path.splitext(pdf_path)
+    return f"{base}.json"
+
+
+def journal_path(pdf_path):
+    return sidecar_path(pdf_path) + ".journal"
+
+
+def _key(highlight):
+    """A highlight's id: its timestamp, or for highlights saved before they had one, a hash of
+    its content (so replaying an add that is already in the sidecar does not duplicate it)."""
+    if highlight.get("timestamp"):
+        return highlight["timestamp"]
+    content = json.dumps(highlight, sort_keys=True, ensure_ascii=False)
+    return "_legacy_" + hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]
+
+
+class _Annotations:
+    """In-memory state of one sidecar; highlights are keyed by their timestamp (their id)."""
+
+    def __init__(self, data):
+        self.extra = {k: v for k, v in data.items() if k != "highlights"}
+        self.extra.setdefault("memos", [])
+        self.highlights = {}
+        for h in data.get("highlights", []):
+            key = base = _key(h)
+            copies = 0
+            while key in self.highlights:
+                # The sidecar may hold identical legacy highlights; keep every one
+                copies += 1
+                key = f"{base}_{copies}"
+            self.highlights[key] = h
+        self.pending_ops = 0
+        self.last_write = 0
+        self.torn = False         # the journal ends in a torn line; the next append starts a new one
+        self.compacting = False   # a compaction of this paper is writing its sidecar
+
+    def apply(self, op):
+        """Applies one journal entry. Idempotent, so replaying a journal that was already
+        folded into the sidecar (crash mid-compaction) is harmless."""
+        if op.get("op") == "add":
+            highlight = op["highlight"]
+            self.highlights.setdefault(_key(highlight), highlight)
+        elif op.get("op") == "delete":
+            self.highlights.pop(op.get("timestamp"), None)
+
+    def to_dict(self):
+        return dict({"highlights": list(self.highlights.values())}, **self.extra)
+
+
+class AnnotationStore:
+    """Highlights and memos stored in `<pdf>.json` sidecars next to each PDF.
+
+    Edits are appended to a small `<pdf>.json.journal` file, one JSON line per change, so a
+    save costs the same however annotated the paper is. A background thread folds the
+    journal into the sidecar (atomic replace) once edits go quiet; loading replays any
+    journal left over from a crash.
+    """
+
+    def __init__(self, compact_delay=COMPACT_DELAY):
+        self.compact_delay = compact_delay
+        self._docs = {}  # pdf_path -> _Annotations
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._closed = False
+        self._compactor = threading.Thread(target=self._compact_loop, daemon=True)
+        self._compactor.start()
+
+    def _get(self, pdf_path):
+        doc = self._docs.get(pdf_path)
+        if doc is None:
+            doc = _Annotations(_read_sidecar(pdf_path))
+            ops, doc.torn = _read_journal(pdf_path)
+            for op in ops:
+                doc.apply(op)
+                doc.pending_ops += 1
+            self._docs[pdf_path] = doc
+            if doc.pending_ops:
+                # Left over from a crash; fold it in now so new appends never follow a torn line
+                self._compact(pdf_path, doc)
+        return doc
+
+    def load(self, pdf_path):
+        """Returns {"highlights": [...], "memos": [...], ...} for a PDF."""
+        with self._lock:
+            return self._get(pdf_path).to_dict()
+
+    def count(self, pdf_path):
+        with self._lock:
+            return len(self._get(pdf_path).highlights)
+
+    def add_highlight(self, pdf_path, highlight):
+        """Appends a highlight; returns the new highlight count."""
+        with self._lock:
+            doc = self._get(pdf_path)
+            op = {"op": "add", "highlight": highlight}
+            self._append(pdf_path, doc, op)
+            return len(doc.highlights)
+
+    def delete_highlight(self, pdf_path, timestamp):
+        """Removes a highlight by timestamp; returns (found, new highlight count)."""
+        with self._lock:
+            doc = self._get(pdf_path)
+            if timestamp not in doc.highlights:
+                return False, len(doc.highlights)
+            self._append(pdf_path, doc, {"op": "delete", "timestamp": timestamp})
+            return True, len(doc.highlights)
+
+    def _append(self, pdf_path, doc, op):
+        # Journal first: the in-memory state never gets ahead of what is on disk
+        with open(journal_path(pdf_path), 'a', encoding='utf-8') as f:
+            f.write(("\n" if doc.torn else "") + json.dumps(op, ensure_ascii=False) + "\n")
+        doc.torn = False
+        doc.apply(op)
+        doc.pending_ops += 1
+        doc.last_write = time.time()
+        self._wake.notify()
+
+    def _compact_loop(self):
+        with self._lock:
+            while not self._closed:
+                now = time.time()
+                next_due = None
+                for pdf_path, doc in list(self._docs.items()):
+                    if not doc.pending_ops:
+                        continue
+                    due = doc.last_write + self.compact_delay
+                    if due <= now or doc.pending_ops >= COMPACT_AFTER_OPS:
+                        self._compact(pdf_path, doc)
+                    else:
+                        next_due = due if next_due is None else min(next_due, due)
+                self._wake.wait(None if next_due is None else max(0.05, next_due - now))
+
+    def _compact(self, pdf_path, doc):
+        """Writes the full state to the sidecar atomically, then drops the journal.
+
+        Called with the lock held, which is released while the sidecar is written, so edits
+        and loads do not wait for the disk. The journal is only dropped if nothing was
+        appended meanwhile; otherwise it stays (replaying it is harmless) for the next pass."""
+        if doc.compacting:
+            return
+        doc.compacting = True
+        state, ops = doc.to_dict(), doc.pending_ops
+        path = sidecar_path(pdf_path)
+        tmp_path = path + ".tmp"
+        self._lock.release()
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False, indent=4)
+            os.replace(tmp_path, path)
+            error = None
+        except OSError as e:
+            error = e
+        finally:
+            self._lock.acquire()
+            doc.compacting = False
+            self._wake.notify_all()
+        if error is None and doc.pending_ops == ops:
+            try:
+                os.remove(journal_path(pdf_path))
+                doc.pending_ops = 0
+                doc.torn = False
+            except OSError as e:
+                error = e
+        if error is not None:
+            print(f"Could not compact annotations for {os.path.basename(pdf_path)}: {error}")
+            doc.last_write = time.time()  # retry after another delay
+
+    def flush(self):
+        """Compacts every pending journal now (on exit)."""
+        with self._lock:
+            for pdf_path, doc in list(self._docs.items()):
+                while doc.compacting:
+                    self._wake.wait()
+                if doc.pending_ops:
+                    self._compact(pdf_path, doc)
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._closed = True
+            self._wake.notify()
+
+
+def _read_sidecar(pdf_path):
+    try:
+        with open(sidecar_path(pdf_path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"highlights": [], "memos": []}
+    except (OSError, ValueError) as e:
+        print(f"Could not read annotations for {os.path.basename(pdf_path)}: {e}")
+        return {"highlights": [], "memos": []}
+
+
+def _read_journal(pdf_path):
+    """Returns (ops, whether the journal ends in a torn line from a crash mid-append).
+    Appends after a torn line start on a new line, so only torn lines themselves are skipped."""
+    ops = []
+    torn = False
+    try:
+        with open(journal_path(pdf_path), 'r', encoding='utf-8') as f:
+            for line in f:
+                torn = not line.endswith("\n")
+                try:
+                    ops.append(json.loads(line))
+                except ValueError:
+                    torn = True
+    except FileNotFoundError:
+        pass
+    return ops, torn
+
+
+def count_highlights(pdf_path):
+    """Highlight count straight from disk (sidecar plus journal), without caching."""
+    doc = _Annotations(_read_sidecar(pdf_path))
+    for op in _read_journal(pdf_path)[0]:
+        doc.apply(op)
+    return len(doc.highlights)
@@ -0,0 +1,287 @@
+import threading
+from array import array
+from collections import OrderedDict, deque
+from metrics import metrics
+
+CACHE_SIZE = 256
+# Rebuild the CSR arrays once this share of nodes has patched adjacency
+COMPACT_RATIO = 0.25
+
+
+class CitationGraph:
+    """Graph analytics over the library's Cites / Cited By links.
+
+    Adjacency is kept in CSR form (one offsets array and one targets array per direction),
+    built from the IndexManager's current view. Link changes arrive as library events and
+    are applied as per-node patches on top of the arrays, which are rebuilt once enough
+    nodes are patched. Query results are cached together with the nodes whose adjacency
+    they read, so a change only evicts results it can affect (PageRank depends on every
+    node and is evicted by any change).
+    """
+
+    def __init__(self, get_view):
+        self._get_view = get_view
+        self._lock = threading.RLock()  # re-entrant: cached queries may build on other cached queries
+        self._built = False
+        # Filenames whose links may have changed since the last sync; separate lock so event
+        # delivery from the indexer never waits for a running query
+        self._pending_lock = threading.Lock()
+        self._pending = set()
+        self._cache = OrderedDict() # key -> (result, touched node ids or None for global results)
+
+    def on_library_events(self, events):
+        """IndexManager listener: remembers which papers to re-read on the next query."""
+        with self._pending_lock:
+            self._pending.update(filename for _kind, filename in events)
+
+    # Structure
+
+    def _build(self, view):
+        with metrics.timer("graph.build", papers=len(view)):
+            self.names = list(view.entries)
+            self.ids = {name: i for i, name in enumerate(self.names)}
+            out_lists = [[self.ids[c] for c in view.entries[name].get("cites", []) if c in self.ids and c != name]
+                         for name in self.names]
+            in_lists = [[] for _ in self.names]
+            for i, targets in enumerate(out_lists):
+                for j in targets:
+                    in_lists[j].append(i)
+            self.out_offsets, self.out_targets = _csr(out_lists)
+            self.in_offsets, self.in_targets = _csr(in_lists)
+            self._out_patch = {}
+            self._in_patch = {}
+        self._built = True
+        self._cache.clear()
+
+    def _out(self, i):
+        patched = self._out_patch.get(i)
+        if patched is not None:
+            return patched
+        if i >= len(self.out_offsets) - 1:
+            return ()
+        return self.out_targets[self.out_offsets[i]:self.out_offsets[i + 1]]
+
+    def _in(self, i):
+        patched = self._in_patch.get(i)
+        if patched is not None:
+            return patched
+        if i >= len(self.in_offsets) - 1:
+            return ()
+        return self.in_targets[self.in_offsets[i]:self.in_offsets[i + 1]]
+
+    def _sync(self):
+        """Brings the graph up to date with the current view; called with the lock held."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, set()
+        view = self._get_view()
+        if not self._built:
+            self._build(view)
+            return
+        if not pending:
+            return
+        # Register new papers before reading any links, so edges between papers that are
+        # both new in this batch are not dropped
+        for filename in pending:
+            if filename not in self.ids and view.get(filename) is not None:
+                self._add_node(filename)
+        changed = set()
+        for filename in pending:
+            changed |= self._set_links(filename, view.get(filename))
+        if len(self._out_patch) + len(self._in_patch) > COMPACT_RATIO * 2 * max(len(self.names), 1):
+            self._build(view)
+            return
+        if changed:
+            self._invalidate(changed)
+
+    def _set_links(self, filename, entry):
+        """Replaces one paper's outgoing edges. Returns the node ids whose adjacency changed."""
+        i = self.ids.get(filename)
+        if i is None:
+            if entry is None:
+                return set()
+            i = self._add_node(filename)
+        elif entry is None:
+            self.names[i] = None  # tombstone; the id is reused only after a rebuild
+            del self.ids[filename]
+
+        old = set(self._out(i))
+        new = {self.ids[c] for c in (entry or {}).get("cites", []) if c in self.ids and c != filename}
+        if old == new:
+            return {i} if entry is None else set()
+        self._out_patch[i] = tuple(sorted(new))
+        for j in old - new:
+            self._in_patch[j] = tuple(k for k in self._in(j) if k != i)
+        for j in new - old:
+            self._in_patch[j] = tuple(self._in(j)) + (i,)
+        return {i} | old | new
+
+    def _add_node(self, filename):
+        i = len(self.names)
+        self.names.append(filename)
+        self.ids[filename] = i
+        return i
+
+    def _invalidate(self, changed):
+        for key in [k for k, (_, touched) in self._cache.items() if touched is None or touched & changed]:
+            del self._cache[key]
+        metrics.incr("graph.invalidations", len(changed))
+
+    def _cached(self, key, compute):
+        with self._lock:
+            self._sync()
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+                metrics.incr("graph.cache_hit")
+                return hit[0]
+            metrics.incr("graph.cache_miss")
+            with metrics.timer("graph.query", kind=key[0]):
+                result, touched = compute()
+            self._cache[key] = (result, touched)
+            if len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+            return result
+
+    def _neighbors(self, i, direction):
+        if direction == "cites":
+            return self._out(i)
+        if direction == "cited_by":
+            return self._in(i)
+        return tuple(self._out(i)) + tuple(self._in(i))
+
+    # Queries (filenames in, filenames out)
+
+    def shortest_path(self, source, target, directed=True):
+        """Shortest chain of citations from source to target (following Cites, or links in
+        either direction when directed is False), as a list of filenames, or None."""
+        def compute():
+            s, t = self.ids.get(source), self.ids.get(target)
+            if s is None or t is None:
+                return None, None  # unknown paper; evicted by any change
+            direction = "cites" if directed else "both"
+            parent = {s: None}
+            queue = deque([s])
+            while queue:
+                node = queue.popleft()
+                if node == t:
+                    break
+                for nxt in self._neighbors(node, direction):
+                    if nxt not in parent and self.names[nxt] is not None:
+                        parent[nxt] = node
+                        queue.append(nxt)
+            if t not in parent:
+                return None, set(parent)
+            path = []
+            node = t
+            while node is not None:
+                path.append(self.names[node])
+                node = parent[node]
+            return path[::-1], set(parent)
+        return self._cached(("path", source, target, directed), compute)
+
+    def co_citation(self, filename, limit=20):
+        """Papers most often cited together with filename: [(filename, shared citing papers)]."""
+        def compute():
+            i = self.ids.get(filename)
+            if i is None:
+                return [], None
+            counts = {}
+            citers = self._in(i)
+            for citer in citers:
+                for other in self._out(citer):
+                    if other != i:
+                        counts[other] = counts.get(other, 0) + 1
+            return self._ranked(counts, limit), {i, *citers}
+        return self._cached(("cocitation", filename, limit), compute)
+
+    def bibliographic_coupling(self, filename, limit=20):
+        """Papers sharing the most references with filename: [(filename, shared references)]."""
+        def compute():
+            i = self.ids.get(filename)
+            if i is None:
+                return [], None
+            counts = {}
+            refs = self._out(i)
+            for ref in refs:
+                for other in self._in(ref):
+                    if other != i:
+                        counts[other] = counts.get(other, 0) + 1
+            return self._ranked(counts, limit), {i, *refs}
+        return self._cached(("coupling", filename, limit), compute)
+
+    def neighborhood(self, filename, hops=2, direction="both", limit=500):
+        """Papers within `hops` links of filename: {filename: distance}, closest first, at most limit."""
+        def compute():
+            i = self.ids.get(filename)
+            if i is None:
+                return {}, None
+            dist = {i: 0}
+            queue = deque([i])
+            read = set()
+            while queue and len(dist) < limit + 1:
+                node = queue.popleft()
+                if dist[node] >= hops:
+                    continue
+                read.add(node)
+                for nxt in self._neighbors(node, direction):
+                    if nxt not in dist and self.names[nxt] is not None:
+                        dist[nxt] = dist[node] + 1
+                        queue.append(nxt)
+            del dist[i]
+            ordered = sorted(dist.items(), key=lambda item: item[1])[:limit]
+            return {self.names[n]: d for n, d in ordered}, read
+        return self._cached(("neighborhood", filename, hops, direction, limit), compute)
+
+    def pagerank(self, damping=0.85, max_iterations=100, tolerance=1e-6):
+        """PageRank over Cites edges (influence flows to cited papers): {filename: score}."""
+        def compute():
+            n = len(self.names)
+            alive = [i for i in range(n) if self.names[i] is not None]
+            if not alive:
+                return {}, None
+            adjacency = [self._out(i) for i in range(n)]
+            rank = [0.0] * n
+            for i in alive:
+                rank[i] = 1.0 / len(alive)
+            for _ in range(max_iterations):
+                new = [0.0] * n
+                dangling = 0.0
+                for i in alive:
+                    targets = adjacency[i]
+                    if targets:
+                        share = damping * rank[i] / len(targets)
+                        for j in targets:
+                            new[j] += share
+                    else:
+                        dangling += rank[i]
+                base = (1.0 - damping) / len(alive) + damping * dangling / len(alive)
+                delta = 0.0
+                for i in alive:
+                    new[i] += base
+                    delta += abs(new[i] - rank[i])
+                rank = new
+                if delta < tolerance:
+                    break
+            return {self.names[i]: rank[i] for i in alive}, None
+        return self._cached(("pagerank", damping), compute)
+
+    def top_influential(self, limit=20):
+        """Highest PageRank papers: [(filename, score)]."""
+        def compute():
+            scores = self.pagerank()
+            return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit], None
+        return self._cached(("top", limit), compute)
+
+    def _ranked(self, counts, limit):
+        alive = [(node, count) for node, count in counts.items() if self.names[node] is not None]
+        best = sorted(alive, key=lambda item: (-item[1], self.names[item[0]]))[:limit]
+        return [(self.names[node], count) for node, count in best]
+
+
+def _csr(lists):
+    offsets = array('l', [0])
+    targets = array('l')
+    for items in lists:
+        targets.extend(items)
+        offsets.append(len(targets))
+    return offsets, targets
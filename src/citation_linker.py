@@ -0,0 +1,157 @@
+import re
+
+MIN_TITLE_LENGTH = 10  # Only try fuzzy matching substantial titles
+
+
+def normalize_text(text):
+    return re.sub(r'\s+', ' ', (text or "").lower()).strip()
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class CitationLinker:
+    """Maintains Cites / Cited By edges between local papers incrementally.
+
+    Paper A cites paper B when one of A's references carries B's Semantic Scholar ID, or
+    (fallback) when B's normalized title appears inside one of A's reference texts. Only
+    per-paper data stays in memory, never reference texts:
+
+    - a Semantic Scholar ID -> papers map,
+    - each title filed under one "anchor" trigram, so a reference only has to be checked
+      against titles whose anchor it contains.
+
+    A paper's references are matched against those once, as they are passed in. Which
+    papers cite a newly added one is asked of `find_citing(paper_id, normalized_title)`,
+    which searches the stored reference lists (see IndexStore.find_citing).
+
+    add() / remove() return the set of filenames whose edges changed.
+    """
+
+    def __init__(self, find_citing=None):
+        self.find_citing = find_citing or (lambda paper_id, title: set())
+        self.papers = {}          # filename -> (semantic_scholar_id, normalized title)
+        self.id_to_files = {}     # semantic scholar id -> {filename}
+        self.title_anchors = {}   # anchor trigram -> {filename}
+        self.title_df = {}        # trigram -> number of titles containing it (picks rare anchors)
+        self.anchor_of = {}       # filename -> anchor trigram
+        self.cites = {}           # filename -> {filename}
+        self.cited_by = {}        # filename -> {filename}
+
+    def add(self, filename, entry):
+        """Adds (or replaces) a paper and links it both ways. Returns the filenames touched."""
+        touched = self.remove(filename) if filename in self.papers else set()
+        self._register(filename, entry)
+        for target in self._find_cited(filename, entry.get("references") or []):
+            self._link(filename, target, touched)
+        for source in self._find_citing(filename):
+            self._link(source, filename, touched)
+        return touched
+
+    def rebuild(self, papers, references):
+        """Links a whole library: registers every paper of `papers` ((filename, entry)
+        pairs), then matches each list of `references` ((filename, [reference dicts]) pairs,
+        e.g. streamed from the store) as it comes. No reverse lookups are needed."""
+        # Anchors are picked once every title is counted, so early titles get rare ones too
+        filenames = [filename for filename, entry in papers if self._register(filename, entry, anchor=False)]
+        for filename in filenames:
+            self._anchor(filename)
+        for filename, refs in references:
+            if filename in self.papers:
+                for target in self._find_cited(filename, refs):
+                    self._link(filename, target, set())
+
+    def remove(self, filename):
+        """Drops a paper and every edge touching it. Returns the filenames touched."""
+        if filename not in self.papers:
+            return set()
+        paper_id, title = self.papers.pop(filename)
+        touched = {filename}
+
+        for target in self.cites.pop(filename, set()):
+            self.cited_by[target].discard(filename)
+            touched.add(target)
+        for source in self.cited_by.pop(filename, set()):
+            self.cites[source].discard(filename)
+            touched.add(source)
+
+        if paper_id:
+            self._discard(self.id_to_files, paper_id, filename)
+        anchor = self.anchor_of.pop(filename, None)
+        if anchor is not None:
+            self._discard(self.title_anchors, anchor, filename)
+            for gram in trigrams(title):
+                self.title_df[gram] -= 1
+                if self.title_df[gram] <= 0:
+                    del self.title_df[gram]
+        return touched
+
+    def cites_of(self, filename):
+        return sorted(self.cites.get(filename, ()))
+
+    def cited_by_of(self, filename):
+        return sorted(self.cited_by.get(filename, ()))
+
+    def _register(self, filename, entry, anchor=True):
+        """Files the paper's ID and title. Returns True if the title is long enough to match."""
+        paper_id = entry.get("semantic_scholar_id")
+        title = normalize_text(entry.get("title"))
+        self.papers[filename] = (paper_id, title)
+        self.cites[filename] = set()
+        self.cited_by[filename] = set()
+        if paper_id:
+            self.id_to_files.setdefault(paper_id, set()).add(filename)
+        if len(title) <= MIN_TITLE_LENGTH:
+            return False
+        for gram in trigrams(title):
+            self.title_df[gram] = self.title_df.get(gram, 0) + 1
+        if anchor:
+            self._anchor(filename)
+        return True
+
+    def _anchor(self, filename):
+        anchor = min(trigrams(self.papers[filename][1]), key=lambda g: (self.title_df[g], g))
+        self.anchor_of[filename] = anchor
+        self.title_anchors.setdefault(anchor, set()).add(filename)
+
+    def _link(self, source, target, touched):
+        if source == target or target in self.cites[source]:
+            return
+        self.cites[source].add(target)
+        self.cited_by[target].add(source)
+        touched.add(source)
+        touched.add(target)
+
+    def _find_cited(self, filename, references):
+        """Local papers that `filename` cites, given its reference list."""
+        found = set()
+        for ref in references:
+            # Method A: Semantic Scholar ID matching (Highly accurate)
+            ref_id = ref.get("semantic_scholar_id")
+            if ref_id:
+                found |= self.id_to_files.get(ref_id, set())
+            # Method B: Title fuzzy matching (Fallback) - only titles whose anchor occurs in the text
+            ref_text = normalize_text(ref.get("text"))
+            if len(ref_text) <= MIN_TITLE_LENGTH:
+                continue
+            for gram in trigrams(ref_text):
+                for candidate in self.title_anchors.get(gram, ()):
+                    if candidate not in found and self.papers[candidate][1] in ref_text:
+                        found.add(candidate)
+        found.discard(filename)
+        return found
+
+    def _find_citing(self, filename):
+        """Local papers that cite `filename`."""
+        paper_id, title = self.papers[filename]
+        found = self.find_citing(paper_id, title if len(title) > MIN_TITLE_LENGTH else None)
+        return {source for source in found if source != filename and source in self.papers}
+
+    @staticmethod
+    def _discard(index, key, filename):
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.discard(filename)
+            if not bucket:
+                del index[key]
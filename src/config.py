@@ -32,6 +32,17 @@ def save_config(config_data):
         print(f"Error saving config: {e}")
         return False
         
+def get_cache_dir():
+    """Directory for caches shared by every library (API responses, etc.)."""
+    cache_dir = os.path.join(_get_base_dir(), 'cache')
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+def get_setting(key, default=None):
+    """Reads an optional tuning value from config.json, falling back to the default."""
+    value = load_config().get(key)
+    return default if value is None else value
+
 def get_library_path():
     config = load_config()
     lib_path = config.get("library_path")
@@ -0,0 +1,105 @@
+import re
+import hashlib
+import random
+import unicodedata
+from array import array
+
+# Near-duplicate detection (arXiv v1/v2, re-downloads with a different cover page, ...) by
+# MinHash signatures of a paper's first-page text, bucketed with LSH so a new paper is only
+# compared against the few library papers that share a band with it.
+
+NUM_PERM = 64
+BANDS = 8              # 8 bands x 8 rows: pairs above ~0.77 similarity almost always share a band
+ROWS = NUM_PERM // BANDS
+NEAR_DUPLICATE_THRESHOLD = 0.8
+SHINGLE_WORDS = 3
+MIN_SHINGLES = 20      # too little text (scans, cover pages) to call anything a duplicate
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(0x5EED)  # fixed, so signatures stay comparable across runs
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def shingles(text):
+    words = _WORD_RE.findall(unicodedata.normalize('NFKC', text or "").lower())
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def minhash_signature(text):
+    """MinHash signature (list of NUM_PERM ints) of the text's word shingles, or None if too short."""
+    grams = shingles(text)
+    if len(grams) < MIN_SHINGLES:
+        return None
+    hashes = [int.from_bytes(hashlib.blake2b(g.encode('utf-8'), digest_size=8).digest(), 'little') for g in grams]
+    return [min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def pack(signature):
+    """Signature as array('I'); its values are 32-bit."""
+    return signature if isinstance(signature, array) else array('I', signature)
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of the two shingle sets."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+class DuplicateIndex:
+    """The papers' signatures, with LSH buckets over the canonical (non-duplicate) ones.
+
+    Signatures are kept here only (not in the index entries or their published copies),
+    packed as array('I'): 64 x 4 bytes instead of a list of 64 int objects.
+    """
+
+    def __init__(self):
+        self.signatures = {}  # filename -> signature
+        self.buckets = {}     # hash of (band, band values) -> {filename}, canonical papers only
+        self.canonical = set()
+
+    def _bands(self, signature):
+        # Hashed band keys: a collision only adds a candidate that find() then scores
+        return [hash((band, signature[band * ROWS:(band + 1) * ROWS].tobytes())) for band in range(BANDS)]
+
+    def add(self, filename, signature, canonical=True):
+        """Keeps filename's signature; only canonical papers can be found by find()."""
+        signature = pack(signature)
+        if self.signatures.get(filename) == signature and (filename in self.canonical) == canonical:
+            return
+        self.remove(filename)
+        self.signatures[filename] = signature
+        if canonical:
+            self.canonical.add(filename)
+            for key in self._bands(signature):
+                self.buckets.setdefault(key, set()).add(filename)
+
+    def remove(self, filename):
+        signature = self.signatures.pop(filename, None)
+        if signature is None or filename not in self.canonical:
+            return
+        self.canonical.discard(filename)
+        for key in self._bands(signature):
+            bucket = self.buckets.get(key)
+            if bucket:
+                bucket.discard(filename)
+                if not bucket:
+                    del self.buckets[key]
+
+    def signature(self, filename):
+        return self.signatures.get(filename)
+
+    def find(self, signature, exclude=None, threshold=NEAR_DUPLICATE_THRESHOLD):
+        """Most similar indexed paper at or above threshold, as (filename, similarity), or None."""
+        signature = pack(signature)
+        candidates = set()
+        for key in self._bands(signature):
+            candidates |= self.buckets.get(key, set())
+        candidates.discard(exclude)
+        best = None
+        for filename in candidates:
+            score = similarity(signature, self.signatures[filename])
+            if score >= threshold and (best is None or score > best[1]):
+                best = (filename, score)
+        return best
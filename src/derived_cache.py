@@ -0,0 +1,51 @@
+import os
+import json
+
+# Bump when the shape of derived data or the extraction algorithm changes; older entries are rebuilt
+DERIVED_VERSION = 2
+
+
+class DerivedCache:
+    """Per-document data derived from a PDF (page text, reference section, parsed references).
+
+    Entries are keyed by the file's content hash, so renames and copies share one entry and
+    a modified file naturally misses. Files are small JSON documents written atomically, which
+    keeps them safe to write from indexing worker processes.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def _path(self, content_hash):
+        return os.path.join(self.cache_dir, content_hash[:2], f"{content_hash}.json")
+
+    def load(self, content_hash):
+        if not content_hash:
+            return None
+        try:
+            with open(self._path(content_hash), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != DERIVED_VERSION:
+            return None
+        return data
+
+    def save(self, content_hash, data):
+        if not content_hash:
+            return
+        path = self._path(content_hash)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(dict(data, version=DERIVED_VERSION), f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not write derived data cache: {e}")
+
+    def delete(self, content_hash):
+        try:
+            os.remove(self._path(content_hash))
+        except OSError:
+            pass
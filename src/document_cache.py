@@ -0,0 +1,113 @@
+import os
+import threading
+from collections import OrderedDict
+from metrics import metrics
+
+# Linked papers prepared in the background after an open. They are kept apart from the
+# opened papers, so prefetching never pushes the back history out of the cache.
+PREFETCH_LIMIT = 8
+# Prefetching starts after this delay, so it does not compete with the open that triggered
+# it (and the viewer loading that paper); opening another paper first cancels it
+PREFETCH_DELAY = 0.25
+
+
+class DocumentCache:
+    """Recently opened (and prefetched) papers with their prepared open payloads.
+
+    A payload is built from one library's index (its IndexManager) and entries: the paper's
+    own and those of the papers it cites. Views of the index are copy-on-write, so while none
+    of those papers changed the current view holds the very same entry objects. A cached
+    payload is reused for the same manager as long as the file's (mtime, size) and those
+    entries are unchanged, and rebuilt otherwise. Opened papers are kept up to `capacity`,
+    prefetched ones up to PREFETCH_LIMIT, until they are opened.
+    """
+
+    def __init__(self, build, capacity=16):
+        self.build = build   # function(file_path, manager, view) -> (payload, filenames of the entries it read)
+        self.capacity = max(1, capacity)
+        self._lock = threading.Lock()
+        self._opened = OrderedDict()      # file path -> (manager, file stat, ((filename, entry), ...), payload)
+        self._prefetched = OrderedDict()  # same, for papers prepared ahead of an open
+        self._generation = 0              # bumped by every prefetch request; older prefetches stop
+        self._timer = None
+
+    def get(self, file_path, manager):
+        """Prepared payload for file_path in manager's library, from the cache while it is still current."""
+        view = manager.view()
+        with self._lock:
+            cached = self._prefetched.pop(file_path, None) or self._opened.get(file_path)
+        if cached is not None and self._current(file_path, cached, manager, view):
+            metrics.incr("open.cache_hit")
+            self._store(self._opened, file_path, cached, self.capacity)
+            return cached[3]
+        metrics.incr("open.cache_miss")
+        return self._prepare(file_path, manager, view, self._opened, self.capacity)
+
+    def _current(self, file_path, cached, manager, view):
+        owner, stat, sources, _payload = cached
+        return owner is manager and stat == _stat(file_path) and all(view.get(name) is entry for name, entry in sources)
+
+    def _prepare(self, file_path, manager, view, entries, limit):
+        stat = _stat(file_path)
+        payload, names = self.build(file_path, manager, view)
+        sources = tuple((name, view.get(name)) for name in names)
+        self._store(entries, file_path, (manager, stat, sources, payload), limit)
+        return payload
+
+    def _store(self, entries, file_path, cached, limit):
+        with self._lock:
+            entries[file_path] = cached
+            entries.move_to_end(file_path)
+            while len(entries) > limit:
+                entries.popitem(last=False)
+
+    def prefetch(self, file_paths, manager):
+        """Prepares payloads for file_paths in manager's library in the background (up to
+        PREFETCH_LIMIT), each against its view at that moment. A newer prefetch request,
+        clear() or closing the manager cancels this one."""
+        paths = list(dict.fromkeys(file_paths))[:PREFETCH_LIMIT]
+        with self._lock:
+            self._generation += 1
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if paths:
+                self._timer = threading.Timer(PREFETCH_DELAY, self._prefetch, args=(self._generation, paths, manager))
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _prefetch(self, generation, file_paths, manager):
+        for file_path in file_paths:
+            if self._generation != generation or manager.closed:
+                return
+            try:
+                view = manager.view()
+                with self._lock:
+                    cached = self._opened.get(file_path) or self._prefetched.get(file_path)
+                if cached is not None and self._current(file_path, cached, manager, view):
+                    continue
+                if os.path.exists(file_path):
+                    self._prepare(file_path, manager, view, self._prefetched, PREFETCH_LIMIT)
+                    metrics.incr("open.prefetched")
+            except Exception as e:
+                if manager.closed:
+                    return  # closed while this paper was being prepared
+                print(f"Could not prefetch {os.path.basename(file_path)}: {e}")
+
+    def clear(self):
+        """Cancels pending prefetching and forgets every payload (e.g. when the library changes)."""
+        with self._lock:
+            self._generation += 1
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._opened.clear()
+            self._prefetched.clear()
+
+
+def _stat(file_path):
+    try:
+        st = os.stat(file_path)
+        return st.st_mtime, st.st_size
+    except OSError:
+        return None
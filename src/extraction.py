@@ -0,0 +1,184 @@
+import os
+import re
+import time
+import unicodedata
+from dedup import minhash_signature
+from derived_cache import DerivedCache
+from reference_extractor import extract_references
+from thumbnail_cache import render_thumbnail
+
+# Everything in this module runs inside worker processes, so it must stay free of
+# IndexManager state and only take/return picklable values.
+
+# Text-only fallback for PDFs whose layout gives no usable heading cues: theses can have many
+# appendix pages, so look for the reference section in the last 20 pages
+REFERENCE_SEARCH_PAGES = 20
+_HEADING_RE = re.compile(r'(?:\n|^). {0,15}?(References|REFERENCES|Bibliography|참고문헌|참\s*고\s*문\s*헌)\s*\n', re.DOTALL)
+# arXiv downloads are named after their id ("2106.01234v2.pdf") and carry an "arXiv:..." stamp
+_ARXIV_NAME_RE = re.compile(r'^(\d{2}(?:0[1-9]|1[0-2])\.\d{4,5})(?:v\d+)?\b')
+_ARXIV_STAMP_RE = re.compile(r'arXiv:\s*(\d{2}(?:0[1-9]|1[0-2])\.\d{4,5})', re.IGNORECASE)
+# The stamp arXiv prints in the page margin ("arXiv:2106.01234v2 [cs.CL] 3 Jun 2021") names the
+# paper itself wherever the text extraction puts it; any other identifier on the first page
+# only counts in the header (title, authors, journal line), since the abstract, footnotes and
+# early references cite other papers
+_ARXIV_MARGIN_RE = re.compile(r'arXiv:\s*(\d{2}(?:0[1-9]|1[0-2])\.\d{4,5})v\d+\s*\[[\w.-]+\]', re.IGNORECASE)
+_DOI_RE = re.compile(r'\b(10\.\d{4,9}/[^\s"<>]+)')
+HEADER_LINES = 15
+_ABSTRACT_RE = re.compile(r'^\s*(?:abstract|summary|초\s*록|요\s*약)\b', re.IGNORECASE)
+
+
+def guess_title(filepath, filename):
+    """Attempts to guess the title. Semantic scholar search is fuzzy so this doesn't need to be perfect."""
+    # Clean filename first
+    clean_name = os.path.splitext(filename)[0]
+    # Just use the filename. Parsing the first page is too unreliable for Korean theses
+    # and frequently corrupts the Semantic Scholar search query.
+    return clean_name
+
+
+def first_page_header(first_page_text):
+    """The top of the first page: its first HEADER_LINES lines, up to the abstract heading."""
+    header = []
+    for line in (first_page_text or "").splitlines():
+        if _ABSTRACT_RE.match(line) or len(header) >= HEADER_LINES:
+            break
+        if line.strip():
+            header.append(line)
+    return "\n".join(header)
+
+
+def find_paper_id(filename, first_page_text):
+    """Semantic Scholar id ("ARXIV:..." or "DOI:...") from an arXiv file name, arXiv's margin
+    stamp or the identifiers in the first page's header, or None. Papers with one are looked
+    up without a title search (see title_matches for the check of the result)."""
+    text = first_page_text or ""
+    header = first_page_header(text)
+    match = (_ARXIV_NAME_RE.search(os.path.splitext(filename)[0]) or _ARXIV_MARGIN_RE.search(text)
+             or _ARXIV_STAMP_RE.search(header))
+    if match:
+        return f"ARXIV:{match.group(1)}"
+    match = _DOI_RE.search(header)
+    if match:
+        return f"DOI:{match.group(1).rstrip('.,;)]')}"
+    return None
+
+
+def title_matches(title, guessed_title, header):
+    """Whether a record found by identifier is this paper: its title is the guessed one or
+    is printed in the first page's header (compared without case, spacing and punctuation)."""
+    key = _title_key(title)
+    return bool(key) and (key == _title_key(guessed_title) or key in _title_key(header))
+
+
+def _title_key(text):
+    return "".join(re.findall(r'[^\W_]+', unicodedata.normalize("NFKC", text or "").lower()))
+
+
+def build_derived(pdf_path):
+    """Opens the PDF once and derives everything we cache per document."""
+    page_texts = []
+    section, references = None, []
+    try:
+        import fitz  # PyMuPDF; imported on first use to keep app startup fast
+        doc = fitz.open(pdf_path)
+        page_texts = [page.get_text() for page in doc]
+        section, references = extract_references(doc, page_texts)
+    except Exception as e:
+        print(f"Could not extract text from {os.path.basename(pdf_path)}: {e}")
+
+    if section is None:
+        section = locate_reference_section(page_texts)
+        references = parse_references(page_texts, section)
+    return {
+        "page_count": len(page_texts),
+        "page_texts": page_texts,
+        "reference_section": section,
+        "references": references
+    }
+
+
+def locate_reference_section(page_texts):
+    """Returns {"page", "offset"} of the text right after the reference heading, or None."""
+    start_page = max(0, len(page_texts) - REFERENCE_SEARCH_PAGES)
+    text_from_back = "".join(page_texts[start_page:])
+    # Relaxed regex to allow matching even if it's the very first string of the block
+    match = _HEADING_RE.search(text_from_back)
+    if not match:
+        return None
+    # Map the offset in the concatenated text back to (page, offset within page)
+    offset = match.end()
+    for page_idx in range(start_page, len(page_texts)):
+        if offset <= len(page_texts[page_idx]):
+            return {"page": page_idx, "offset": offset}
+        offset -= len(page_texts[page_idx])
+    return None
+
+
+def parse_references(page_texts, section):
+    """Splits the reference section into individual reference dicts."""
+    if not section:
+        return []
+    page_idx, offset = section["page"], section["offset"]
+    ref_text = page_texts[page_idx][offset:] + "".join(page_texts[page_idx + 1:])
+    ref_text = "\n" + ref_text.lstrip() # Guarantee standard delimiter behavior so list indexes align
+    # Split by [number], number., or number) capturing erratic spaces and newlines
+    raw_refs = re.split(r'\n\s*\[[0-9]+\]\s*\n|\n\s*\[[0-9]+\]\s*|\n\s*[0-9]+\.\s*|\n\s*[0-9]+\)\s*', ref_text)
+    clean_refs = []
+    for r in raw_refs:
+        r = r.strip().replace('\n', ' ')
+        r = re.sub(r'\s+', ' ', r) # Clean erratic spacing
+        if len(r) > 10:
+            clean_refs.append({"text": r})
+    return clean_refs
+
+
+def load_derived(pdf_path, content_hash=None, cache_dir=None):
+    """Returns the derived data for a PDF, from the per-hash cache when possible."""
+    cache = DerivedCache(cache_dir) if cache_dir and content_hash else None
+    derived = cache.load(content_hash) if cache else None
+    if derived is None:
+        derived = build_derived(pdf_path)
+        if cache and derived["page_count"]:
+            cache.save(content_hash, derived)
+    return derived
+
+
+def extract_references_local(pdf_path, content_hash=None, cache_dir=None):
+    """Fallback local extraction of the paper's own reference list."""
+    try:
+        return load_derived(pdf_path, content_hash, cache_dir)["references"]
+    except Exception:
+        return []
+
+
+def extract_local(filepath, filename, fingerprint=None, cache_dir=None, thumbnail_dir=None):
+    """Local (CPU-bound) stage of indexing: everything we can learn without the network."""
+    content_hash = fingerprint.get("hash") if fingerprint else None
+    # Timings travel back with the result; metrics are recorded in the app process
+    timings = {}
+    if thumbnail_dir and content_hash:
+        started = time.perf_counter()
+        try:
+            render_thumbnail(filepath, content_hash, thumbnail_dir)
+        except Exception as e:
+            print(f"Could not render thumbnail for {filename}: {e}")
+        timings["thumbnail"] = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    try:
+        derived = load_derived(filepath, content_hash, cache_dir)
+    except Exception:
+        derived = {"page_texts": [], "references": []}
+    timings["references"] = (time.perf_counter() - started) * 1000
+    # First-page fingerprint for near-duplicate detection (other versions of the same paper)
+    started = time.perf_counter()
+    first_page = derived["page_texts"][0] if derived["page_texts"] else None
+    signature = minhash_signature(first_page) if first_page else None
+    timings["minhash"] = (time.perf_counter() - started) * 1000
+    return {
+        "title": guess_title(filepath, filename),
+        "paper_id": find_paper_id(filename, first_page),
+        "header": first_page_header(first_page),
+        "references": derived["references"],
+        "minhash": signature,
+        "timings": timings
+    }
@@ -0,0 +1,156 @@
+import os
+import re
+import secrets
+import mimetypes
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote
+
+CHUNK_SIZE = 64 * 1024
+_RANGE_RE = re.compile(r'bytes=(\d*)-(\d*)$')
+
+
+class LocalFileServer:
+    """Serves registered local files to the webview over HTTP with byte-range support.
+
+    Only files explicitly registered get a (random) URL, so the server never exposes
+    anything else on disk. PDF.js uses Range requests to fetch just the parts it needs.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self._files = {}        # token -> absolute path
+        self._tokens = {}       # absolute path -> token
+        self._lock = threading.Lock()
+
+        server = self
+
+        class _Handler(_RangeRequestHandler):
+            file_server = server
+
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.host, self.port = self.httpd.server_address[:2]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def url_for(self, file_path):
+        """Registers a file (if needed) and returns the URL it is served at."""
+        abs_path = os.path.abspath(file_path)
+        with self._lock:
+            token = self._tokens.get(abs_path)
+            if token is None:
+                token = secrets.token_urlsafe(16)
+                self._tokens[abs_path] = token
+                self._files[token] = abs_path
+        name = quote(os.path.basename(abs_path))
+        return f"http://{self.host}:{self.port}/files/{token}/{name}"
+
+    def resolve(self, token):
+        with self._lock:
+            return self._files.get(token)
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _RangeRequestHandler(BaseHTTPRequestHandler):
+    file_server = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # Keep the console quiet; PDF.js issues many small range requests
+        pass
+
+    def _send_cors_headers(self):
+        # The UI is loaded from file://, so every response needs CORS headers
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Access-Control-Allow-Headers", "Range")
+        self.send_header("Access-Control-Expose-Headers", "Accept-Ranges, Content-Range, Content-Length")
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self._send_cors_headers()
+        self.send_header("Access-Control-Allow-Methods", "GET, HEAD, OPTIONS")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _resolve_path(self):
+        parts = unquote(self.path.split('?', 1)[0]).strip('/').split('/')
+        if len(parts) < 2 or parts[0] != "files":
+            return None
+        file_path = self.file_server.resolve(parts[1])
+        if file_path and os.path.isfile(file_path):
+            return file_path
+        return None
+
+    def _send_error(self, code, file_size=None):
+        self.send_response(code)
+        self._send_cors_headers()
+        if code == 416:
+            self.send_header("Content-Range", f"bytes */{file_size}")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _serve(self, send_body):
+        file_path = self._resolve_path()
+        if not file_path:
+            self._send_error(404)
+            return
+
+        file_size = os.path.getsize(file_path)
+        start, end = 0, file_size - 1
+        status = 200
+
+        range_header = self.headers.get("Range")
+        if range_header:
+            match = _RANGE_RE.match(range_header.strip())
+            if not match or (not match.group(1) and not match.group(2)):
+                self._send_error(416, file_size)
+                return
+            if match.group(1):
+                start = int(match.group(1))
+                if match.group(2):
+                    end = min(int(match.group(2)), file_size - 1)
+            else:
+                # Suffix range: the last N bytes
+                start = max(0, file_size - int(match.group(2)))
+            if start > end or start >= file_size:
+                self._send_error(416, file_size)
+                return
+            status = 206
+
+        length = end - start + 1 if file_size else 0
+        self.send_response(status)
+        self._send_cors_headers()
+        content_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+        self.send_header("Content-Type", content_type)
+        self.send_header("Accept-Ranges", "bytes")
+        # Images are content-addressed thumbnails and never change under the same URL
+        self.send_header("Cache-Control", "max-age=86400" if content_type.startswith("image/") else "no-cache")
+        self.send_header("Content-Length", str(length))
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{file_size}")
+        self.end_headers()
+
+        if not send_body or length == 0:
+            return
+        try:
+            with open(file_path, 'rb') as f:
+                f.seek(start)
+                remaining = length
+                while remaining > 0:
+                    chunk = f.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    remaining -= len(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            # PDF.js aborts the initial full request once it knows ranges are supported
+            pass
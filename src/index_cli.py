@@ -0,0 +1,115 @@
+"""Headless library indexing, e.g. to prebuild the index of a large shared library on a server.
+
+    python index_cli.py /path/to/papers [--workers 8] [--api-workers 4] [--rps 1.0] [--offline]
+
+Writes the same papers_index.db / .paper_reader data the app uses, so opening the folder in
+the app afterwards shows an already indexed library. Every paper is saved as soon as it is
+indexed; if the run is interrupted, running it again resumes with the papers that are left.
+"""
+import os
+import sys
+import time
+import json
+import argparse
+import multiprocessing
+
+
+def _format_duration(seconds):
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{seconds:02d}s"
+
+
+def _print_progress(manager, started):
+    progress = manager.get_indexing_progress()
+    done = progress["completed"] + progress["failed"]
+    total = progress["submitted"]
+    rate = progress["papers_per_minute"]
+    eta = _format_duration((total - done) / rate * 60) if rate and total > done else "-"
+    percent = done / total * 100 if total else 100
+    print(f"[{done:>{len(str(total))}}/{total}] {percent:5.1f}%  {rate:6.1f} papers/min  "
+          f"failed {progress['failed']}  elapsed {_format_duration(time.time() - started)}  ETA {eta}", flush=True)
+
+
+def build_index(papers_dir, options, progress_interval=5.0):
+    """Indexes everything new or changed in papers_dir and returns a summary dict."""
+    from index_manager import IndexManager
+
+    started = time.time()
+    manager = IndexManager(papers_dir, autostart=False, options=options)
+    before = {f for f, e in manager.index_data.items() if e.get("status") == "ready"}
+    print(f"Library: {papers_dir} ({len(before)} papers already indexed)")
+    try:
+        manager.scan_now()
+        # Files still being copied in are picked up once they settle
+        while manager._settling:
+            time.sleep(manager.settle_seconds)
+            manager.scan_now()
+
+        submitted = manager.get_indexing_progress()["submitted"]
+        print(f"Indexing {submitted} new or changed papers" if submitted else "Nothing to index")
+        while not manager.wait_until_idle(timeout=progress_interval):
+            _print_progress(manager, started)
+        if submitted:
+            _print_progress(manager, started)
+    except KeyboardInterrupt:
+        print("Interrupted; finished papers are saved. Run again to resume.")
+        raise
+    finally:
+        manager.close()
+
+    ready = [f for f, e in manager.index_data.items() if e.get("status") == "ready"]
+    elapsed = time.time() - started
+    newly_indexed = len(set(ready) - before)
+    return {
+        "papers": len(manager.index_data),
+        "ready": len(ready),
+        "newly_indexed": newly_indexed,
+        "still_indexing": len(manager.index_data) - len(ready),
+        "elapsed_seconds": round(elapsed, 1),
+        "papers_per_minute": round(newly_indexed / elapsed * 60, 1) if elapsed else 0
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the Paper Reader index for a folder of PDFs without the GUI.")
+    parser.add_argument("papers_dir", help="Folder containing the PDFs (the library folder)")
+    parser.add_argument("--workers", type=int, help="Extraction worker processes (default: CPU count - 1)")
+    parser.add_argument("--api-workers", type=int, help="Concurrent Semantic Scholar lookups (default: 4)")
+    parser.add_argument("--rps", type=float, help="Semantic Scholar requests per second (default: 1.0)")
+    parser.add_argument("--offline", action="store_true", help="Only use cached API responses")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="Seconds between progress lines")
+    parser.add_argument("--metrics", action="store_true", help="Print timing metrics as JSON when done")
+    args = parser.parse_args(argv)
+
+    papers_dir = os.path.abspath(args.papers_dir)
+    if not os.path.isdir(papers_dir):
+        parser.error(f"not a directory: {papers_dir}")
+
+    options = {
+        "indexing_workers": args.workers,
+        "api_workers": args.api_workers,
+        "semantic_scholar_requests_per_second": args.rps,
+        "offline_mode": True if args.offline else None
+    }
+    try:
+        summary = build_index(papers_dir, options, args.progress_interval)
+    except KeyboardInterrupt:
+        return 130
+
+    print(f"Done: {summary['ready']}/{summary['papers']} papers indexed "
+          f"({summary['newly_indexed']} new in {_format_duration(summary['elapsed_seconds'])}, "
+          f"{summary['papers_per_minute']} papers/min)")
+    if summary["still_indexing"]:
+        print(f"{summary['still_indexing']} papers did not finish and will be retried on the next run")
+    if args.metrics:
+        from metrics import metrics
+        print(json.dumps(metrics.snapshot(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    # Extraction runs in a process pool; required for frozen builds and spawn-based platforms
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,74 +1,657 @@
 import os
-import json
 import time
-import fitz  # PyMuPDF
-import requests
-import re
+import queue
 import threading
+from collections import OrderedDict
+from functools import partial
+from annotation_store import count_highlights
+from citation_graph import CitationGraph
+from citation_linker import CitationLinker, normalize_text
+from config import get_cache_dir, get_setting
+from dedup import DuplicateIndex
+from derived_cache import DerivedCache
+from extraction import (build_derived, extract_local, extract_references_local, find_paper_id, guess_title,
+                        load_derived, title_matches)
+from index_store import IndexStore
+from indexing_pool import IndexingPool
+from library_snapshot import write_snapshot
+from library_view import LibraryView
+from library_watcher import LibraryWatcher, hash_file, list_pdfs
+from metrics import metrics
+from paper_record import PaperRecord
+from response_cache import ResponseCache
+from search_engine import SearchIndex
+from semantic_scholar import API_BASE_URL, PaperBatcher, SemanticScholarClient
+from thumbnail_cache import ThumbnailCache, render_thumbnail
+
+# Reference lists kept in memory for recently opened / linked papers; the rest stay on disk
+REFERENCE_CACHE_SIZE = 64
+# Derived data (page text, references) of the last few viewed PDFs, for the viewer's page
+# text requests; PDFs from outside the library are only ever cached here
+DERIVED_MEMORY_SIZE = 4
+
+
+def _is_canonical(entry):
+    """Whether a paper can be matched as the original of a near-duplicate."""
+    return entry.get("status") == "ready" and not entry.get("duplicate_of")
+
 
 class IndexManager:
-    """Manages the local paper index (papers_index.json) and Semantic Scholar API queries."""
+    """Manages the local paper index (papers_index.db) and Semantic Scholar API queries."""
     
-    def __init__(self, papers_dir):
+    def __init__(self, papers_dir, autostart=True, options=None):
         self.papers_dir = papers_dir
-        self.index_file = os.path.join(papers_dir, "papers_index.json")
-        self.index_data = self._load_index()
-        self.api_url = "https://api.semanticscholar.org/graph/v1/paper/search"
-        self.api_details_url = "https://api.semanticscholar.org/graph/v1/paper/{paper_id}"
+        # Per-instance overrides of config.json settings (used by the headless CLI)
+        self._options = options or {}
+        self.index_file = os.path.join(papers_dir, "papers_index.db")
+        self.store = IndexStore(self.index_file, legacy_json_path=os.path.join(papers_dir, "papers_index.json"))
+        # Live index, only touched by writers holding self._lock. Readers use self.view(),
+        # an immutable copy republished after every saved change.
+        self.index_data = self.store.load_all()
+        self._view = LibraryView()
+        self._reference_cache = OrderedDict()
+        self._reference_lock = threading.Lock()
+        # Page text and parsed references per document content hash, next to the index
+        self.derived_dir = os.path.join(papers_dir, ".paper_reader", "derived")
+        self.derived_cache = DerivedCache(self.derived_dir)
+        self._recent_derived = OrderedDict()   # (path, mtime, size) -> derived data
+        self._derived_lock = threading.Lock()
+        # Guards index_data mutations and saves; the scanner and the API workers both write
+        self._lock = threading.RLock()
+        # Changes not yet written to the store; _save_index() flushes only these rows
+        self._dirty_entries = set()
+        self._dirty_links = set()
+        self._deleted = set()
+        # The startup snapshot (library_snapshot.py) is rewritten when indexing goes idle;
+        # start dirty so a stale or missing snapshot is replaced after this load
+        self._snapshot_dirty = True
+        # Library change events (kind, filename) waiting to be delivered to listeners
+        self._pending_events = []
+        self._listeners = []
+        
+        # Near-duplicate lookup over the first-page signatures of canonical papers
+        self.duplicates = DuplicateIndex()
+        for filename, signature in self.store.iter_signatures():
+            entry = self.index_data.get(filename)
+            if entry is not None:
+                self.duplicates.add(filename, signature, canonical=_is_canonical(entry))
+
+        # Build the citation indexes once; afterwards only edges touched by a change are updated
+        self.linker = CitationLinker(self._find_citing)
+        self._update_network_links()
+        self._publish(list(self.index_data))
+        # Path / co-citation / coupling / PageRank queries over the links, built on first use
+        self.graph = CitationGraph(self.view)
+        self.add_listener(self.graph.on_library_events)
+        
+        self.client = SemanticScholarClient(
+            base_url=self._setting("semantic_scholar_api_url", API_BASE_URL),
+            requests_per_second=self._setting("semantic_scholar_requests_per_second", 1.0),
+            api_key=self._setting("semantic_scholar_api_key"),
+            cache=self._open_response_cache(),
+            offline=self._setting("offline_mode", False),
+            connections=self._setting("api_workers", 4)
+        )
+        # Paper lookups by id from all API workers share batch requests
+        self.batcher = PaperBatcher(self.client)
+        # First-page thumbnails, keyed by content hash and shared by every library
+        self.thumbnails = ThumbnailCache(
+            self._setting("thumbnail_cache_path") or os.path.join(get_cache_dir(), "thumbnails"),
+            max_bytes=self._setting("thumbnail_cache_max_mb", 64) * 1024 * 1024
+        )
+        # Copies found while their original is still indexing: content hash -> [filename];
+        # they become duplicates of it once it is committed
+        self._indexing_hashes = {}
+        self._waiting_duplicates = {}
+        self._thumbnail_jobs = set()    # content hashes being rendered outside normal indexing
+        self._thumbnail_failed = set()  # content hashes that could not be rendered; not retried
+        self.pool = IndexingPool(
+            partial(extract_local, cache_dir=self.derived_dir, thumbnail_dir=self.thumbnails.cache_dir),
+            self._resolve_remote,
+            self._commit_paper,
+            on_idle=self._on_pool_idle,
+            process_workers=self._setting("indexing_workers"),
+            api_workers=self._setting("api_workers", 4),
+            on_failed=self._on_index_failed
+        )
         
-        # Start background scanner thread
+        # Full-text search index, kept in sync with the library by a background worker
+        self.search_index = self._open_search_index()
+        self._search_queue = queue.Queue()  # filenames to re-index; None stops the worker
+        self._search_thread = None
+        if self.search_index:
+            self.add_listener(self._queue_search_updates)
+            # Catch up with changes made while the app was closed (or build the index the first time)
+            self._queue_search_updates([("updated", f) for f in set(self.index_data) | set(self.search_index.indexed_filenames())])
+            self._search_thread = threading.Thread(target=self._search_worker, daemon=True)
+            self._search_thread.start()
+        
+        # Files modified more recently than this are assumed to still be copying in
+        self.settle_seconds = 2
+        self._settling = False
+        self.watcher = None
+        self.scanner_thread = None
+        self._stop_scanning = threading.Event()
+        self.closed = False
+        if autostart:
+            self.start()
+
+    def _setting(self, key, default=None):
+        value = self._options.get(key)
+        return get_setting(key, default) if value is None else value
+
+    def start(self):
+        """Starts watching the folder and the background scanner thread."""
+        if self.scanner_thread is not None:
+            if self.scanner_thread.is_alive():
+                if self._stop_scanning.is_set():
+                    print(f"Scanner of {self.papers_dir} is still stopping; not starting another one")
+                return
+            self.scanner_thread = None  # stopped after stop() gave up waiting for it
+        self._stop_scanning.clear()
+        self.watcher = LibraryWatcher(self.papers_dir)
         self.scanner_thread = threading.Thread(target=self._scan_directory, daemon=True)
         self.scanner_thread.start()
 
-    def _load_index(self):
-        if os.path.exists(self.index_file):
+    def stop(self):
+        """Stops the scanner thread and the folder watcher; the index stays loaded and usable."""
+        thread, watcher = self.scanner_thread, self.watcher
+        if thread is None:
+            return
+        self._stop_scanning.set()
+        watcher.stop()  # wakes the scanner if it is waiting for changes
+        thread.join(timeout=30)
+        self.watcher = None
+        if thread.is_alive():
+            # Still in a scan pass; it exits after it. Keeping the thread stops start() from
+            # running a second scanner next to it.
+            print(f"Scanner of {self.papers_dir} did not stop within 30s; it will exit after the current pass")
+            return
+        self.scanner_thread = None
+
+    def pause(self):
+        """Stops scanning and holds queued indexing work, e.g. while another library is shown."""
+        self.stop()
+        self.pool.pause()
+
+    def resume(self):
+        """Continues held indexing work and scanning; the first scan picks up changes made meanwhile."""
+        self.pool.resume()
+        self.start()
+
+    @property
+    def running(self):
+        return self.scanner_thread is not None
+
+    def _open_response_cache(self):
+        """Opens the shared API response cache; indexing still works (uncached) if it cannot be opened."""
+        path = self._setting("response_cache_path") or os.path.join(get_cache_dir(), "semantic_scholar.sqlite")
+        try:
+            return ResponseCache(path, max_bytes=self._setting("response_cache_max_mb", 64) * 1024 * 1024)
+        except Exception as e:
+            print(f"Response cache unavailable: {e}")
+            return None
+
+    def _open_search_index(self):
+        try:
+            return SearchIndex(os.path.join(self.papers_dir, ".paper_reader", "search.db"))
+        except Exception as e:
+            print(f"Search index unavailable: {e}")
+            return None
+
+    def add_listener(self, callback):
+        """Registers callback(events) for library changes; events is a list of (kind, filename)
+        with kind one of "added", "updated", "status" and "removed"."""
+        self._listeners.append(callback)
+
+    def _emit(self, kind, filename):
+        self._pending_events.append((kind, filename))
+
+    def _flush_events(self):
+        """Delivers queued events outside the index lock."""
+        with self._lock:
+            events, self._pending_events = self._pending_events, []
+        if not events:
+            return
+        for callback in list(self._listeners):
             try:
-                with open(self.index_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                callback(events)
             except Exception as e:
-                print(f"Error loading index: {e}")
-        return {}
+                print(f"Error delivering library events: {e}")
 
     def _save_index(self):
+        """Writes pending per-paper changes to the store in a single transaction."""
+        with self._lock:
+            if not (self._dirty_entries or self._dirty_links or self._deleted):
+                return
+            rows = len(self._dirty_entries) + len(self._dirty_links) + len(self._deleted)
+            with metrics.timer("index.save", rows=rows):
+                saved = self.store.apply(
+                    upserts=[self.index_data[f] for f in self._dirty_entries if f in self.index_data],
+                    deletes=list(self._deleted),
+                    links={f: self.index_data[f].get("cites", []) for f in self._dirty_links if f in self.index_data}
+                )
+            if saved:
+                # Saved reference lists leave the resident entries (see get_references)
+                for filename in self._deleted:
+                    self._cache_references(filename, None)
+                for filename in self._dirty_entries:
+                    entry = self.index_data.get(filename)
+                    if entry is not None and "references" in entry:
+                        self._cache_references(filename, entry.pop("references"))
+                    if entry is not None:
+                        entry.pop("minhash", None)  # kept by self.duplicates
+            self._publish(self._dirty_entries | self._dirty_links | self._deleted)
+            self._dirty_entries.clear()
+            self._dirty_links.clear()
+            self._deleted.clear()
+            self._snapshot_dirty = True
+
+    def get_references(self, filename):
+        """A paper's reference list, from its unsaved entry, the LRU cache or the store."""
+        entry = self.index_data.get(filename)
+        references = entry.get("references") if entry is not None else None
+        if references is not None:
+            return references
+        with self._reference_lock:
+            references = self._reference_cache.get(filename)
+            if references is not None:
+                self._reference_cache.move_to_end(filename)
+                metrics.incr("references.cache_hit")
+                return references
+        metrics.incr("references.cache_miss")
+        references = self.store.load_references(filename)
+        with self._reference_lock:
+            # A save may have cached a newer list while this one was loading
+            references = self._reference_cache.setdefault(filename, references)
+            while len(self._reference_cache) > REFERENCE_CACHE_SIZE:
+                self._reference_cache.popitem(last=False)
+        return references
+
+    def _cache_references(self, filename, references):
+        with self._reference_lock:
+            if references is None:
+                self._reference_cache.pop(filename, None)
+                return
+            self._reference_cache[filename] = references
+            self._reference_cache.move_to_end(filename)
+            while len(self._reference_cache) > REFERENCE_CACHE_SIZE:
+                self._reference_cache.popitem(last=False)
+
+    def _publish(self, changed):
+        """Makes a new immutable view current; called with the lock held after every change."""
+        with metrics.timer("index.publish", changed=len(changed)):
+            self._view = self._view.updated(self.index_data, changed)
+
+    def view(self):
+        """The current LibraryView. Consistent and safe to read from any thread without locking."""
+        return self._view
+
+    def save_snapshot(self):
+        """Writes the sidebar listing to the startup snapshot if it changed since the last write."""
+        with self._lock:
+            if not self._snapshot_dirty:
+                return
+            self._snapshot_dirty = False
+            view = self._view
+        papers = []
+        for filename, summary in view.summaries.items():
+            content_hash = (view.entries[filename].get("fingerprint") or {}).get("hash")
+            path = self.thumbnails.path_for(content_hash) if content_hash else None
+            papers.append(dict(summary, thumbnail=path) if path and os.path.exists(path) else summary)
         try:
-            with open(self.index_file, 'w', encoding='utf-8') as f:
-                json.dump(self.index_data, f, ensure_ascii=False, indent=4)
-        except Exception as e:
-            print(f"Error saving index: {e}")
+            with metrics.timer("snapshot.write", papers=len(papers)):
+                write_snapshot(self.papers_dir, papers)
+        except OSError as e:
+            print(f"Could not write library snapshot: {e}")
+            self._snapshot_dirty = True
+
+    def _on_pool_idle(self):
+        self.thumbnails.enforce_budget()
+        self.save_snapshot()
 
     def _scan_directory(self):
-        """Continuously scans the papers directory for new files to index."""
-        while True:
-            if os.path.exists(self.papers_dir):
-                for filename in os.listdir(self.papers_dir):
-                    if filename.lower().endswith('.pdf'):
-                        filepath = os.path.join(self.papers_dir, filename)
-                        
-                        # Use filename as unique key for simplicity in our local library
-                        if filename not in self.index_data:
-                            print(f"New PDF detected: {filename}. Starting indexing...")
-                            # 1. Immediately inject a placeholder so UI knows it is processing
-                            self.index_data[filename] = {
-                                "filename": filename,
-                                "filepath": filepath,
-                                "title": filename, # Temporary title
-                                "authors": [],
-                                "year": "",
-                                "status": "indexing",
-                                "cites": [],
-                                "cited_by": []
-                            }
-                            # 2. Block and do the heavy lifting
-                            self._index_paper(filepath, filename)
-            
-            # Re-evaluate network connections every cycle
-            self._update_network_links()
-            time.sleep(10)  # Scan every 10 seconds
+        """Scans the papers directory for changes, then sleeps until the watcher reports activity."""
+        watcher = self.watcher
+        self._backfill_memo_counts()
+        while not self._stop_scanning.is_set():
+            try:
+                with metrics.timer("scan.cycle"):
+                    self._scan_once()
+            except Exception as e:
+                print(f"Error scanning library: {e}")
+            if self.pool.is_idle():
+                # Nothing queued, so the pool's idle hook will not run for this scan
+                self.save_snapshot()
+            watcher.wait_for_change(self.settle_seconds if self._settling else None)
+
+    def scan_now(self):
+        """Runs one synchronous scan pass (without the scanner thread). Returns True if anything changed."""
+        self._backfill_memo_counts()
+        return self._scan_once()
+
+    def wait_until_idle(self, poll_interval=0.5, timeout=None):
+        """Blocks until queued indexing and search-index updates are done. Returns False on timeout."""
+        deadline = None if timeout is None else time.time() + timeout
+        while not (self.pool.is_idle() and self._search_idle()):
+            if deadline is not None and time.time() >= deadline:
+                return False
+            time.sleep(poll_interval)
+        return True
+
+    def _search_idle(self):
+        # Only a running worker drains the search queue; without one there is nothing to wait for
+        worker = self._search_thread
+        return worker is None or not worker.is_alive() or self._search_queue.unfinished_tasks == 0
+
+    def close(self):
+        """Finishes running indexing work and closes the on-disk stores.
+
+        Papers whose extraction or lookup had not started stay "indexing" in the saved index
+        and are queued again by the next scan, so an interrupted run resumes where it stopped."""
+        self.closed = True  # background readers (e.g. open prefetching) stop using it
+        self.stop()
+        # Returns once every running job's commit callback has returned, so the save below
+        # includes them
+        self.pool.shutdown(wait=True)
+        with self._lock:
+            self._save_index()
+            self.store.close()
+        self.save_snapshot()
+        if self.search_index and self._stop_search_worker():
+            self.search_index.close()
+        self.client.close()
+        if self.client.cache:
+            self.client.cache.close()
+
+    def _scan_once(self):
+        """Diffs the folder against stored (mtime, size, hash) fingerprints. Returns True if anything changed."""
+        if not os.path.exists(self.papers_dir):
+            return False
+
+        current = list_pdfs(self.papers_dir)
+        now = time.time()
+        self._settling = False
+        changed = False
+        pending = []  # (filename, filepath, fingerprint) needing (re-)indexing
+
+        # Hash outside the lock; only files whose stat signature changed are read
+        view = self._view
+        for filename, (mtime, size) in current.items():
+            filepath = os.path.join(self.papers_dir, filename)
+            entry = view.get(filename)
+            fingerprint = entry.get("fingerprint") if entry else None
+
+            unchanged = fingerprint and fingerprint.get("mtime") == mtime and fingerprint.get("size") == size
+            if unchanged and (entry.get("status") != "indexing" or self.pool.is_pending(filename)
+                              or filename in self._waiting_duplicates.get(fingerprint.get("hash"), ())):
+                continue
+            if unchanged:
+                # Left as "indexing" by an interrupted run; queue it again
+                pending.append((filename, filepath, fingerprint))
+                continue
+            if now - mtime < self.settle_seconds:
+                # Still being copied in; pick it up on the next (short) wake-up
+                self._settling = True
+                continue
+
+            try:
+                with metrics.timer("scan.hash_file", size=size):
+                    content_hash = hash_file(filepath)
+            except OSError as e:
+                print(f"Could not read {filename}: {e}")
+                continue
+            pending.append((filename, filepath, {"mtime": mtime, "size": size, "hash": content_hash}))
+
+        with self._lock:
+            to_index = []
+            to_submit = []
+            for filename, filepath, fingerprint in pending:
+                entry = self.index_data.get(filename)
+                old_fingerprint = entry.get("fingerprint") if entry else None
+                if entry and entry.get("status") == "ready" and (not old_fingerprint or old_fingerprint.get("hash") == fingerprint["hash"]):
+                    # Legacy entry without a fingerprint, or only touched: adopt the fingerprint, no re-index
+                    entry["fingerprint"] = fingerprint
+                    entry["filepath"] = filepath
+                    self._dirty_entries.add(filename)
+                    self._queue_search_updates([("updated", filename)])
+                    changed = True
+                else:
+                    to_index.append((filename, filepath, fingerprint))
+
+            # Anything in the index that is no longer on disk was either renamed or deleted
+            missing = [f for f in self.index_data if f not in current]
+            missing_by_hash = {}
+            for filename in missing:
+                fingerprint = self.index_data[filename].get("fingerprint")
+                if fingerprint and self.index_data[filename].get("status") == "ready":
+                    missing_by_hash.setdefault(fingerprint["hash"], filename)
+
+            new_files = []
+            for filename, filepath, fingerprint in to_index:
+                old_name = missing_by_hash.pop(fingerprint["hash"], None)
+                if old_name and filename not in self.index_data:
+                    print(f"Rename detected: {old_name} -> {filename}")
+                    references = self.get_references(old_name)
+                    entry = self.index_data.pop(old_name)
+                    entry["references"] = references  # saved again under the new name
+                    if self.duplicates.signature(old_name) is not None:
+                        entry["minhash"] = self.duplicates.signature(old_name)
+                    entry["filename"] = filename
+                    entry["filepath"] = filepath
+                    entry["fingerprint"] = fingerprint
+                    # Sidecars are named after the PDF, so the renamed file has its own annotations
+                    entry["memos_count"] = count_highlights(filepath)
+                    self.index_data[filename] = entry
+                    missing.remove(old_name)
+                    self._deleted.add(old_name)
+                    self._dirty_entries.add(filename)
+                    self._emit("removed", old_name)
+                    self._emit("added", filename)
+                    self._relink(old_name)
+                    self._relink(filename)
+                    self._reassign_duplicates(old_name, filename)
+                    changed = True
+                else:
+                    new_files.append((filename, filepath, fingerprint))
+
+            for filename in missing:
+                print(f"PDF removed: {filename}. Pruning from index.")
+                removed = self.index_data.pop(filename)
+                self._drop_derived(removed.get("fingerprint"))
+                self._hand_over_indexing(filename, removed.get("fingerprint"), to_submit)
+                self._deleted.add(filename)
+                self._emit("removed", filename)
+                self._relink(filename)
+                self._reassign_duplicates(filename)
+                changed = True
+
+            # Copies of a paper already in the library reuse its entry instead of being indexed
+            canonical_by_hash = {}
+            for name, entry in self.index_data.items():
+                fingerprint = entry.get("fingerprint")
+                if fingerprint and entry.get("status") == "ready" and not entry.get("duplicate_of"):
+                    canonical_by_hash.setdefault(fingerprint["hash"], name)
+
+            for filename, filepath, fingerprint in new_files:
+                old = self.index_data.pop(filename, None)
+                if old is not None:
+                    print(f"Modified PDF detected: {filename}. Re-indexing...")
+                    self._hand_over_indexing(filename, old.get("fingerprint"), to_submit)
+                    if (old.get("fingerprint") or {}).get("hash") != fingerprint["hash"]:
+                        self._drop_derived(old.get("fingerprint"))
+                    self._emit("status", filename)
+                else:
+                    print(f"New PDF detected: {filename}. Queued for indexing...")
+                    self._emit("added", filename)
+                original = canonical_by_hash.get(fingerprint["hash"])
+                if original is not None and original != filename:
+                    print(f"Duplicate of {original}: {filename}. Reusing its index entry.")
+                    metrics.incr("dedup.exact")
+                    self.index_data[filename] = self._duplicate_entry(filename, filepath, fingerprint, original)
+                else:
+                    # Immediately inject a placeholder so UI knows it is processing
+                    self.index_data[filename] = self._placeholder_entry(filename, filepath, fingerprint)
+                    if old is not None and "memos_count" in old:
+                        self.index_data[filename]["memos_count"] = old["memos_count"]
+                    first = self._indexing_hashes.get(fingerprint["hash"])
+                    if first is not None and first != filename and first in self.index_data:
+                        self._waiting_duplicates.setdefault(fingerprint["hash"], []).append(filename)
+                    else:
+                        self._indexing_hashes[fingerprint["hash"]] = filename
+                        to_submit.append((filename, filepath, fingerprint))
+                if old is not None:
+                    self._reassign_duplicates(filename)
+                self._dirty_entries.add(filename)
+                self._relink(filename)
+                changed = True
+
+            if changed:
+                self._save_index()
+        self._flush_events()
+
+        # Heavy lifting happens in the worker pool; results arrive via _commit_paper
+        for filename, filepath, fingerprint in to_submit:
+            self.pool.submit(filename, filepath, fingerprint)
+
+        return changed
+
+    def _placeholder_entry(self, filename, filepath, fingerprint=None):
+        return PaperRecord({
+            "filename": filename,
+            "filepath": filepath,
+            "title": filename, # Temporary title
+            "authors": [],
+            "year": "",
+            "status": "indexing",
+            "fingerprint": fingerprint,
+            "references": [],  # clears the stored list of a file being re-indexed
+            "cites": [],
+            "cited_by": []
+        })
+
+    def _duplicate_entry(self, filename, filepath, fingerprint, original):
+        """Index entry for a copy or another version of `original`, sharing its metadata."""
+        source = self.index_data[original]
+        entry = self._placeholder_entry(filename, filepath, fingerprint)
+        for key in ("title", "authors", "abstract", "year", "semantic_scholar_id"):
+            if key in source:
+                entry[key] = source[key]
+        if self.duplicates.signature(original) is not None:
+            entry["minhash"] = self.duplicates.signature(original)
+        entry["references"] = list(self.get_references(original))
+        entry["status"] = "ready"
+        entry["duplicate_of"] = original
+        entry["memos_count"] = count_highlights(filepath)
+        return entry
+
+    def _resolve_waiting_duplicates(self, filename, entry):
+        """Turns copies that waited for this paper into duplicates of it."""
+        content_hash = (entry.get("fingerprint") or {}).get("hash")
+        if self._indexing_hashes.get(content_hash) == filename:
+            del self._indexing_hashes[content_hash]
+        original = entry.get("duplicate_of") or filename
+        for name in self._waiting_duplicates.pop(content_hash, []):
+            waiting = self.index_data.get(name)
+            if waiting is None or waiting.get("status") != "indexing" or (waiting.get("fingerprint") or {}).get("hash") != content_hash:
+                continue
+            print(f"Duplicate of {original}: {name}. Reusing its index entry.")
+            metrics.incr("dedup.exact")
+            self.index_data[name] = self._duplicate_entry(name, waiting["filepath"], waiting["fingerprint"], original)
+            self._dirty_entries.add(name)
+            self._emit("updated", name)
+            self._relink(name)
+
+    def _hand_over_indexing(self, filename, fingerprint, to_submit):
+        """filename stopped indexing this content without committing it (it was modified, removed
+        or failed): the first copy waiting for it is indexed instead, the others wait for that
+        one. The copy's job is added to to_submit, for submitting outside the lock."""
+        content_hash = (fingerprint or {}).get("hash")
+        if content_hash is None or self._indexing_hashes.get(content_hash) != filename:
+            return
+        del self._indexing_hashes[content_hash]
+        waiting = []
+        for name in self._waiting_duplicates.pop(content_hash, []):
+            entry = self.index_data.get(name)
+            if entry is not None and entry.get("status") == "indexing" and (entry.get("fingerprint") or {}).get("hash") == content_hash:
+                waiting.append(name)
+        if not waiting:
+            return
+        first = waiting.pop(0)
+        self._indexing_hashes[content_hash] = first
+        if waiting:
+            self._waiting_duplicates[content_hash] = waiting
+        entry = self.index_data[first]
+        to_submit.append((first, entry.get("filepath") or os.path.join(self.papers_dir, first), entry["fingerprint"]))
+
+    def _on_index_failed(self, job):
+        # The failed paper stays "indexing" and is retried by the next scan; copies waiting for
+        # it are not left waiting for a commit that will not come
+        to_submit = []
+        with self._lock:
+            self._hand_over_indexing(job["filename"], job.get("fingerprint"), to_submit)
+        for filename, filepath, fingerprint in to_submit:
+            self.pool.submit(filename, filepath, fingerprint)
+
+    def _reassign_duplicates(self, old_name, new_name=None):
+        """Points duplicates of a renamed paper at its new name. When the paper was removed or
+        re-indexed, the first duplicate becomes the canonical copy and takes over the others."""
+        dependents = [f for f, e in self.index_data.items() if e.get("duplicate_of") == old_name]
+        if not dependents:
+            return
+        if new_name is None:
+            new_name = dependents.pop(0)
+            del self.index_data[new_name]["duplicate_of"]
+            self._dirty_entries.add(new_name)
+            self._emit("updated", new_name)
+            self._relink(new_name)
+        for filename in dependents:
+            self.index_data[filename]["duplicate_of"] = new_name
+            self._dirty_entries.add(filename)
+            self._emit("updated", filename)
+
+    def _track_duplicate(self, filename, entry):
+        """Keeps the near-duplicate index in step with one paper's entry (None when removed).
+        A new signature rides on the entry until it is saved; otherwise the index has it."""
+        signature = entry.get("minhash", self.duplicates.signature(filename)) if entry is not None else None
+        if signature:
+            self.duplicates.add(filename, signature, canonical=_is_canonical(entry))
+        else:
+            self.duplicates.remove(filename)
+
+    def _find_near_duplicate(self, filename, signature):
+        with self._lock:
+            match = self.duplicates.find(signature, exclude=filename)
+            if match is None or match[0] not in self.index_data:
+                return None
+            return match
+
+    def _index_paper(self, filepath, filename, fingerprint=None):
+        """Synchronously runs both indexing stages for one paper (the pool runs them concurrently)."""
+        job = {"filename": filename, "filepath": filepath, "fingerprint": fingerprint}
+        local = extract_local(filepath, filename, fingerprint, cache_dir=self.derived_dir)
+        self._commit_paper(job, self._resolve_remote(job, local))
+
+    def _resolve_remote(self, job, local):
+        """Builds the index entry from the local extraction result, enriched with Semantic Scholar."""
+        filepath, filename = job["filepath"], job["filename"]
+        local = local or {}
+        for name, elapsed_ms in local.get("timings", {}).items():
+            metrics.observe(f"extraction.{name}", elapsed_ms)
+        # Another version of a paper we already have: reuse its metadata, no API calls
+        signature = local.get("minhash")
+        match = self._find_near_duplicate(filename, signature) if signature else None
+        if match:
+            original, score = match
+            print(f"Near-duplicate of {original} ({score:.0%} similar): {filename}. Reusing its index entry.")
+            metrics.incr("dedup.near")
+            with self._lock:
+                entry = self._duplicate_entry(filename, filepath, job.get("fingerprint"), original)
+            entry["minhash"] = signature
+            return entry
 
-    def _index_paper(self, filepath, filename):
-        """Extracts basic info via PyMuPDF, then enriches with Semantic Scholar."""
         # 1. Extract base title from filename or first page text
-        base_title = self._guess_title(filepath, filename)
+        base_title = local.get("title") or self._guess_title(filepath, filename)
         
         # Initialize basic entry
         paper_entry = {
@@ -79,14 +662,27 @@ class IndexManager:
             "abstract": "",
             "year": "",
             "status": "indexing",
+            "fingerprint": job.get("fingerprint"),
             "semantic_scholar_id": None,
+            "memos_count": count_highlights(filepath),
+            "minhash": signature,
             "references": [], # the raw strings or dicts from the paper
             "cites": [],      # indices of local papers this paper cites
             "cited_by": []    # indices of local papers that cite this paper
         }
         
-        # 2. Try to get rich data from Semantic Scholar
-        rich_data = self._query_semantic_scholar_by_title(base_title)
+        # 2. Try to get rich data from Semantic Scholar: by the arXiv id / DOI found on the paper
+        # when there is one (batched with other papers, no search needed), otherwise by title
+        paper_id = local.get("paper_id")
+        rich_data = self._lookup_semantic_scholar_by_id(paper_id)
+        # An id from the file name is the paper's own; one printed on the page must name a paper
+        # with this title, or it is another paper's (e.g. one cited near the top of the page)
+        if rich_data and paper_id != find_paper_id(filename, None) and not title_matches(rich_data.get("title"), base_title, local.get("header")):
+            print(f"{paper_id} on the first page of {filename} is \"{rich_data.get('title')}\"; searching by title instead")
+            metrics.incr("s2.id_mismatch")
+            rich_data = None
+        if not rich_data:
+            rich_data = self._query_semantic_scholar_by_title(base_title)
         
         if rich_data:
             print(f"Found Semantic Scholar match for: {base_title}")
@@ -96,170 +692,324 @@ class IndexManager:
             paper_entry["year"] = rich_data.get("year", "")
             paper_entry["semantic_scholar_id"] = rich_data.get("paperId")
             
-            # Fetch references using the paperId
-            paper_entry["references"] = self._fetch_references_from_api(rich_data.get("paperId"))
+            # Batch lookups already carry the references; search results are looked up by paperId
+            paper_entry["references"] = self._fetch_references_from_api(rich_data)
         else:
             print(f"No Semantic Scholar match for: {base_title}. Using local fallback.")
-            # Fallback to local parsing for references
-            paper_entry["references"] = self._extract_references_local(filepath)
+            # Fallback to local parsing for references (already done by the extraction stage)
+            if "references" in local:
+                paper_entry["references"] = local["references"]
+            else:
+                paper_entry["references"] = self._extract_references_local(filepath)
             
         paper_entry["status"] = "ready"
-        self.index_data[filename] = paper_entry
-        self._save_index()
+        return paper_entry
+
+    def _commit_paper(self, job, paper_entry):
+        filename = job["filename"]
+        with self._lock:
+            if filename not in self.index_data:
+                # Removed from disk while it was being indexed
+                return
+            paper_entry = self.index_data[filename] = PaperRecord(paper_entry)
+            self._dirty_entries.add(filename)
+            self._emit("updated", filename)
+            self._relink(filename)
+            self._resolve_waiting_duplicates(filename, paper_entry)
+            self._save_index()
+        self._flush_events()
         print(f"Indexing complete for: {filename}")
 
+    def set_memo_count(self, filename, count):
+        """Records a paper's highlight count so listing the library never reads sidecars."""
+        with self._lock:
+            entry = self.index_data.get(filename)
+            if entry is None or entry.get("memos_count") == count:
+                return
+            entry["memos_count"] = count
+            self._dirty_entries.add(filename)
+            self._emit("updated", filename)
+            self._save_index()
+        self._flush_events()
+
+    def _backfill_memo_counts(self):
+        """One-time count for entries indexed before memo counts were stored in the index."""
+        missing = [(f, e.get("filepath") or os.path.join(self.papers_dir, f))
+                   for f, e in self._view.entries.items() if "memos_count" not in e]
+        if not missing:
+            return
+        counts = {filename: count_highlights(filepath) for filename, filepath in missing}
+        with self._lock:
+            for filename, count in counts.items():
+                entry = self.index_data.get(filename)
+                if entry is not None and "memos_count" not in entry:
+                    entry["memos_count"] = count
+                    self._dirty_entries.add(filename)
+                    self._emit("updated", filename)
+            self._save_index()
+        self._flush_events()
+
     def _guess_title(self, filepath, filename):
-        """Attempts to guess the title. Semantic scholar search is fuzzy so this doesn't need to be perfect."""
-        # Clean filename first
-        clean_name = os.path.splitext(filename)[0]
-        # Just use the filename. Parsing the first page is too unreliable for Korean theses
-        # and frequently corrupts the Semantic Scholar search query.
-        return clean_name
+        return guess_title(filepath, filename)
 
     def _query_semantic_scholar_by_title(self, title):
         """Searches Semantic Scholar API by title and returns the best match."""
         try:
-            params = {
-                "query": title,
-                "limit": 1,
-                "fields": "title,authors,abstract,year"
-            }
-            # Add a small delay to respect API rate limits (100 req / 5 min without key)
-            time.sleep(1)
-            response = requests.get(self.api_url, params=params)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("data") and len(data["data"]) > 0:
-                    return data["data"][0]
+            return self.client.search_by_title(title)
         except Exception as e:
             print(f"Error querying Semantic Scholar: {e}")
         return None
 
-    def _fetch_references_from_api(self, paper_id):
-        """Fetches the reference list for a given paper ID."""
+    def _lookup_semantic_scholar_by_id(self, paper_id):
+        """Looks a paper up by "ARXIV:..." / "DOI:..." id, sharing a batch request with other workers."""
         if not paper_id:
-            return []
-            
+            return None
         try:
-            url = f"{self.api_details_url.format(paper_id=paper_id)}/references"
-            params = {
-                "fields": "title,authors,year",
-                "limit": 100
-            }
-            time.sleep(1)
-            response = requests.get(url, params=params)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("data"):
-                    refs = []
-                    for ref in data["data"]:
-                        if ref.get("citedPaper"):
-                            cp = ref["citedPaper"]
-                            # Format into our standard reference dictionary
-                            author_str = ", ".join([a.get("name", "") for a in cp.get("authors", []) if a.get("name")])
-                            title_str = cp.get("title", "")
-                            year_str = str(cp.get("year", ""))
-                            text_rep = f"{author_str} ({year_str}). {title_str}"
-                            
-                            refs.append({
-                                "text": text_rep,
-                                "title": title_str, # Store raw title for easier matching later
-                                "semantic_scholar_id": cp.get("paperId")
-                            })
-                    return refs
+            return self.batcher.get(paper_id)
+        except Exception as e:
+            print(f"Error looking up {paper_id} on Semantic Scholar: {e}")
+        return None
+
+    def _fetch_references_from_api(self, rich_data):
+        """Fetches the full reference list of a Semantic Scholar paper record."""
+        try:
+            paper_id = rich_data.get("paperId")
+            record = rich_data if "references" in rich_data else self.batcher.get(paper_id) if paper_id else None
+            if record:
+                return self.client.paper_references(record)
+            return self.client.fetch_references(paper_id)
         except Exception as e:
             print(f"Error fetching references: {e}")
         return []
 
     def _extract_references_local(self, pdf_path):
-        """Fallback local extraction (similar to old main.py logic)."""
+        return extract_references_local(pdf_path, self._content_hash(pdf_path), self.derived_dir)
+
+    def _content_hash(self, pdf_path):
+        """Content hash from the stored fingerprint when it is current, otherwise by hashing the file."""
+        entry = self._view.get(os.path.basename(pdf_path))
+        fingerprint = entry.get("fingerprint") if entry else None
         try:
-            doc = fitz.open(pdf_path)
-            text_from_back = ""
-            # Theses can have many appendix pages, so check the last 20 pages
-            start_page = max(0, len(doc) - 20)
-            for i in range(start_page, len(doc)):
-                text_from_back += doc[i].get_text()
-                
-            # Relaxed regex to allow matching even if it's the very first string of the block
-            matches = list(re.finditer(r'(?:\n|^). {0,15}?(References|REFERENCES|Bibliography|참고문헌|참\s*고\s*문\s*헌)\s*\n(.*)', text_from_back, re.DOTALL))
-            if matches:
-                ref_text = matches[-1].group(2)
-                ref_text = "\n" + ref_text.lstrip() # Guarantee standard delimiter behavior so list indexes align
-                # Split by [number], number., or number) capturing erratic spaces and newlines
-                raw_refs = re.split(r'\n\s*\[[0-9]+\]\s*\n|\n\s*\[[0-9]+\]\s*|\n\s*[0-9]+\.\s*|\n\s*[0-9]+\)\s*', ref_text)
-                clean_refs = []
-                for r in raw_refs:
-                    r = r.strip().replace('\n', ' ')
-                    r = re.sub(r'\s+', ' ', r) # Clean erratic spacing
-                    if len(r) > 10:
-                        clean_refs.append({"text": r})
-                return clean_refs[:80] # Increase limit since some theses have many refs
-        except Exception:
+            st = os.stat(pdf_path)
+            if fingerprint and fingerprint.get("mtime") == st.st_mtime and fingerprint.get("size") == st.st_size:
+                return fingerprint["hash"]
+            return hash_file(pdf_path)
+        except OSError:
+            return None
+
+    def contains(self, pdf_path):
+        """Whether pdf_path is a file of this library (its folder), not just one with the same name."""
+        folder = os.path.dirname(os.path.abspath(pdf_path))
+        return os.path.normcase(folder) == os.path.normcase(os.path.abspath(self.papers_dir))
+
+    def get_derived(self, pdf_path):
+        """Page text / reference section / parsed references for any PDF. Library papers use the
+        per-hash cache in the library; other PDFs are neither hashed nor written there."""
+        try:
+            st = os.stat(pdf_path)
+            key = (os.path.abspath(pdf_path), st.st_mtime, st.st_size)
+        except OSError:
+            key = None
+        with self._derived_lock:
+            derived = self._recent_derived.get(key)
+            if derived is not None:
+                self._recent_derived.move_to_end(key)
+                return derived
+        if self.contains(pdf_path):
+            derived = load_derived(pdf_path, self._content_hash(pdf_path), self.derived_dir)
+        else:
+            derived = build_derived(pdf_path)
+        if key is not None:
+            with self._derived_lock:
+                self._recent_derived[key] = derived
+                while len(self._recent_derived) > DERIVED_MEMORY_SIZE:
+                    self._recent_derived.popitem(last=False)
+        return derived
+
+    def _drop_derived(self, fingerprint):
+        # Only drop cached data when no other paper (e.g. a copy) has the same content
+        if not fingerprint:
+            return
+        if not any((e.get("fingerprint") or {}).get("hash") == fingerprint["hash"] for e in self.index_data.values()):
+            self.derived_cache.delete(fingerprint["hash"])
+
+    def _queue_search_updates(self, events):
+        if not self.search_index:
+            return  # no worker would ever take them off the queue
+        for _kind, filename in events:
+            self._search_queue.put(filename)
+
+    def _stop_search_worker(self):
+        """Stops the search worker. Pending updates are dropped; the next start catches up
+        with them. Returns False if the worker is still busy after 30s."""
+        try:
+            while True:
+                self._search_queue.get_nowait()
+                self._search_queue.task_done()
+        except queue.Empty:
             pass
-        return []
+        self._search_queue.put(None)
+        self._search_thread.join(timeout=30)
+        if self._search_thread.is_alive():
+            print(f"Search index worker of {self.papers_dir} did not stop within 30s; leaving its index open")
+            return False
+        return True
+
+    def _search_worker(self):
+        """Brings the search index in line with the library, one changed paper at a time."""
+        while True:
+            filename = self._search_queue.get()
+            if filename is None:
+                self._search_queue.task_done()
+                return
+            try:
+                self._sync_search_document(filename)
+            except Exception as e:
+                print(f"Error updating search index for {filename}: {e}")
+            finally:
+                self._search_queue.task_done()
+
+    def _sync_search_document(self, filename):
+        entry = self._view.get(filename)
+        if entry is None:
+            if self.search_index.indexed_hash(filename) is not None:
+                self.search_index.remove_document(filename)
+            return
+        content_hash = (entry.get("fingerprint") or {}).get("hash")
+        if entry.get("status") != "ready" or not content_hash or self.search_index.indexed_hash(filename) == content_hash:
+            return # still indexing, or already up to date (most "updated" events are link changes)
+        # Page text comes from the derived cache the extraction stage just filled
+        derived = load_derived(entry.get("filepath") or os.path.join(self.papers_dir, filename), content_hash, self.derived_dir)
+        if derived["page_count"]:
+            with metrics.timer("search.index_document", pages=derived["page_count"]):
+                self.search_index.index_document(filename, content_hash, derived["page_texts"])
+
+    def search(self, query, limit=20):
+        """Ranked full-text hits across the library, with title and path for each hit."""
+        if not self.search_index:
+            return []
+        with metrics.timer("search.query"):
+            hits = self.search_index.search(query, limit)
+        view = self._view
+        for hit in hits:
+            data = view.get(hit["filename"], {})
+            hit["title"] = data.get("title", hit["filename"])
+            hit["filepath"] = data.get("filepath", os.path.join(self.papers_dir, hit["filename"]))
+        return hits
+
+    def get_thumbnail(self, filename):
+        """Path of the paper's first-page thumbnail. When it is missing (indexed before thumbnails
+        existed, or evicted) it is rendered in the background and an "updated" event follows."""
+        entry = self._view.get(filename)
+        content_hash = (entry.get("fingerprint") or {}).get("hash") if entry else None
+        if not content_hash or entry.get("status") != "ready":
+            return None
+        path = self.thumbnails.get(content_hash)
+        if path is None:
+            self._request_thumbnail(filename, entry.get("filepath") or os.path.join(self.papers_dir, filename), content_hash)
+        return path
+
+    def _request_thumbnail(self, filename, filepath, content_hash):
+        with self._lock:
+            if content_hash in self._thumbnail_jobs or content_hash in self._thumbnail_failed:
+                return
+            self._thumbnail_jobs.add(content_hash)
+
+        def done(future):
+            with self._lock:
+                self._thumbnail_jobs.discard(content_hash)
+                try:
+                    rendered = future.result() is not None
+                except Exception as e:
+                    print(f"Could not render thumbnail for {filename}: {e}")
+                    rendered = False
+                if not rendered:
+                    self._thumbnail_failed.add(content_hash)
+                elif filename in self.index_data:
+                    self._emit("updated", filename)
+            self._flush_events()
+
+        self.pool.run_local(render_thumbnail, filepath, content_hash, self.thumbnails.cache_dir).add_done_callback(done)
 
     def _update_network_links(self):
-        """Cross-references papers to figure out Cites / Cited By relationships locally."""
-        # Wipe current links
-        for filename, data in self.index_data.items():
-            data["cites"] = []
-            data["cited_by"] = []
-            
-        filenames = list(self.index_data.keys())
-        
-        for p1_file, p1_data in self.index_data.items():
-            for p2_file in filenames:
-                if p1_file == p2_file:
-                    continue
-                    
-                p2_data = self.index_data[p2_file]
-                
-                # Check if p1 cites p2
-                cites_p2 = False
-                
-                # Method A: Semantic Scholar ID matching (Highly accurate)
-                if p2_data.get("semantic_scholar_id"):
-                    target_id = p2_data["semantic_scholar_id"]
-                    for ref in p1_data.get("references", []):
-                        if ref.get("semantic_scholar_id") == target_id:
-                            cites_p2 = True
-                            break
-                
-                # Method B: Title fuzzy matching (Fallback)
-                if not cites_p2 and p2_data.get("title"):
-                    target_title_lower = p2_data["title"].lower()
-                    if len(target_title_lower) > 10: # Only try matching substantial titles
-                        for ref in p1_data.get("references", []):
-                            ref_text_lower = ref.get("text", "").lower()
-                            if target_title_lower in ref_text_lower:
-                                cites_p2 = True
-                                break
-                                
-                if cites_p2:
-                    if p2_file not in p1_data["cites"]:
-                        p1_data["cites"].append(p2_file)
-                    if p1_file not in p2_data["cited_by"]:
-                        p2_data["cited_by"].append(p1_file)
-                        
-        self._save_index()
+        """Rebuilds the citation indexes from scratch (startup only) and saves if any link changed."""
+        with self._lock, metrics.timer("links.rebuild", papers=len(self.index_data)):
+            self.linker = CitationLinker(self._find_citing)
+            linked = {f for f, data in self.index_data.items() if not data.get("duplicate_of")}
+            # Register every paper first, then stream the stored reference lists past the titles
+            self.linker.rebuild(((f, self.index_data[f]) for f in linked),
+                                ((f, refs) for f, refs in self.store.iter_references() if f in linked))
+            if self._apply_links(self.index_data.keys()):
+                self._save_index()
+
+    def _find_citing(self, paper_id, title):
+        """Papers whose references carry paper_id or quote the (normalized) title, for the
+        linker: searched in the store, except for reference lists that are not saved yet."""
+        unsaved = {f for f in self._dirty_entries if self.index_data.get(f, {}).get("references") is not None}
+        found = self.store.find_citing(paper_id, title) - unsaved
+        for filename in unsaved:
+            for ref in self.index_data[filename]["references"]:
+                if (paper_id and ref.get("semantic_scholar_id") == paper_id) or (title and title in normalize_text(ref.get("text"))):
+                    found.add(filename)
+                    break
+        return found
+
+    def _relink(self, filename):
+        """Updates Cites / Cited By for the edges touched by one added, changed or removed paper."""
+        with self._lock, metrics.timer("links.relink"):
+            entry = self.index_data.get(filename)
+            self._track_duplicate(filename, entry)
+            if entry is None or entry.get("duplicate_of"):
+                # Duplicates stay out of the citation graph; links go to the canonical copy
+                touched = self.linker.remove(filename) | {filename}
+            else:
+                touched = self.linker.add(filename, self._link_input(filename, self.get_references(filename)))
+            metrics.incr("links.touched", len(touched))
+            return self._apply_links(touched)
+
+    def _link_input(self, filename, stored_references):
+        """What the linker needs to know about a paper; unsaved references win over stored ones."""
+        entry = self.index_data[filename]
+        references = entry.get("references")
+        return {
+            "semantic_scholar_id": entry.get("semantic_scholar_id"),
+            "title": entry.get("title"),
+            "references": stored_references if references is None else references
+        }
+
+    def _apply_links(self, filenames):
+        """Copies linker edges into the index entries. Returns True if any entry changed."""
+        changed = False
+        for filename in list(filenames):
+            data = self.index_data.get(filename)
+            if data is None:
+                continue
+            cites = self.linker.cites_of(filename)
+            cited_by = self.linker.cited_by_of(filename)
+            if data.get("cites") != cites or data.get("cited_by") != cited_by:
+                data["cites"] = cites
+                data["cited_by"] = cited_by
+                self._dirty_links.add(filename)
+                self._emit("updated", filename)
+                changed = True
+        return changed
         
-    def get_paper_data(self, filename):
-        return self.index_data.get(filename, {})
+    def get_paper_data(self, filename, view=None):
+        """Everything known about one paper (in `view`, default the current one) as a plain
+        dict, including its reference list."""
+        entry = (view or self._view).get(filename)
+        if entry is None:
+            return {}
+        data = entry.to_dict()
+        data.pop("minhash", None)
+        data["references"] = self.get_references(filename)
+        return data
         
+    def get_paper_summary(self, filename):
+        return self._view.summaries.get(filename)
+
     def get_all_papers_summary(self):
-        summary = []
-        for filename, data in self.index_data.items():
-            summary.append({
-                "filename": filename,
-                "filepath": data.get("filepath", ""),
-                "title": data.get("title", filename),
-                "authors": data.get("authors", []),
-                "year": data.get("year", ""),
-                "status": data.get("status", "ready"), # Default to ready for legacy entries
-                "cites_count": len(data.get("cites", [])),
-                "cited_by_count": len(data.get("cited_by", []))
-            })
-        return summary
+        return list(self._view.summaries.values())
+
+    def get_indexing_progress(self):
+        return self.pool.progress()
@@ -0,0 +1,283 @@
+import os
+import json
+import sqlite3
+import threading
+from array import array
+from itertools import groupby
+from paper_record import PaperRecord
+from citation_linker import normalize_text
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    filename TEXT PRIMARY KEY,
+    filepath TEXT,
+    title TEXT,
+    authors TEXT,               -- JSON list of names
+    abstract TEXT,
+    year TEXT,
+    status TEXT,
+    semantic_scholar_id TEXT,
+    fingerprint TEXT,           -- JSON {mtime, size, hash}
+    extra TEXT                  -- JSON of any other entry fields
+);
+CREATE TABLE IF NOT EXISTS paper_references (
+    filename TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    text TEXT,
+    title TEXT,
+    semantic_scholar_id TEXT,
+    PRIMARY KEY (filename, position)
+);
+CREATE TABLE IF NOT EXISTS citations (
+    citing TEXT NOT NULL,
+    cited TEXT NOT NULL,
+    PRIMARY KEY (citing, cited)
+);
+CREATE INDEX IF NOT EXISTS idx_citations_cited ON citations(cited);
+CREATE TABLE IF NOT EXISTS paper_signatures (
+    filename TEXT PRIMARY KEY,
+    minhash BLOB                -- array('I') bytes, see dedup.py
+);
+CREATE INDEX IF NOT EXISTS idx_references_paper_id ON paper_references(semantic_scholar_id);
+"""
+
+# Entry keys that have their own column/table; everything else goes into `extra`
+_COLUMNS = ("filename", "filepath", "title", "authors", "abstract", "year", "status", "semantic_scholar_id", "fingerprint")
+_DERIVED = ("references", "cites", "cited_by", "minhash")
+
+
+class IndexStore:
+    """SQLite-backed storage for a library index.
+
+    Papers, their references and the citation edges live in separate tables, so a change
+    to one paper is a small transactional upsert instead of a rewrite of the whole index.
+    WAL mode lets readers (other threads, the CLI) read while the scanner writes.
+    """
+
+    def __init__(self, db_path, legacy_json_path=None):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.create_function("normalize_text", 1, normalize_text, deterministic=True)
+        self._text_index = self._create_text_index()
+        self._move_signatures()
+        self._conn.commit()
+        # The JSON is renamed once migrated; while it is there and no paper is stored, migrate
+        if legacy_json_path and os.path.exists(legacy_json_path) and not self._conn.execute("SELECT 1 FROM papers LIMIT 1").fetchone():
+            self._migrate_from_json(legacy_json_path)
+
+    def _create_text_index(self):
+        """Trigram full-text index of the normalized reference texts, so finding the papers
+        that quote a title does not need the texts in memory. Rows share the rowid of their
+        paper_references row (this database is never VACUUMed, which could renumber them).
+        Needs SQLite 3.34+; returns False without it, and find_citing() scans instead."""
+        exists = self._conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'reference_texts'").fetchone()
+        if exists:
+            return True
+        try:
+            self._conn.execute("CREATE VIRTUAL TABLE reference_texts USING fts5(text, tokenize='trigram')")
+        except sqlite3.OperationalError as e:
+            print(f"Reference text index unavailable ({e}); citation lookups scan reference texts instead")
+            return False
+        # Libraries indexed before the text index existed
+        self._conn.execute("INSERT INTO reference_texts (rowid, text) SELECT rowid, normalize_text(text) FROM paper_references")
+        return True
+
+    def _move_signatures(self):
+        # Signatures used to be stored with the other fields in `extra`
+        rows = self._conn.execute("SELECT filename, extra FROM papers WHERE extra LIKE '%\"minhash\"%'").fetchall()
+        for filename, extra in rows:
+            extra = json.loads(extra)
+            signature = extra.pop("minhash", None)
+            if signature:
+                self._conn.execute("INSERT OR REPLACE INTO paper_signatures (filename, minhash) VALUES (?, ?)",
+                                   (filename, array('I', signature).tobytes()))
+            self._conn.execute("UPDATE papers SET extra = ? WHERE filename = ?",
+                               (json.dumps(extra, ensure_ascii=False) if extra else None, filename))
+
+    def _migrate_from_json(self, json_path):
+        """One-time import of the old papers_index.json; the file is kept as *.migrated."""
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+            if not isinstance(legacy, dict):
+                raise ValueError(f"expected an object of papers, found {type(legacy).__name__}")
+            legacy = {filename: data for filename, data in legacy.items() if isinstance(data, dict)}
+        except Exception as e:
+            print(f"Error loading legacy index for migration: {e}")
+            return
+        entries = list(legacy.values())
+        links = {data.get("filename", filename): data.get("cites", []) for filename, data in legacy.items()}
+        for filename, data in legacy.items():
+            data.setdefault("filename", filename)
+        if not self.apply(upserts=entries, links=links):
+            # Keep the JSON where it is, so the next start can try again
+            print(f"Migration of {os.path.basename(json_path)} failed; it will be retried")
+            return
+        os.replace(json_path, json_path + ".migrated")
+        print(f"Migrated {len(entries)} papers from {os.path.basename(json_path)}")
+
+    def load_all(self):
+        """Loads every paper as a PaperRecord with cites and cited_by.
+
+        Reference lists and signatures stay on disk; see load_references(), iter_references()
+        and iter_signatures()."""
+        with self._lock:
+            papers = self._conn.execute(f"SELECT {', '.join(_COLUMNS)}, extra FROM papers").fetchall()
+            edges = self._conn.execute("SELECT citing, cited FROM citations").fetchall()
+
+        index_data = {}
+        for row in papers:
+            entry = dict(zip(_COLUMNS, row[:-1]))
+            entry["authors"] = json.loads(entry["authors"]) if entry["authors"] else []
+            entry["fingerprint"] = json.loads(entry["fingerprint"]) if entry["fingerprint"] else None
+            entry.update(json.loads(row[-1]) if row[-1] else {})
+            entry["cites"] = []
+            entry["cited_by"] = []
+            record = PaperRecord(entry)
+            index_data[record["filename"]] = record
+
+        for citing, cited in edges:
+            if citing in index_data and cited in index_data:
+                index_data[citing]["cites"].append(cited)
+                index_data[cited]["cited_by"].append(citing)
+        return index_data
+
+    def load_references(self, filename):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT text, title, semantic_scholar_id FROM paper_references WHERE filename = ? ORDER BY position",
+                (filename,)
+            ).fetchall()
+        return [_reference_dict(*row) for row in rows]
+
+    def iter_references(self):
+        """Yields (filename, [reference dicts]) for every paper with references, by filename.
+        Holds the store lock until the iteration is finished."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT filename, text, title, semantic_scholar_id FROM paper_references ORDER BY filename, position"
+            )
+            for filename, group in groupby(rows, key=lambda row: row[0]):
+                yield filename, [_reference_dict(text, title, paper_id) for _, text, title, paper_id in group]
+
+    def iter_signatures(self):
+        """Yields (filename, array('I') MinHash signature) for every paper that has one."""
+        with self._lock:
+            rows = self._conn.execute("SELECT filename, minhash FROM paper_signatures").fetchall()
+        for filename, blob in rows:
+            signature = array('I')
+            signature.frombytes(blob)
+            yield filename, signature
+
+    def find_citing(self, paper_id, title=None):
+        """Filenames whose stored references carry paper_id or contain title (normalized)."""
+        with self._lock:
+            found = set()
+            if paper_id:
+                found.update(row[0] for row in self._conn.execute(
+                    "SELECT DISTINCT filename FROM paper_references WHERE semantic_scholar_id = ?", (paper_id,)))
+            if not title:
+                return found
+            if self._text_index:
+                # A trigram phrase query matches substrings; the check below drops false positives
+                rows = self._conn.execute(
+                    "SELECT r.filename, t.text FROM reference_texts t JOIN paper_references r ON r.rowid = t.rowid "
+                    "WHERE reference_texts MATCH ?", ('"' + title.replace('"', '""') + '"',))
+            else:
+                rows = self._conn.execute("SELECT filename, normalize_text(text) FROM paper_references")
+            found.update(filename for filename, text in rows if filename not in found and title in text)
+            return found
+
+    def apply(self, upserts=(), deletes=(), links=None):
+        """Writes a batch of changes in one transaction.
+
+        upserts: index entries to insert/replace (paper row, and the reference list and signature
+                 if the entry has them)
+        deletes: filenames to drop together with their references and edges
+        links:   {filename: [cited filenames]} replacing each paper's outgoing edges
+        Returns False if the transaction failed.
+        """
+        with self._lock:
+            try:
+                with self._conn:
+                    for filename in deletes:
+                        self._conn.execute("DELETE FROM papers WHERE filename = ?", (filename,))
+                        self._delete_references(filename)
+                        self._conn.execute("DELETE FROM paper_signatures WHERE filename = ?", (filename,))
+                        self._conn.execute("DELETE FROM citations WHERE citing = ? OR cited = ?", (filename, filename))
+                    for entry in upserts:
+                        self._upsert(entry)
+                    for filename, cites in (links or {}).items():
+                        self._conn.execute("DELETE FROM citations WHERE citing = ?", (filename,))
+                        self._conn.executemany(
+                            "INSERT OR IGNORE INTO citations (citing, cited) VALUES (?, ?)",
+                            [(filename, cited) for cited in cites]
+                        )
+                return True
+            except Exception as e:
+                print(f"Error saving index: {e}")
+                return False
+
+    def _upsert(self, entry):
+        filename = entry["filename"]
+        extra = {k: v for k, v in entry.items() if k not in _COLUMNS and k not in _DERIVED}
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO papers ({', '.join(_COLUMNS)}, extra) VALUES ({', '.join('?' * (len(_COLUMNS) + 1))})",
+            (
+                filename,
+                entry.get("filepath"),
+                entry.get("title"),
+                json.dumps(entry.get("authors") or [], ensure_ascii=False),
+                entry.get("abstract"),
+                str(entry.get("year") or ""),
+                entry.get("status"),
+                entry.get("semantic_scholar_id"),
+                json.dumps(entry["fingerprint"]) if entry.get("fingerprint") else None,
+                json.dumps(extra, ensure_ascii=False) if extra else None
+            )
+        )
+        if "minhash" in entry:
+            # Like reference lists, signatures are only held in the entry until they are saved
+            if entry["minhash"]:
+                self._conn.execute("INSERT OR REPLACE INTO paper_signatures (filename, minhash) VALUES (?, ?)",
+                                   (filename, array('I', entry["minhash"]).tobytes()))
+            else:
+                self._conn.execute("DELETE FROM paper_signatures WHERE filename = ?", (filename,))
+        if "references" not in entry:
+            return # Unchanged; reference lists are only held in memory until they are saved
+        self._delete_references(filename)
+        self._conn.executemany(
+            "INSERT INTO paper_references (filename, position, text, title, semantic_scholar_id) VALUES (?, ?, ?, ?, ?)",
+            [(filename, i, r.get("text"), r.get("title"), r.get("semantic_scholar_id"))
+             for i, r in enumerate(entry.get("references") or [])]
+        )
+        if self._text_index:
+            self._conn.execute(
+                "INSERT INTO reference_texts (rowid, text) SELECT rowid, normalize_text(text) FROM paper_references WHERE filename = ?",
+                (filename,)
+            )
+
+    def _delete_references(self, filename):
+        if self._text_index:
+            self._conn.execute(
+                "DELETE FROM reference_texts WHERE rowid IN (SELECT rowid FROM paper_references WHERE filename = ?)",
+                (filename,)
+            )
+        self._conn.execute("DELETE FROM paper_references WHERE filename = ?", (filename,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _reference_dict(text, title, paper_id):
+    ref = {"text": text or ""}
+    if title is not None:
+        ref["title"] = title
+    if paper_id is not None:
+        ref["semantic_scholar_id"] = paper_id
+    return ref
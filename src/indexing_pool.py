@@ -0,0 +1,266 @@
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from metrics import metrics
+
+
+class IndexingPool:
+    """Two-stage indexing job queue.
+
+    Stage 1 (local_stage) is CPU-bound PyMuPDF work and runs in a process pool across cores.
+    Stage 2 (remote_stage) is network-bound API work and runs in a small thread pool; the
+    client it uses is responsible for rate limiting. on_done(job, entry) receives the result;
+    on_failed(job) is told about current jobs that raised instead.
+    """
+
+    def __init__(self, local_stage, remote_stage, on_done, on_idle=None, process_workers=None, api_workers=4,
+                 on_failed=None):
+        self.local_stage = local_stage    # picklable function(filepath, filename, fingerprint) -> dict
+        self.remote_stage = remote_stage  # function(job, local_result) -> index entry
+        self.on_done = on_done
+        self.on_idle = on_idle
+        self.on_failed = on_failed
+        self.process_workers = process_workers or max(1, (os.cpu_count() or 2) - 1)
+
+        self._lock = threading.Lock()
+        self._processes = self._create_process_pool()
+        self._threads = ThreadPoolExecutor(max_workers=api_workers, thread_name_prefix="s2-lookup")
+        self._generations = {}   # filename -> generation of the newest job for that file
+        self._in_flight = {}     # filename -> number of unfinished jobs
+        self._active = 0
+        # Pausing holds jobs that have not started instead of running them
+        self._paused = False
+        # After shutdown() starts no work is submitted; jobs that did not run are dropped
+        # (their placeholders stay "indexing" and are queued again by the next scan)
+        self._closed = False
+        self._local_futures = {} # id(job) -> (job, future) until the local stage is done
+        self._held_local = []    # jobs waiting for resume() to run their local stage
+        self._held_remote = []   # (job, local result) waiting for resume() to run the remote stage
+
+        # Progress counters exposed to the UI
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._batch_started_at = None
+        self._completion_times = deque(maxlen=500)
+
+    def _create_process_pool(self):
+        try:
+            return ProcessPoolExecutor(max_workers=self.process_workers)
+        except (OSError, NotImplementedError, ImportError) as e:
+            # Some sandboxed/frozen environments cannot spawn processes
+            print(f"Process pool unavailable, extracting in threads instead: {e}")
+            return ThreadPoolExecutor(max_workers=self.process_workers, thread_name_prefix="pdf-extract")
+
+    def submit(self, filename, filepath, fingerprint=None):
+        with self._lock:
+            if self._closed:
+                return
+            generation = self._generations.get(filename, 0) + 1
+            self._generations[filename] = generation
+            if self._active == 0:
+                self._batch_started_at = time.time()
+                self._submitted = self._completed = self._failed = 0
+            self._active += 1
+            self._in_flight[filename] = self._in_flight.get(filename, 0) + 1
+            self._submitted += 1
+            job = {"filename": filename, "filepath": filepath, "fingerprint": fingerprint, "generation": generation,
+                   "submitted_at": time.perf_counter()}
+            if self._paused:
+                self._held_local.append(job)
+                return
+        self._start_local(job)
+
+    def _start_local(self, job):
+        filepath, filename, fingerprint = job["filepath"], job["filename"], job["fingerprint"]
+        with self._lock:
+            executor = self._processes
+        try:
+            future = executor.submit(self.local_stage, filepath, filename, fingerprint)
+        except (BrokenProcessPool, RuntimeError) as e:
+            if self.closed:
+                self._finish(job, False, dropped=True)
+                return
+            self._restart_process_pool(executor, e)
+            with self._lock:
+                executor = self._processes
+            future = executor.submit(self.local_stage, filepath, filename, fingerprint)
+        with self._lock:
+            self._local_futures[id(job)] = (job, future)
+        future.add_done_callback(lambda f, job=job: self._after_local(job, f))
+
+    def pause(self):
+        """Stops starting new work; jobs that have not started are held until resume().
+        Extractions already running in a worker finish, and their API stage is held."""
+        with self._lock:
+            self._paused = True
+            queued = list(self._local_futures.values())
+        for job, future in queued:
+            if future.cancel():
+                with self._lock:
+                    self._held_local.append(job)
+
+    def resume(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._paused = False
+            held_local, self._held_local = self._held_local, []
+            held_remote, self._held_remote = self._held_remote, []
+        for job, local in held_remote:
+            self._submit_remote(job, local)
+        for job in held_local:
+            self._start_local(job)
+
+    @property
+    def paused(self):
+        with self._lock:
+            return self._paused
+
+    @property
+    def closed(self):
+        with self._lock:
+            return self._closed
+
+    def run_local(self, fn, *args):
+        """Runs a one-off picklable task on the extraction workers; returns its future."""
+        with self._lock:
+            executor = self._processes
+        try:
+            return executor.submit(fn, *args)
+        except (BrokenProcessPool, RuntimeError) as e:
+            self._restart_process_pool(executor, e)
+            with self._lock:
+                executor = self._processes
+            return executor.submit(fn, *args)
+
+    def _restart_process_pool(self, broken, error):
+        with self._lock:
+            if self._processes is broken:
+                print(f"Extraction worker pool broke ({error}); restarting it.")
+                self._processes = self._create_process_pool()
+
+    def _after_local(self, job, future):
+        with self._lock:
+            self._local_futures.pop(id(job), None)
+        if future.cancelled():
+            if self.closed:
+                self._finish(job, False, dropped=True)
+            return # otherwise held by pause()
+        # Includes time queued behind other papers, which is what the user waits for
+        job["local_done_at"] = time.perf_counter()
+        metrics.observe("indexing.local_stage", (job["local_done_at"] - job["submitted_at"]) * 1000)
+        try:
+            local = future.result()
+        except BrokenProcessPool as e:
+            # A worker died (usually a malformed PDF); carry on with network-only indexing
+            self._restart_process_pool(self._processes, e)
+            local = None
+        except Exception as e:
+            print(f"Local extraction failed for {job['filename']}: {e}")
+            local = None
+        with self._lock:
+            if self._paused and not self._closed:
+                self._held_remote.append((job, local))
+                return
+        self._submit_remote(job, local)
+
+    def _submit_remote(self, job, local):
+        try:
+            future = self._threads.submit(self._run_remote, job, local)
+        except RuntimeError:
+            # The thread pool was shut down: the pool is closing
+            self._finish(job, False, dropped=True)
+            return
+        future.add_done_callback(lambda f, job=job: f.cancelled() and self._finish(job, False, dropped=True))
+
+    def _run_remote(self, job, local):
+        ok = False
+        try:
+            if self.is_current(job):
+                entry = self.remote_stage(job, local)
+                if self.is_current(job):
+                    self.on_done(job, entry)
+            ok = True
+        except Exception as e:
+            print(f"Indexing failed for {job['filename']}: {e}")
+            if self.on_failed and self.is_current(job):
+                try:
+                    self.on_failed(job)
+                except Exception as e:
+                    print(f"Error after failed indexing of {job['filename']}: {e}")
+        finally:
+            self._finish(job, ok)
+
+    def is_current(self, job):
+        """False once a newer job for the same file was submitted (the file changed mid-indexing)."""
+        with self._lock:
+            return self._generations.get(job["filename"]) == job["generation"]
+
+    def _finish(self, job, ok, dropped=False):
+        now = time.perf_counter()
+        if dropped:
+            metrics.incr("indexing.dropped")
+        else:
+            metrics.observe("indexing.remote_stage", (now - job.get("local_done_at", now)) * 1000)
+            metrics.observe("indexing.paper", (now - job["submitted_at"]) * 1000)
+            metrics.incr("indexing.completed" if ok else "indexing.failed")
+        with self._lock:
+            self._active -= 1
+            remaining = self._in_flight.get(job["filename"], 1) - 1
+            if remaining > 0:
+                self._in_flight[job["filename"]] = remaining
+            else:
+                self._in_flight.pop(job["filename"], None)
+            if ok:
+                self._completed += 1
+                self._completion_times.append(time.time())
+            elif not dropped:
+                self._failed += 1
+            idle = self._active == 0 and not self._closed
+        if idle and self.on_idle:
+            try:
+                self.on_idle()
+            except Exception as e:
+                print(f"Error after indexing batch: {e}")
+
+    def is_pending(self, filename):
+        with self._lock:
+            return filename in self._in_flight
+
+    def is_idle(self):
+        with self._lock:
+            return self._active == 0
+
+    def progress(self):
+        """Snapshot of the current (or last) batch for the UI."""
+        with self._lock:
+            now = time.time()
+            recent = [t for t in self._completion_times if now - t <= 60]
+            elapsed = (now - self._batch_started_at) if self._batch_started_at else 0
+            done = self._completed + self._failed
+            return {
+                "active": self._active,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "elapsed_seconds": round(elapsed, 1),
+                "papers_per_minute": round(len(recent) if elapsed >= 60 else (done / elapsed * 60 if elapsed > 0 else 0), 1)
+            }
+
+    def shutdown(self, wait=False):
+        """Stops the pool. Jobs whose current stage has not started are dropped. With
+        wait=True, running extractions finish first and are handed on, then running API
+        lookups finish, so every on_done callback has returned when this returns."""
+        with self._lock:
+            self._closed = True
+            held = self._held_local + [job for job, _ in self._held_remote]
+            self._held_local, self._held_remote = [], []
+        for job in held:
+            self._finish(job, False, dropped=True)
+        # Processes first: their results are handed to the thread pool, which must still run
+        self._processes.shutdown(wait=wait, cancel_futures=True)
+        self._threads.shutdown(wait=wait, cancel_futures=True)
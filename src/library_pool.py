@@ -0,0 +1,66 @@
+import os
+import threading
+from collections import OrderedDict
+from metrics import metrics
+
+
+class LibraryPool:
+    """Keeps the indexes of recently used library folders loaded, so switching back is instant.
+
+    Only the active library scans and indexes; the others are paused (held work resumes when
+    they are activated again). Beyond `capacity` libraries the least recently used one is
+    closed in the background.
+    """
+
+    def __init__(self, factory, capacity=3):
+        self.factory = factory    # function(papers_dir) -> IndexManager that is not started yet
+        self.capacity = max(1, capacity)
+        self._lock = threading.Lock()
+        self._managers = OrderedDict()  # normalized folder path -> IndexManager, least recent first
+        self.active = None
+
+    def _key(self, papers_dir):
+        return os.path.normcase(os.path.abspath(papers_dir))
+
+    def activate(self, papers_dir, start=True):
+        """Makes papers_dir the active library. Returns (manager, was_warm).
+
+        With start=False the caller starts (or resumes) the returned manager itself."""
+        key = self._key(papers_dir)
+        with self._lock:
+            manager = self._managers.pop(key, None)
+            warm = manager is not None
+            previous = self.active if self.active is not manager else None
+        if manager is None:
+            with metrics.timer("libraries.load"):
+                manager = self.factory(papers_dir)
+        if previous is not None:
+            previous.pause()
+
+        with self._lock:
+            self._managers[key] = manager
+            self.active = manager
+            evicted = []
+            while len(self._managers) > self.capacity:
+                evicted.append(self._managers.popitem(last=False)[1])
+        for old in evicted:
+            print(f"Closing library {old.papers_dir} (not used recently)")
+            threading.Thread(target=old.close, daemon=True).start()
+
+        metrics.incr("libraries.warm_switch" if warm else "libraries.cold_switch")
+        if start:
+            manager.resume()
+        return manager, warm
+
+    def loaded(self):
+        """Folders with a loaded index, most recently used first."""
+        with self._lock:
+            return [m.papers_dir for m in reversed(self._managers.values())]
+
+    def close_all(self):
+        with self._lock:
+            managers = list(self._managers.values())
+            self._managers.clear()
+            self.active = None
+        for manager in managers:
+            manager.close()
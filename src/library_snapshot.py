@@ -0,0 +1,33 @@
+import os
+import json
+
+# Compact copy of the sidebar listing, rewritten by the IndexManager whenever indexing goes idle.
+# At startup the app shows it right away and loads the full index after the first paint.
+
+SNAPSHOT_VERSION = 1
+
+
+def snapshot_path(papers_dir):
+    return os.path.join(papers_dir, ".paper_reader", "library_snapshot.json")
+
+
+def load_snapshot(papers_dir):
+    """Paper summaries from the last snapshot, or None if there is none (or it is unreadable)."""
+    try:
+        with open(snapshot_path(papers_dir), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+        return None
+    return data.get("papers")
+
+
+def write_snapshot(papers_dir, papers):
+    """Atomically replaces the snapshot with the given paper summaries."""
+    path = snapshot_path(papers_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": SNAPSHOT_VERSION, "papers": papers}, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
@@ -0,0 +1,65 @@
+# Immutable, versioned views of the library index for readers (UI calls, search, thumbnails).
+# The IndexManager mutates its live index_data under a lock and publishes a new view after
+# every saved change; readers just take the current view and never lock.
+
+
+class LibraryView:
+    """One published version of the index: filename -> entry, plus the sidebar summaries.
+
+    Views are never modified after publishing. A new view shares every unchanged entry with
+    the previous one and only copies the entries that changed (copy-on-write).
+    """
+
+    __slots__ = ("version", "entries", "summaries")
+
+    def __init__(self, version=0, entries=None, summaries=None):
+        self.version = version
+        self.entries = entries or {}
+        self.summaries = summaries or {}
+
+    def get(self, filename, default=None):
+        return self.entries.get(filename, default)
+
+    def __contains__(self, filename):
+        return filename in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def updated(self, index_data, changed):
+        """The next view, with `changed` filenames re-read from the live index (or dropped)."""
+        entries = dict(self.entries)
+        summaries = dict(self.summaries)
+        for filename in changed:
+            data = index_data.get(filename)
+            if data is None:
+                entries.pop(filename, None)
+                summaries.pop(filename, None)
+            else:
+                entry = _freeze(data)
+                entries[filename] = entry
+                summaries[filename] = summarize(filename, entry)
+        return LibraryView(self.version + 1, entries, summaries)
+
+
+def _freeze(data):
+    # Writers replace or mutate these containers in place, so a view keeps its own copies
+    if not isinstance(data, dict):
+        return data.copy()  # PaperRecord
+    return {key: list(value) if isinstance(value, list) else dict(value) if isinstance(value, dict) else value
+            for key, value in data.items()}
+
+
+def summarize(filename, data):
+    return {
+        "filename": filename,
+        "filepath": data.get("filepath", ""),
+        "title": data.get("title", filename),
+        "authors": data.get("authors", []),
+        "year": data.get("year", ""),
+        "status": data.get("status", "ready"), # Default to ready for legacy entries
+        "cites_count": len(data.get("cites", [])),
+        "cited_by_count": len(data.get("cited_by", [])),
+        "memos_count": data.get("memos_count", 0),
+        "duplicate_of": data.get("duplicate_of")
+    }
@@ -0,0 +1,97 @@
+import os
+import hashlib
+import threading
+
+# watchdog wraps inotify / FSEvents / ReadDirectoryChangesW; without it we fall back to polling
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+HASH_CHUNK_SIZE = 1024 * 1024
+_reported_polling = []  # the missing-watchdog notice is printed once per process
+
+
+def hash_file(path):
+    """Streams a file through SHA-256 so large PDFs are never fully held in memory."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def list_pdfs(papers_dir):
+    """Returns {filename: (mtime, size)} for every PDF directly inside papers_dir."""
+    result = {}
+    try:
+        with os.scandir(papers_dir) as it:
+            for entry in it:
+                if entry.name.lower().endswith('.pdf') and entry.is_file():
+                    st = entry.stat()
+                    result[entry.name] = (st.st_mtime, st.st_size)
+    except FileNotFoundError:
+        pass
+    return result
+
+
+class _PdfEventHandler(FileSystemEventHandler):
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        paths = [getattr(event, 'src_path', ''), getattr(event, 'dest_path', '')]
+        if any(str(p).lower().endswith('.pdf') for p in paths):
+            self.watcher.notify()
+
+
+class LibraryWatcher:
+    """Wakes the scanner when the library folder changes.
+
+    Uses native filesystem events when watchdog is installed; otherwise wait_for_change()
+    simply times out and the scanner falls back to a cheap stat-only poll.
+    """
+
+    def __init__(self, papers_dir, poll_interval=10, event_rescan_interval=300):
+        self.papers_dir = papers_dir
+        self.poll_interval = poll_interval
+        self.event_rescan_interval = event_rescan_interval
+        self._changed = threading.Event()
+        self._observer = None
+
+        if Observer is None and not _reported_polling:
+            _reported_polling.append(True)
+            print(f"watchdog is not installed; checking library folders for new PDFs every {poll_interval}s "
+                  f"(pip install watchdog to pick them up immediately)")
+        if Observer is not None and os.path.isdir(papers_dir):
+            try:
+                self._observer = Observer()
+                self._observer.schedule(_PdfEventHandler(self), papers_dir, recursive=False)
+                self._observer.daemon = True
+                self._observer.start()
+            except Exception as e:
+                print(f"Filesystem events unavailable, falling back to polling: {e}")
+                self._observer = None
+
+    @property
+    def uses_events(self):
+        return self._observer is not None
+
+    def notify(self):
+        self._changed.set()
+
+    def wait_for_change(self, timeout=None):
+        """Blocks until a change is signalled or the timeout elapses. Returns True on a signal."""
+        if timeout is None:
+            timeout = self.event_rescan_interval if self.uses_events else self.poll_interval
+        signalled = self._changed.wait(timeout)
+        self._changed.clear()
+        return signalled
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+        self._changed.set()
@@ -1,7 +1,17 @@
+import time
+# Measured from here so startup metrics include importing the GUI toolkit
+_PROCESS_STARTED = time.perf_counter()
+
 import webview
 import os
 import sys
 
+# Load the library anyway if the UI never reports its first paint
+UI_READY_TIMEOUT = 5
+# Serializing a whole open payload just to measure it costs about as much as the bridge
+# does, so only every Nth open is measured
+PAYLOAD_SAMPLE_EVERY = 20
+
 def get_entrypoint():
     # To support PyInstaller, we check if we are running as an executable
     if getattr(sys, 'frozen', False):
@@ -10,17 +20,134 @@ def get_entrypoint():
         base_path = os.path.dirname(os.path.abspath(__file__))
     return os.path.join(base_path, 'ui', 'index.html')
 
-import base64
-
 class Api:
+    _opens = 0  # opens so far, for sampling the payload size
+
     def __init__(self):
         self._window = None
         self.current_pdf_path = None
         
-        # Initialize Index Manager
-        papers_dir = self._get_papers_dir()
+        # Local HTTP server so PDF.js can range-fetch files instead of receiving base64 blobs
+        from file_server import LocalFileServer
+        self.file_server = LocalFileServer()
+        
+        # Library change events are pushed to the UI as versioned deltas (no polling)
+        import threading
+        self._library_version = 0
+        self._event_lock = threading.Lock()
+        self._queued_events = []
+        self._flush_timer = None
+        # Highlights/memos: in-memory cache over journaled sidecar files
+        from annotation_store import AnnotationStore
+        self.annotations = AnnotationStore()
+        
+        # Optional JSON-lines trace of every timing/counter sample
+        from config import get_setting
+        from metrics import metrics
+        trace_path = get_setting("metrics_trace_path")
+        if trace_path:
+            try:
+                metrics.set_trace_file(trace_path)
+            except OSError as e:
+                print(f"Could not open metrics trace file: {e}")
+        
+        # Prepared open payloads of recently opened papers and of the papers they link to
+        from document_cache import DocumentCache
+        self.documents = DocumentCache(self._prepare_document, capacity=get_setting("open_cache_size", 16))
+        
+        # The full index is loaded (and scanning started) only after the UI's first paint;
+        # until then the sidebar is served from the compact snapshot written on the last run
+        from library_snapshot import load_snapshot
+        from library_pool import LibraryPool
+        # Recently used libraries stay loaded (paused) so switching back to them is instant
+        self.libraries = LibraryPool(self._create_index_manager, capacity=get_setting("warm_libraries", 3))
+        self._papers_dir = self._get_papers_dir()
+        self._manager = None
+        self._manager_ready = threading.Event()
+        self._load_lock = threading.Lock()
+        self._loader = None
+        self._snapshot = load_snapshot(self._papers_dir)
+        fallback = threading.Timer(UI_READY_TIMEOUT, self._start_loading_library)
+        fallback.daemon = True
+        fallback.start()
+
+    @property
+    def index_manager(self):
+        """The library's IndexManager. Callers that need it before it is loaded wait for the load."""
+        if not self._manager_ready.is_set():
+            self._start_loading_library()
+            self._manager_ready.wait()
+        return self._manager
+
+    @index_manager.setter
+    def index_manager(self, manager):
+        self._manager = manager
+        self._papers_dir = manager.papers_dir
+        self._manager_ready.set()
+
+    def _create_index_manager(self, papers_dir):
         from index_manager import IndexManager
-        self.index_manager = IndexManager(papers_dir)
+        manager = IndexManager(papers_dir, autostart=False)
+        manager.add_listener(lambda events: self._on_library_events(manager, events))
+        return manager
+
+    def _set_index_manager(self, papers_dir):
+        """Switches to papers_dir; returns True when its index was still loaded."""
+        manager, warm = self.libraries.activate(papers_dir)
+        with self._load_lock:
+            self.index_manager = manager
+        self.documents.clear()
+        return warm
+
+    def _start_loading_library(self):
+        import threading
+        with self._load_lock:
+            if self._loader is not None or self._manager_ready.is_set():
+                return
+            self._loader = threading.Thread(target=self._load_library, daemon=True)
+            self._loader.start()
+
+    def _load_library(self):
+        from metrics import metrics
+        try:
+            with metrics.timer("startup.load_index"):
+                manager, _ = self.libraries.activate(self._papers_dir, start=False)
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            print(f"Failed to load library index: {e}")
+            self._manager_ready.set()
+            return
+        with self._load_lock:
+            self.index_manager = manager
+        snapshot, self._snapshot = self._snapshot, None
+        if snapshot is not None:
+            # The UI is showing the snapshot; send whatever differs from the real index
+            self._on_library_events(manager, self._snapshot_changes(snapshot, manager))
+        manager.start()
+
+    def _snapshot_changes(self, snapshot, manager):
+        events = []
+        shown = {p["filename"]: p for p in snapshot}
+        for summary in manager.get_all_papers_summary():
+            old = shown.pop(summary["filename"], None)
+            if old is None:
+                events.append(("added", summary["filename"]))
+            elif any(old.get(k) != v for k, v in summary.items()):
+                events.append(("updated", summary["filename"]))
+        events.extend(("removed", filename) for filename in shown)
+        return events
+
+    def ui_ready(self, timings=None):
+        """Called by the UI once the sidebar is painted; loads the full index and starts scanning."""
+        from metrics import metrics
+        elapsed_ms = (time.perf_counter() - _PROCESS_STARTED) * 1000
+        metrics.observe("startup.time_to_interactive", elapsed_ms, from_snapshot=self._snapshot is not None)
+        for name, value in (timings or {}).items():
+            metrics.observe(f"startup.ui.{name}", value)
+        print(f"Library interactive {elapsed_ms:.0f} ms after launch")
+        self._start_loading_library()
+        return {"success": True}
 
     def _get_papers_dir(self):
         from config import get_library_path
@@ -45,10 +172,6 @@ class Api:
             self.current_pdf_path = file_path
             
             try:
-                with open(file_path, "rb") as f:
-                    pdf_data = f.read()
-                    base64_pdf = base64.b64encode(pdf_data).decode('utf-8')
-                
                 # Load sidecar data
                 sidecar_data = self._load_sidecar(file_path)
                 
@@ -56,7 +179,8 @@ class Api:
                     "success": True,
                     "filename": os.path.basename(file_path),
                     "filepath": file_path,
-                    "data": base64_pdf,
+                    "url": self.file_server.url_for(file_path),
+                    "file_size": os.path.getsize(file_path),
                     "sidecar": sidecar_data
                 }
             except Exception as e:
@@ -65,91 +189,134 @@ class Api:
                 return {"success": False, "error": str(e)}
         return {"success": False, "error": "No file selected"}
 
-    def _get_sidecar_path(self, pdf_path):
-        import os
-        base, ext = os.path.splitext(pdf_path)
-        return f"{base}.json"
-
     def _load_sidecar(self, pdf_path):
-        import os, json
-        json_path = self._get_sidecar_path(pdf_path)
-        if os.path.exists(json_path):
-            with open(json_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {"highlights": [], "memos": []}
+        return self.annotations.load(pdf_path)
 
     def save_highlight(self, highlight_data):
-        import json
         if not self.current_pdf_path:
             return {"success": False, "error": "No PDF open"}
             
-        json_path = self._get_sidecar_path(self.current_pdf_path)
-        data = self._load_sidecar(self.current_pdf_path)
-        
-        # Add highlight
-        data["highlights"].append(highlight_data)
-        
-        # Save updated data
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
-            
-        print(f"Saved highlight to {json_path}")
+        # Appends to the paper's annotation journal; the sidecar is rewritten in the background
+        count = self.annotations.add_highlight(self.current_pdf_path, highlight_data)
+        print(f"Saved highlight for {os.path.basename(self.current_pdf_path)}")
+        self._update_memo_count(self.current_pdf_path, count)
         return {"success": True}
 
     def delete_highlight(self, timestamp):
-        import json
         if not self.current_pdf_path:
             return {"success": False, "error": "No PDF open"}
             
-        json_path = self._get_sidecar_path(self.current_pdf_path)
-        data = self._load_sidecar(self.current_pdf_path)
-        
-        original_count = len(data.get("highlights", []))
-        data["highlights"] = [h for h in data.get("highlights", []) if h.get("timestamp") != timestamp]
-        
-        if len(data["highlights"]) < original_count:
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=4)
-            print(f"Deleted highlight from {json_path}")
+        found, count = self.annotations.delete_highlight(self.current_pdf_path, timestamp)
+        if found:
+            print(f"Deleted highlight for {os.path.basename(self.current_pdf_path)}")
+            self._update_memo_count(self.current_pdf_path, count)
             return {"success": True}
         else:
             return {"success": False, "error": "Highlight not found"}
 
     def get_local_papers(self):
+        """Full library listing; afterwards the UI is kept current by pushed deltas."""
+        with self._event_lock:
+            version = self._library_version
+        snapshot = self._snapshot
+        if snapshot is not None and not self._manager_ready.is_set():
+            return {
+                "success": True,
+                "papers": [self._format_paper(p, p.get("thumbnail")) for p in snapshot],
+                "version": version,
+                "progress": None
+            }
+        papers = [self._format_paper(p) for p in self.index_manager.get_all_papers_summary()]
+        return {
+            "success": True,
+            "papers": papers,
+            "version": version,
+            "progress": self.index_manager.get_indexing_progress()
+        }
+
+    def _format_paper(self, p, thumbnail_path=None):
         import os
-        papers_dir = self._get_papers_dir()
+        filename = p.get('filename')
+        filepath = p.get('filepath')
+        if not filepath:
+            filepath = os.path.join(self._papers_dir, filename)
             
-        papers = []
+        # Format author string
+        authors = p.get("authors", [])
+        author_str = ", ".join(authors[:2]) + (" et al." if len(authors) > 2 else "")
         
-        # Get enriched summary straight from our new index
-        summary_data = self.index_manager.get_all_papers_summary()
-        
-        for p in summary_data:
-            filename = p.get('filename')
-            filepath = p.get('filepath')
-            if not filepath:
-                filepath = os.path.join(papers_dir, filename)
-                
-            # Still load sidecar for memo count locally (memos are personal, not in global index)
-            sidecar = self._load_sidecar(filepath)
-            memos_count = len(sidecar.get('highlights', []))
-            
-            # Format author string
-            authors = p.get("authors", [])
-            author_str = ", ".join(authors[:2]) + (" et al." if len(authors) > 2 else "")
-            
-            papers.append({
-                "filename": filename,
-                "filepath": filepath,
-                "title": p.get("title", filename),
-                "authors": author_str,
-                "year": p.get("year", ""),
-                "cites_count": p.get("cites_count", 0),
-                "cited_by_count": p.get("cited_by_count", 0),
-                "memos_count": memos_count
-            })
-            
-        return {"success": True, "papers": papers}
+        return {
+            "filename": filename,
+            "filepath": filepath,
+            "title": p.get("title", filename),
+            "authors": author_str,
+            "year": p.get("year", ""),
+            "status": p.get("status", "ready"),
+            "cites_count": p.get("cites_count", 0),
+            "cited_by_count": p.get("cited_by_count", 0),
+            "memos_count": p.get("memos_count", 0),
+            "duplicate_of": p.get("duplicate_of"),
+            "thumbnail_url": self.file_server.url_for(thumbnail_path) if thumbnail_path else self._thumbnail_url(filename)
+        }
+
+    def _thumbnail_url(self, filename):
+        # Served by the local file server, so the sidebar never loads a PDF to show a preview
+        path = self.index_manager.get_thumbnail(filename)
+        return self.file_server.url_for(path) if path else None
+
+    def _update_memo_count(self, pdf_path, count):
+        import os
+        # Only papers inside the library folder have an index entry to keep the count in
+        if os.path.dirname(os.path.abspath(pdf_path)) == os.path.abspath(self._papers_dir):
+            self.index_manager.set_memo_count(os.path.basename(pdf_path), count)
+
+    def _on_library_events(self, manager, events):
+        """Queues index change events; they are coalesced and pushed to the UI shortly after."""
+        import threading
+        if manager is not self._manager:
+            return # Events from a library we already switched away from
+        with self._event_lock:
+            self._queued_events.extend(events)
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(0.2, self._push_library_delta)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def _push_library_delta(self):
+        import json
+        with self._event_lock:
+            events, self._queued_events = self._queued_events, []
+            self._flush_timer = None
+            if not events:
+                return
+            self._library_version += 1
+            version = self._library_version
+
+        # Keep only the latest event per paper, in first-seen order
+        latest = {}
+        for kind, filename in events:
+            if latest.get(filename) == "removed" and kind != "added":
+                continue
+            latest[filename] = kind
+
+        changes = []
+        for filename, kind in latest.items():
+            summary = None if kind == "removed" else self.index_manager.get_paper_summary(filename)
+            if summary is None:
+                changes.append({"kind": "removed", "filename": filename})
+            else:
+                changes.append({"kind": kind, "filename": filename, "paper": self._format_paper(summary)})
+
+        delta = {
+            "version": version,
+            "changes": changes,
+            "progress": self.index_manager.get_indexing_progress()
+        }
+        if self._window:
+            try:
+                self._window.evaluate_js(f"window.applyLibraryDelta && window.applyLibraryDelta({json.dumps(delta, ensure_ascii=False)})")
+            except Exception as e:
+                print(f"Failed to push library update: {e}")
         
     def change_library_folder(self):
         if not self._window:
@@ -163,17 +330,30 @@ class Api:
             success = set_library_path(new_folder)
             
             if success:
-                # Re-initialize index manager to scan new folder
-                from index_manager import IndexManager
-                self.index_manager = IndexManager(new_folder)
+                # Let the startup load finish first, so it cannot replace the new library
+                self.index_manager
+                self._snapshot = None
+                # Pauses the current library and activates the new one (instantly if still loaded)
+                warm = self._set_index_manager(new_folder)
                 self.current_pdf_path = None # clear any open pdf
-                return {"success": True, "new_path": new_folder}
+                return {"success": True, "new_path": new_folder, "warm": warm}
             else:
                 return {"success": False, "error": "Failed to save new configuration"}
                 
         return {"success": False, "error": "Cancelled"}
     def open_specific_pdf(self, file_path):
-        import os, base64
+        import json
+        from metrics import metrics
+        with metrics.timer("open.prepare"):
+            result = self._open_specific_pdf(file_path)
+        # What actually crosses the JS bridge for one open, for a sample of the opens
+        if self._opens % PAYLOAD_SAMPLE_EVERY == 0:
+            metrics.observe("open.payload_bytes", len(json.dumps(result, ensure_ascii=False).encode('utf-8')))
+        self._opens += 1
+        return result
+
+    def _open_specific_pdf(self, file_path):
+        import os
         import traceback
         if not os.path.exists(file_path):
             return {"success": False, "error": "File not found"}
@@ -181,102 +361,143 @@ class Api:
         self.current_pdf_path = file_path
         filename = os.path.basename(file_path)
         try:
-            with open(file_path, "rb") as f:
-                pdf_data = f.read()
-                base64_pdf = base64.b64encode(pdf_data).decode('utf-8')
-            
             sidecar_data = self._load_sidecar(file_path)
             
-            # Get rich index data
-            index_data = self.index_manager.get_paper_data(filename)
-            
-            # Format references into what UI expects, attaching local paths where we know they exist
-            formatted_refs = []
-            cites_local_filenames = index_data.get("cites", [])
+            # Index part of the payload, prepared from one immutable view (so the paper and its
+            # links are consistent) or reused from the cache if none of them changed since
+            manager = self.index_manager
+            document = self.documents.get(file_path, manager)
+            # Cites / Cited By hops are the likely next opens, in the same library
+            self.documents.prefetch(document["linked"], manager)
             
-            for ref in index_data.get("references", []):
-                ref_text = ref.get("text", "")
-                ref_title = ref.get("title", "").lower()
-                local_path = None
-                
-                if ref_title:
-                    for cf in cites_local_filenames:
-                        cf_data = self.index_manager.get_paper_data(cf)
-                        if cf_data.get("title", "").lower() == ref_title:
-                            local_path = cf_data.get("filepath", os.path.join(self._get_papers_dir(), cf))
-                            break
-                            
-                formatted_refs.append({
-                    "text": ref_text,
-                    "local_path": local_path
-                })
-                
+            st = os.stat(file_path)
             return {
                 "success": True,
                 "filename": filename,
                 "filepath": file_path,
-                "data": base64_pdf,
+                "url": self.file_server.url_for(file_path),
+                "file_size": st.st_size,
+                "file_mtime": st.st_mtime,
                 "sidecar": sidecar_data,
-                "index_data": index_data, # Send full index data for Sidebar UI
-                "references": formatted_refs
+                "index_data": document["index_data"], # Send full index data for Sidebar UI
+                "references": document["references"]
             }
         except Exception as e:
             traceback.print_exc()
             return {"success": False, "error": str(e)}
 
-    def _extract_references(self, pdf_path):
-        import fitz # PyMuPDF
-        import re
+    def _prepare_document(self, file_path, manager, view):
+        """Builds the index part of the open payload for DocumentCache from manager's `view`.
+        Returns (payload, file names of the index entries it was built from)."""
         import os
-        import sys
+        filename = os.path.basename(file_path)
+        papers_dir = manager.papers_dir
+        # A PDF opened from elsewhere is not the library paper that happens to share its name
+        index_data = manager.get_paper_data(filename, view) if manager.contains(file_path) else {}
+        cites_local_filenames = index_data.get("cites", [])
+        
+        # Titles of the local papers this one cites, for attaching local paths to references
+        local_titles = {}
+        for cf in cites_local_filenames:
+            cf_data = view.get(cf, {})
+            if cf_data.get("title"):
+                local_titles.setdefault(cf_data["title"].lower(), cf_data.get("filepath", os.path.join(papers_dir, cf)))
+        
+        # Format references into what UI expects, attaching local paths where we know they exist
+        formatted_refs = []
+        for ref in index_data.get("references", []):
+            ref_title = (ref.get("title") or "").lower()
+            formatted_refs.append({
+                "text": ref.get("text", ""),
+                "local_path": local_titles.get(ref_title) if ref_title else None
+            })
         
-        # Get list of local papers
-        papers_dir = self._get_papers_dir()
-        local_papers = []
-        if os.path.exists(papers_dir):
-            for file in os.listdir(papers_dir):
-                if file.lower().endswith('.pdf'):
-                    local_papers.append({
-                        "filename": file,
-                        "basename": os.path.splitext(file)[0].lower(),
-                        "filepath": os.path.join(papers_dir, file)
-                    })
+        linked = []
+        for name in cites_local_filenames + index_data.get("cited_by", []):
+            entry = view.get(name)
+            if entry is not None:
+                linked.append(entry.get("filepath") or os.path.join(papers_dir, name))
+        payload = {"index_data": index_data, "references": formatted_refs, "linked": linked}
+        return payload, [filename] + cites_local_filenames
 
+    def get_page_texts(self, file_path, start=0, count=None):
+        """Plain text of pages start .. start + count - 1 (0-based; all remaining pages without
+        count) from the derived data, so the viewer can search pages it has not rendered.
+        The viewer asks for the pages a search reaches, not the whole document."""
+        import os
+        if not os.path.exists(file_path):
+            return {"success": False, "error": "File not found"}
         try:
-            doc = fitz.open(pdf_path)
-            text_from_back = ""
-            start_page = max(0, len(doc) - 5)
-            for i in range(start_page, len(doc)):
-                text_from_back += doc[i].get_text()
-                
-            ref_match = re.search(r'\n(References|REFERENCES|Bibliography)\n(.*)', text_from_back, re.DOTALL)
-            if ref_match:
-                ref_text = ref_match.group(2)
-                raw_refs = re.split(r'\n\[[0-9]+\]|\n[0-9]+\.', ref_text)
-                clean_refs = []
-                for r in raw_refs:
-                    r = r.strip().replace('\n', ' ')
-                    if len(r) > 10:
-                        match_path = None
-                        r_lower = r.lower()
-                        for lp in local_papers:
-                            # Heuristic: if the exact filename (minus .pdf) is found in the reference text
-                            if lp["basename"] in r_lower:
-                                match_path = lp["filepath"]
-                                break
-                        clean_refs.append({
-                            "text": r,
-                            "local_path": match_path
-                        })
-                return clean_refs[:20]  # Limit to 20 for MVP
-            return []
+            pages = self.index_manager.get_derived(file_path).get("page_texts", [])
+            start = max(0, int(start))
+            end = len(pages) if count is None else start + max(0, int(count))
+            return {"success": True, "start": start, "page_count": len(pages), "pages": pages[start:end]}
         except Exception as e:
-            import traceback
-            traceback.print_exc()
-            print(f"Failed to extract refs: {e}")
-            return []
+            return {"success": False, "error": str(e)}
+
+    def get_metrics(self):
+        """Counters and timing summaries (ms) for scanning, indexing, API calls, linking, saving and viewing."""
+        from metrics import metrics
+        snapshot = metrics.snapshot()
+        snapshot["indexing_progress"] = self.index_manager.get_indexing_progress()
+        return {"success": True, "metrics": snapshot}
+
+    def record_render_timings(self, timings):
+        """Per-page render times measured by the viewer, sent in batches."""
+        from metrics import metrics
+        for t in timings or []:
+            metrics.observe("viewer.render_page", t.get("ms", 0), page=t.get("page"))
+        return {"success": True}
+
+    def search(self, query):
+        """Full-text search over every indexed page in the library."""
+        import time
+        if not query or not query.strip():
+            return {"success": True, "hits": [], "took_ms": 0}
+        started = time.perf_counter()
+        try:
+            hits = self.index_manager.search(query)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+        return {"success": True, "hits": hits, "took_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+    def get_citation_path(self, source, target, directed=True):
+        """Shortest chain of citations between two library papers (file names or paths)."""
+        import os
+        path = self.index_manager.graph.shortest_path(os.path.basename(source), os.path.basename(target), directed)
+        return {"success": True, "path": [self._graph_paper(f) for f in path] if path else None}
+
+    def get_related_papers(self, filename, limit=10):
+        """Papers co-cited with this one, and papers sharing its references (bibliographic coupling)."""
+        import os
+        graph = self.index_manager.graph
+        filename = os.path.basename(filename)
+        return {
+            "success": True,
+            "co_cited": [dict(self._graph_paper(f), shared=n) for f, n in graph.co_citation(filename, limit)],
+            "coupled": [dict(self._graph_paper(f), shared=n) for f, n in graph.bibliographic_coupling(filename, limit)]
+        }
+
+    def get_influential_papers(self, limit=20):
+        """Library papers ranked by PageRank over the citation links."""
+        ranked = self.index_manager.graph.top_influential(limit)
+        return {"success": True, "papers": [dict(self._graph_paper(f), score=round(s, 6)) for f, s in ranked]}
+
+    def get_citation_neighborhood(self, filename, hops=2, direction="both"):
+        """Papers within `hops` citation links of this one, with their distance."""
+        import os
+        near = self.index_manager.graph.neighborhood(os.path.basename(filename), hops, direction)
+        return {"success": True, "papers": [dict(self._graph_paper(f), distance=d) for f, d in near.items()]}
+
+    def _graph_paper(self, filename):
+        summary = self.index_manager.get_paper_summary(filename) or {"filename": filename}
+        return {"filename": filename, "filepath": summary.get("filepath", ""), "title": summary.get("title", filename)}
 
 if __name__ == '__main__':
+    # Indexing uses a process pool; required for frozen (PyInstaller) builds
+    import multiprocessing
+    multiprocessing.freeze_support()
+    
     api = Api()
     window = webview.create_window(
         '📚 Portable Paper Reader', 
@@ -288,4 +509,9 @@ if __name__ == '__main__':
     )
     api.set_window(window)
     webview.start(debug=True)
+    # Fold any pending annotation journals into their sidecars before exiting
+    api.annotations.close()
+    # Stops every loaded library; also leaves up-to-date snapshots for the next launch
+    api.documents.clear()
+    api.libraries.close_all()
 
@@ -0,0 +1,128 @@
+import json
+import time
+import threading
+from collections import deque
+
+# Samples kept per timer for percentiles; totals and counts cover the whole session
+RECENT_SAMPLES = 512
+
+
+class _Series:
+    __slots__ = ("count", "total", "max", "recent")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.recent.append(value)
+
+    def summary(self):
+        ordered = sorted(self.recent)
+
+        def pct(p):
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))] if ordered else 0
+
+        return {
+            "count": self.count,
+            "total": round(self.total, 3),
+            "mean": round(self.total / self.count, 3) if self.count else 0,
+            "p50": round(pct(0.5), 3),
+            "p95": round(pct(0.95), 3),
+            "max": round(self.max, 3)
+        }
+
+
+class Metrics:
+    """Process-wide counters and timings for the hot paths (scanning, extraction, API calls,
+    linking, saving, opening and rendering papers).
+
+    Timings are recorded in milliseconds. When a trace file is set every sample is also
+    appended to it as one JSON line, for offline analysis of a real library.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._series = {}
+        self._started = time.time()
+        self._trace = None
+
+    def set_trace_file(self, path):
+        with self._lock:
+            if self._trace:
+                self._trace.close()
+            self._trace = open(path, 'a', encoding='utf-8', buffering=1) if path else None
+
+    def incr(self, name, amount=1, **fields):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+            self._write_trace("count", name, amount, fields)
+
+    def observe(self, name, value, **fields):
+        """Records one sample (milliseconds for timings, or any other unit like bytes)."""
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = _Series()
+            series.add(value)
+            self._write_trace("sample", name, value, fields)
+
+    def timer(self, name, **fields):
+        return _Timer(self, name, fields)
+
+    def _write_trace(self, kind, name, value, fields):
+        if self._trace is None:
+            return
+        record = {"ts": round(time.time(), 3), "kind": kind, "name": name,
+                  "value": round(value, 3) if isinstance(value, float) else value}
+        if fields:
+            record.update(fields)
+        try:
+            self._trace.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except (OSError, ValueError) as e:
+            print(f"Disabling metrics trace: {e}")
+            self._trace = None
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "uptime_seconds": round(time.time() - self._started, 1),
+                "counters": dict(self._counters),
+                "timings": {name: series.summary() for name, series in self._series.items()}
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._series.clear()
+            self._started = time.time()
+
+
+class _Timer:
+    """Context manager recording elapsed wall time in milliseconds."""
+
+    def __init__(self, metrics, name, fields):
+        self.metrics = metrics
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed_ms = (time.perf_counter() - self.started) * 1000
+        if exc_type is not None:
+            self.fields = dict(self.fields, error=exc_type.__name__)
+        self.metrics.observe(self.name, self.elapsed_ms, **self.fields)
+        return False
+
+
+# Shared by every module in the app process; worker processes report timings in their results
+metrics = Metrics()
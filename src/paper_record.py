@@ -0,0 +1,101 @@
+import sys
+
+# Resident per-paper index record. A library keeps one of these per paper (plus a copy in the
+# published view), so they are __slots__ objects with interned strings rather than dicts.
+# They keep the dict interface the index code uses (get / [] / in / items / pop).
+# Reference lists are not resident: they live in the store and are loaded on demand. Neither are
+# MinHash signatures: the duplicate index keeps those (dedup.py).
+
+_FIELDS = ("filename", "filepath", "title", "authors", "abstract", "year", "status", "semantic_scholar_id",
+           "fingerprint", "memos_count", "cites", "cited_by", "duplicate_of")
+_UNSET = object()
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+def _intern_list(values):
+    return [_intern(v) for v in values] if isinstance(values, list) else values
+
+
+# Fields whose values repeat across papers (author names, years, statuses, file names in links)
+_INTERNED = {
+    "filename": _intern, "year": _intern, "status": _intern, "duplicate_of": _intern,
+    "authors": _intern_list, "cites": _intern_list, "cited_by": _intern_list
+}
+
+
+class PaperRecord:
+    __slots__ = _FIELDS + ("_extra",)
+
+    def __init__(self, data=None):
+        for field in _FIELDS:
+            object.__setattr__(self, field, _UNSET)
+        self._extra = None
+        for key, value in (data or {}).items():
+            self[key] = value
+
+    def __setitem__(self, key, value):
+        if key in _INTERNED:
+            value = _INTERNED[key](value)
+        if key in _FIELDS:
+            object.__setattr__(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __getitem__(self, key):
+        value = self.get(key, _UNSET)
+        if value is _UNSET:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        if key in _FIELDS:
+            value = getattr(self, key)
+            return default if value is _UNSET else value
+        return self._extra.get(key, default) if self._extra else default
+
+    def __contains__(self, key):
+        return self.get(key, _UNSET) is not _UNSET
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.pop(key)
+
+    def pop(self, key, default=None):
+        value = self.get(key, _UNSET)
+        if value is _UNSET:
+            return default
+        if key in _FIELDS:
+            object.__setattr__(self, key, _UNSET)
+        else:
+            del self._extra[key]
+        return value
+
+    def items(self):
+        for field in _FIELDS:
+            value = getattr(self, field)
+            if value is not _UNSET:
+                yield field, value
+        if self._extra:
+            yield from self._extra.items()
+
+    def keys(self):
+        return [key for key, _ in self.items()]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def copy(self):
+        """Copy whose lists and dicts are independent of this record's."""
+        clone = PaperRecord()
+        for key, value in self.items():
+            clone[key] = list(value) if isinstance(value, list) else dict(value) if isinstance(value, dict) else value
+        return clone
+
+    def __repr__(self):
+        return f"PaperRecord({self.to_dict()!r})"
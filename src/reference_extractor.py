@@ -0,0 +1,182 @@
+import re
+import statistics
+
+# A reference heading is a short line on its own, optionally numbered ("7. References", "VII. 참고문헌")
+HEADING_RE = re.compile(
+    r'^(?:(?:[0-9]{1,2}|[IVX]{1,5})[.)]?\s*|chapter\s+\d+\.?\s*|제\s*\d+\s*장\s*)?'
+    r'(references?|bibliography|works\s+cited|literature\s+cited|참\s*고\s*문\s*헌|인\s*용\s*문\s*헌|참\s*고\s*자\s*료)\s*:?$',
+    re.IGNORECASE
+)
+# Cheap pre-filter run on plain page text before paying for the block/span layout
+_HEADING_HINT_RE = re.compile(r'reference|bibliography|works\s+cited|literature\s+cited|참\s*고\s*문\s*헌|인\s*용\s*문\s*헌|참\s*고\s*자\s*료', re.IGNORECASE)
+# Back matter that follows the references in many theses (English abstract, appendices, ...)
+END_RE = re.compile(
+    r'^(?:(?:[0-9]{1,2}|[A-Z]|[IVX]{1,5})[.)]?\s*)?'
+    r'(appendix|appendices|abstract|acknowledge?ments?|부\s*록|국\s*문\s*초\s*록|영\s*문\s*초\s*록|감\s*사\s*의\s*글)\b',
+    re.IGNORECASE
+)
+MARKER_RE = re.compile(r'^\s*(?:\[(\d{1,4})\]|(\d{1,4})[.)](?!\d))\s*')
+PAGE_NUMBER_RE = re.compile(r'^[-–—\s]*\d{1,4}[-–—\s]*$')
+
+BOLD_FLAG = 16       # PyMuPDF span flag for bold text
+HEADING_SIZE_RATIO = 1.1
+# Splitting unnumbered lists by layout
+INDENT_TOLERANCE = 2.0   # points; lines starting closer than this share a left edge
+COLUMN_SHIFT = 8         # font sizes; a larger horizontal jump to the next line is a new column
+ENTRY_GAP = 0.4          # font sizes of extra vertical space that separate two entries
+
+
+class _Line:
+    __slots__ = ("page", "block", "text", "size", "bold", "alone", "x", "top", "bottom")
+
+    def __init__(self, page, block, text, size, bold, alone, bbox=(0, 0, 0, 0)):
+        self.page = page
+        self.block = block
+        self.text = text
+        self.size = size
+        self.bold = bold
+        self.alone = alone
+        self.x, self.top, _, self.bottom = bbox
+
+
+def page_lines(page, page_idx):
+    """Flattens PyMuPDF's block/line/span layout into lines with font cues."""
+    lines = []
+    layout = page.get_text("dict")
+    for block_idx, block in enumerate(layout.get("blocks", [])):
+        if block.get("type", 0) != 0:
+            continue  # image block
+        block_lines = block.get("lines", [])
+        for line in block_lines:
+            spans = [s for s in line.get("spans", []) if s.get("text", "").strip()]
+            if not spans:
+                continue
+            text = "".join(s["text"] for s in line["spans"]).strip()
+            size = max(s.get("size", 0) for s in spans)
+            bold = all((s.get("flags", 0) & BOLD_FLAG) or "bold" in s.get("font", "").lower() for s in spans)
+            lines.append(_Line(page_idx, block_idx, text, size, bold, len(block_lines) == 1, line.get("bbox", (0, 0, 0, 0))))
+    return lines
+
+
+def _body_size(lines):
+    sizes = [line.size for line in lines if len(line.text) > 20]
+    return statistics.median(sizes) if sizes else 0
+
+
+def _is_heading(line, body_size):
+    if len(line.text) > 40 or not HEADING_RE.match(line.text):
+        return False
+    return line.bold or line.alone or (body_size and line.size >= body_size * HEADING_SIZE_RATIO)
+
+
+def find_reference_heading(doc, page_texts=None):
+    """Scans pages backwards and stops at the last reference heading in the document.
+
+    Returns (page_idx, line_idx, lines, body_size) or None. Plain page text, when given, is
+    used to skip pages that cannot contain a heading without building their layout.
+    """
+    for page_idx in range(len(doc) - 1, -1, -1):
+        if page_texts is not None and not _HEADING_HINT_RE.search(page_texts[page_idx]):
+            continue
+        lines = page_lines(doc[page_idx], page_idx)
+        body_size = _body_size(lines)
+        for line_idx in range(len(lines) - 1, -1, -1):
+            if _is_heading(lines[line_idx], body_size):
+                return page_idx, line_idx, lines, body_size
+    return None
+
+
+def _join(parts):
+    text = ""
+    for part in parts:
+        if text.endswith("-") and part[:1].islower():
+            text = text[:-1] + part  # re-join hyphenated line breaks
+        elif text:
+            text += " " + part
+        else:
+            text = part
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def iter_reference_entries(doc, heading):
+    """Streams reference strings following the heading until back matter or the end of the document.
+
+    Numbered lists ([n], n., n)) are split on markers that continue the sequence, so years or
+    volume numbers at the start of a wrapped line don't start a new entry. Unnumbered lists
+    are split by line layout: with a hanging indent a line back at the margin starts an
+    entry, otherwise extra vertical space does (and a finished sentence, across a page or
+    column break).
+    """
+    page_idx, line_idx, lines, body_size = heading
+    numbered = None
+    expected = None
+    current = []
+    previous = None   # previous line of an unnumbered list
+    margin = 0        # left edge of the current unnumbered entry's first line
+    hanging = False   # an indented continuation line was seen
+    line_gap = None   # tightest vertical space seen between two lines
+
+    def following_lines():
+        yield from ((body_size, line) for line in lines[line_idx + 1:])
+        for next_idx in range(page_idx + 1, len(doc)):
+            next_lines = page_lines(doc[next_idx], next_idx)
+            next_body = _body_size(next_lines) or body_size
+            yield from ((next_body, line) for line in next_lines)
+
+    for size, line in following_lines():
+        text = line.text
+        if line.alone and PAGE_NUMBER_RE.match(text):
+            continue  # running page number
+        if END_RE.match(text) and len(text) <= 40 and (line.bold or line.alone or line.size >= size * HEADING_SIZE_RATIO):
+            break
+
+        marker = MARKER_RE.match(text)
+        if numbered is None:
+            numbered = marker is not None
+
+        if numbered:
+            number = int(marker.group(1) or marker.group(2)) if marker else None
+            if number is not None and (number == expected or (expected is None and number <= 5)):
+                if current:
+                    yield _join(current)
+                current = [text[marker.end():]] if text[marker.end():] else []
+                expected = number + 1
+                continue
+            current.append(text)
+        else:
+            new_entry = not current
+            if current:
+                jumped = line.page != previous.page or line.top < previous.top  # next page or column
+                if jumped and abs(line.x - previous.x) > COLUMN_SHIFT * line.size:
+                    margin += line.x - previous.x  # same indentation as the previous line, new column
+                indent = line.x - margin
+                if indent > INDENT_TOLERANCE:
+                    hanging = True
+                elif hanging or indent < -INDENT_TOLERANCE:
+                    new_entry = True
+                elif jumped:
+                    new_entry = previous.text.endswith(".")
+                else:
+                    gap = line.top - previous.bottom
+                    new_entry = gap > (line_gap if line_gap is not None else 0) + ENTRY_GAP * line.size
+                    line_gap = gap if line_gap is None else min(line_gap, gap)
+            if new_entry:
+                if current:
+                    yield _join(current)
+                current = []
+                margin = line.x
+            previous = line
+            current.append(text)
+
+    if current:
+        yield _join(current)
+
+
+def extract_references(doc, page_texts=None):
+    """Returns (section, references) where section locates the heading, or (None, []) if not found."""
+    heading = find_reference_heading(doc, page_texts)
+    if heading is None:
+        return None, []
+    page_idx, line_idx = heading[0], heading[1]
+    references = [{"text": text} for text in iter_reference_entries(doc, heading) if len(text) > 10]
+    return {"page": page_idx, "line": line_idx}, references
@@ -0,0 +1,116 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+DAY = 24 * 60 * 60
+# Hits only note their access time in memory; the times are written in one batch this often,
+# when this many are pending, and before anything that depends on them (eviction, close)
+ACCESS_FLUSH_SECONDS = 30
+ACCESS_FLUSH_COUNT = 256
+
+
+class ResponseCache:
+    """Persistent, size-bounded cache of API responses stored in SQLite.
+
+    Entries are content-addressed by a hash of the request (URL + sorted params), carry an
+    expiry time, and the least recently used entries are evicted once the cache outgrows
+    max_bytes. It is shared by every library, so switching folders or re-indexing a known
+    paper does not touch the network again.
+    """
+
+    def __init__(self, path, max_bytes=64 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                body TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                expires REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+        self._conn.commit()
+        self._total_size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self._accessed = {}  # key -> last access time not written yet
+        self._accessed_flushed_at = time.time()
+
+    @staticmethod
+    def make_key(url, params=None):
+        canonical = json.dumps([url, sorted((params or {}).items())], ensure_ascii=False, default=str)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, key, allow_stale=False):
+        """Returns (hit, value). Expired entries only count as hits when allow_stale is set."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT body, expires FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or (row[1] < now and not allow_stale):
+                return False, None
+            self._accessed[key] = now
+            if len(self._accessed) >= ACCESS_FLUSH_COUNT or now - self._accessed_flushed_at >= ACCESS_FLUSH_SECONDS:
+                self._write_access_times()
+                self._conn.commit()
+        return True, json.loads(row[0])
+
+    def _write_access_times(self):
+        if self._accessed:
+            self._conn.executemany("UPDATE responses SET last_access = ? WHERE key = ?",
+                                   [(accessed, key) for key, accessed in self._accessed.items()])
+            self._accessed.clear()
+        self._accessed_flushed_at = time.time()
+
+    def put(self, key, url, value, ttl):
+        body = json.dumps(value, ensure_ascii=False)
+        size = len(body.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            self._accessed.pop(key, None)
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, body, size, created, expires, last_access) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, url, body, size, now, now + ttl, now)
+            )
+            self._total_size += size - (old[0] if old else 0)
+            if self._total_size > self.max_bytes:
+                self._write_access_times()
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drops least recently used entries until the cache is back under 90% of its budget."""
+        target = self.max_bytes * 0.9
+        # Expired entries go first regardless of recency
+        for key, size in self._conn.execute("SELECT key, size FROM responses WHERE expires < ?", (time.time(),)).fetchall():
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total_size -= size
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall()
+        for key, size in rows:
+            if self._total_size <= target:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total_size -= size
+
+    def stats(self):
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"entries": count, "bytes": self._total_size, "max_bytes": self.max_bytes}
+
+    def close(self):
+        with self._lock:
+            try:
+                self._write_access_times()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"Could not save response cache access times: {e}")
+            self._conn.close()
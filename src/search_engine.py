@@ -0,0 +1,242 @@
+import os
+import re
+import math
+import zlib
+import heapq
+import sqlite3
+import threading
+import unicodedata
+from array import array
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    filename TEXT PRIMARY KEY,
+    content_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS pages (
+    page_id INTEGER PRIMARY KEY,
+    filename TEXT NOT NULL,
+    page INTEGER NOT NULL,      -- 1-based page number
+    length INTEGER NOT NULL,    -- tokens on the page, for BM25 length normalization
+    text BLOB                   -- zlib-compressed page text, for snippets
+);
+CREATE INDEX IF NOT EXISTS idx_pages_filename ON pages(filename);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    page_id INTEGER NOT NULL,
+    positions BLOB NOT NULL,    -- uint32 token positions, for phrase queries
+    PRIMARY KEY (term, page_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_postings_page ON postings(page_id);
+"""
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+SNIPPET_CHARS = 80
+_IN_CHUNK = 500  # max host parameters per IN (...) query
+
+_WORD_RE = re.compile(r'[^\W_]+')
+# Hangul, kana and CJK ideograph runs have no reliable word boundaries; they are indexed as bigrams
+_CJK_RUN_RE = re.compile(r'([\u1100-\u11ff\u3040-\u30ff\u3130-\u318f\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7a3]+)')
+_PHRASE_RE = re.compile(r'"([^"]+)"')
+
+
+def normalize(text):
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def tokenize(text):
+    """Lowercased word tokens; CJK runs become overlapping character bigrams so Korean
+    words match regardless of attached particles. Token index = position."""
+    tokens = []
+    for word in _WORD_RE.findall(normalize(text)):
+        for i, part in enumerate(_CJK_RUN_RE.split(word)):
+            if not part:
+                continue
+            if i % 2 == 0:
+                tokens.append(part)
+            elif len(part) == 1:
+                tokens.append(part)
+            else:
+                tokens.extend(part[j:j + 2] for j in range(len(part) - 1))
+    return tokens
+
+
+def parse_query(query):
+    """Returns (terms, phrases): all distinct query tokens, and token sequences from "quoted" parts."""
+    phrases = [tokens for tokens in (tokenize(p) for p in _PHRASE_RE.findall(query)) if len(tokens) > 1]
+    terms = list(dict.fromkeys(tokenize(query)))
+    return terms, phrases
+
+
+def _chunks(items, size=_IN_CHUNK):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class SearchIndex:
+    """Persistent full-text index over the library, one unit per PDF page.
+
+    Postings (term -> page, positions) live in SQLite so the index survives restarts and is
+    updated per document: re-indexing a changed PDF only rewrites that PDF's pages. Queries
+    are ranked with BM25; "quoted phrases" must appear as consecutive tokens.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA cache_size=-32768")  # 32 MB; postings inserts are B-tree heavy
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        # Searches use their own connection so they are not blocked by an indexing write
+        self._read_lock = threading.Lock()
+        self._read_conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._documents = dict(self._conn.execute("SELECT filename, content_hash FROM documents").fetchall())
+        self._page_lengths = None  # page_id -> length, loaded on first search
+
+    def indexed_hash(self, filename):
+        return self._documents.get(filename)
+
+    def indexed_filenames(self):
+        return list(self._documents)
+
+    def index_document(self, filename, content_hash, page_texts):
+        """(Re-)indexes one PDF from its page texts, replacing anything indexed under filename."""
+        pages = []
+        for page_num, text in enumerate(page_texts, 1):
+            postings = {}
+            tokens = tokenize(text)
+            for position, token in enumerate(tokens):
+                postings.setdefault(token, array('I')).append(position)
+            pages.append((page_num, len(tokens), zlib.compress(text.encode('utf-8')), postings))
+
+        with self._lock:
+            with self._conn:
+                self._delete(filename)
+                rows = []
+                for page_num, length, compressed, postings in pages:
+                    page_id = self._conn.execute(
+                        "INSERT INTO pages (filename, page, length, text) VALUES (?, ?, ?, ?)",
+                        (filename, page_num, length, compressed)
+                    ).lastrowid
+                    rows.extend((term, page_id, positions.tobytes()) for term, positions in postings.items())
+                # Inserting in key order keeps the postings B-tree writes local
+                rows.sort()
+                self._conn.executemany("INSERT INTO postings (term, page_id, positions) VALUES (?, ?, ?)", rows)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO documents (filename, content_hash) VALUES (?, ?)",
+                    (filename, content_hash)
+                )
+            self._documents[filename] = content_hash
+            self._page_lengths = None
+
+    def remove_document(self, filename):
+        with self._lock:
+            with self._conn:
+                self._delete(filename)
+            self._documents.pop(filename, None)
+            self._page_lengths = None
+
+    def _delete(self, filename):
+        self._conn.execute(
+            "DELETE FROM postings WHERE page_id IN (SELECT page_id FROM pages WHERE filename = ?)", (filename,)
+        )
+        self._conn.execute("DELETE FROM pages WHERE filename = ?", (filename,))
+        self._conn.execute("DELETE FROM documents WHERE filename = ?", (filename,))
+
+    def search(self, query, limit=20):
+        """Returns up to limit hits [{filename, page, score, snippet}], best first."""
+        terms, phrases = parse_query(query)
+        if not terms:
+            return []
+
+        with self._read_lock:
+            lengths = self._lengths()
+            total_pages = len(lengths)
+            if total_pages == 0:
+                return []
+            avg_length = (sum(lengths.values()) / total_pages) or 1
+
+            scores = {}
+            for term in terms:
+                rows = self._read_conn.execute(
+                    "SELECT page_id, length(positions) / 4 FROM postings WHERE term = ?", (term,)
+                ).fetchall()
+                if not rows:
+                    continue
+                idf = math.log(1 + (total_pages - len(rows) + 0.5) / (len(rows) + 0.5))
+                for page_id, tf in rows:
+                    norm = K1 * (1 - B + B * lengths.get(page_id, avg_length) / avg_length)
+                    scores[page_id] = scores.get(page_id, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+
+            for phrase in phrases:
+                matching = self._pages_with_phrase(phrase, scores.keys())
+                scores = {page_id: score for page_id, score in scores.items() if page_id in matching}
+
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            hits = []
+            for page_id, score in top:
+                row = self._read_conn.execute(
+                    "SELECT filename, page, text FROM pages WHERE page_id = ?", (page_id,)
+                ).fetchone()
+                if row is None:
+                    continue
+                filename, page_num, compressed = row
+                hits.append({
+                    "filename": filename,
+                    "page": page_num,
+                    "score": round(score, 4),
+                    "snippet": _snippet(zlib.decompress(compressed).decode('utf-8'), terms)
+                })
+            return hits
+
+    def _lengths(self):
+        lengths = self._page_lengths
+        if lengths is None:
+            lengths = dict(self._read_conn.execute("SELECT page_id, length FROM pages").fetchall())
+            self._page_lengths = lengths
+        return lengths
+
+    def _pages_with_phrase(self, phrase, candidates):
+        """Page ids among candidates where the phrase tokens occur at consecutive positions."""
+        matching = set()
+        for chunk in _chunks(candidates):
+            placeholders = ", ".join("?" * len(chunk))
+            positions = []
+            for token in phrase:
+                rows = self._read_conn.execute(
+                    f"SELECT page_id, positions FROM postings WHERE term = ? AND page_id IN ({placeholders})",
+                    [token] + chunk
+                ).fetchall()
+                positions.append({page_id: array('I', blob) for page_id, blob in rows})
+            for page_id in set(positions[0]).intersection(*positions[1:]):
+                starts = set(positions[0][page_id])
+                for offset, token_positions in enumerate(positions[1:], 1):
+                    starts &= {p - offset for p in token_positions[page_id]}
+                    if not starts:
+                        break
+                if starts:
+                    matching.add(page_id)
+        return matching
+
+    def close(self):
+        with self._lock, self._read_lock:
+            self._conn.close()
+            self._read_conn.close()
+
+
+def _snippet(text, terms):
+    """A short window of the page text around the first query term occurrence."""
+    flat = re.sub(r'\s+', ' ', unicodedata.normalize("NFKC", text))
+    lowered = flat.lower()
+    found = [i for i in (lowered.find(term) for term in terms) if i >= 0]
+    start = min(found) if found else 0
+    begin = max(0, start - SNIPPET_CHARS // 2)
+    end = min(len(flat), start + SNIPPET_CHARS)
+    return ("…" if begin > 0 else "") + flat[begin:end].strip() + ("…" if end < len(flat) else "")
@@ -0,0 +1,323 @@
+import time
+import random
+import threading
+from metrics import metrics
+
+API_BASE_URL = "https://api.semanticscholar.org/graph/v1"
+
+# How long cached responses stay fresh. Misses (404) are retried sooner than hits.
+CACHE_TTL = 30 * 24 * 60 * 60
+NOT_FOUND_TTL = 24 * 60 * 60
+
+PAPER_FIELDS = "title,authors,abstract,year"
+REFERENCE_FIELDS = "title,authors,year"
+# Batch lookups return the reference list with the paper, so it costs no extra request
+BATCH_FIELDS = PAPER_FIELDS + "," + ",".join(f"references.{field}" for field in REFERENCE_FIELDS.split(","))
+# POST /paper/batch takes up to 500 ids; smaller batches keep responses with references small
+BATCH_SIZE = 100
+# How long a lookup waits for lookups from other workers to join its batch
+BATCH_WINDOW = 0.05
+# Reference lists embedded in batch responses are cut off at this length
+BATCH_REFERENCE_LIMIT = 9999
+# Largest page the references endpoint serves
+REFERENCE_PAGE_SIZE = 1000
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every API worker so we stay under the rate limit."""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)          # tokens added per second
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available and consumes it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def penalize(self, seconds):
+        """Drains the bucket so no worker fires again for `seconds` (used after a 429)."""
+        with self._lock:
+            self._tokens = min(self._tokens, 0) - seconds * self.rate
+
+
+class SemanticScholarClient:
+    """Semantic Scholar Graph API client with shared rate limiting and retry/backoff on 429/5xx."""
+
+    def __init__(self, base_url=API_BASE_URL, requests_per_second=1.0, burst=3, max_retries=5, api_key=None,
+                 cache=None, offline=False, connections=4):
+        self.base_url = base_url.rstrip('/')
+        self.limiter = TokenBucket(requests_per_second, burst)
+        self.max_retries = max_retries
+        self.headers = {"x-api-key": api_key} if api_key else {}
+        self.cache = cache      # optional ResponseCache
+        self.offline = offline  # answer from the cache only, never touch the network
+        self.connections = connections  # kept-alive connections, one per API worker
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    def _http(self):
+        """Shared requests.Session, so workers reuse kept-alive connections instead of a new
+        TCP/TLS handshake per request."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests  # imported on first request; keeps app startup fast
+                    session = requests.Session()
+                    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.connections)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.headers.update(self.headers)
+                    self._session = session
+        return self._session
+
+    def close(self):
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def _get(self, url, params):
+        """GETs a JSON document through the response cache. Returns None on failure or a miss."""
+        if self.cache is None:
+            # Offline without a cache (e.g. it could not be opened) has nothing to answer from
+            return None if self.offline else self._fetch(url, params)[1]
+
+        key = self.cache.make_key(url, params)
+        hit, value = self.cache.get(key, allow_stale=self.offline)
+        metrics.incr("s2.cache_hit" if hit else "s2.cache_miss")
+        if hit or self.offline:
+            return value
+
+        found, value = self._fetch(url, params)
+        if found is None:
+            # Network trouble: a stale answer is better than none
+            return self.cache.get(key, allow_stale=True)[1]
+        self.cache.put(key, url, value, CACHE_TTL if found else NOT_FOUND_TTL)
+        return value
+
+    def _fetch(self, url, params, payload=None, prepaid=False):
+        """Performs the request (a POST of payload as JSON if given), retrying on rate limiting
+        and server errors. prepaid means the caller already took a rate limit token for it.
+
+        Returns (True, json) on success, (False, None) when the API says the paper does not
+        exist, and (None, None) when we gave up, so callers know what is safe to cache.
+        """
+        import requests
+        session = self._http()
+        endpoint = url.rsplit('/', 1)[-1]  # "search", "references" or "batch"
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                metrics.incr("s2.retries", endpoint=endpoint)
+            if not (prepaid and attempt == 0):
+                with metrics.timer("s2.rate_limit_wait"):
+                    self.limiter.acquire()
+            started = time.perf_counter()
+            try:
+                if payload is None:
+                    response = session.get(url, params=params, timeout=30)
+                else:
+                    response = session.post(url, params=params, json=payload, timeout=30)
+            except requests.RequestException as e:
+                metrics.observe("s2.request", (time.perf_counter() - started) * 1000, endpoint=endpoint, status="error")
+                metrics.incr("s2.status.error")
+                print(f"Semantic Scholar request failed ({e}), attempt {attempt + 1}")
+                self._backoff(attempt)
+                continue
+
+            metrics.observe("s2.request", (time.perf_counter() - started) * 1000,
+                            endpoint=endpoint, status=response.status_code, attempt=attempt)
+            metrics.incr(f"s2.status.{response.status_code}")
+            if response.status_code == 200:
+                return True, response.json()
+            if response.status_code == 404:
+                return False, None
+            if response.status_code == 429 or response.status_code >= 500:
+                retry_after = response.headers.get("Retry-After")
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else None
+                if response.status_code == 429:
+                    # Stall every worker sharing the bucket, not just this one
+                    self.limiter.penalize(delay or min(60, 2 ** attempt))
+                else:
+                    self._backoff(attempt, delay)
+                continue
+            print(f"Semantic Scholar returned HTTP {response.status_code} for {url}")
+            return None, None
+        metrics.incr("s2.gave_up", endpoint=endpoint)
+        print(f"Giving up on {url} after {self.max_retries + 1} attempts")
+        return None, None
+
+    def _backoff(self, attempt, delay=None):
+        if delay is None:
+            delay = min(60, 2 ** attempt) + random.uniform(0, 0.5)
+        time.sleep(delay)
+
+    def search_by_title(self, title):
+        """Searches by title and returns the best match (or None)."""
+        params = {
+            "query": title,
+            "limit": 1,
+            "fields": PAPER_FIELDS
+        }
+        data = self._get(f"{self.base_url}/paper/search", params)
+        if data and data.get("data"):
+            return data["data"][0]
+        return None
+
+    def fetch_references(self, paper_id):
+        """Fetches the full reference list for a given paper ID in our standard reference format,
+        following the endpoint's pagination."""
+        if not paper_id:
+            return []
+        references = []
+        offset = 0
+        while offset is not None:
+            params = {
+                "fields": REFERENCE_FIELDS,
+                "offset": offset,
+                "limit": REFERENCE_PAGE_SIZE
+            }
+            data = self._get(f"{self.base_url}/paper/{paper_id}/references", params)
+            if not data or not data.get("data"):
+                break
+            references.extend(format_reference(ref["citedPaper"]) for ref in data["data"] if ref.get("citedPaper"))
+            offset = data.get("next")
+        return references
+
+    def _paper_key(self, paper_id, fields):
+        return self.cache.make_key(f"{self.base_url}/paper/{paper_id}", {"fields": fields})
+
+    def cached_paper(self, paper_id, fields=BATCH_FIELDS):
+        """Returns (hit, record) for a paper looked up before (in offline mode every lookup is a hit)."""
+        if self.cache is None:
+            return self.offline, None
+        hit, value = self.cache.get(self._paper_key(paper_id, fields), allow_stale=self.offline)
+        metrics.incr("s2.cache_hit" if hit else "s2.cache_miss")
+        return hit or self.offline, value
+
+    def fetch_papers(self, paper_ids, fields=BATCH_FIELDS, prepaid=False):
+        """Looks up many papers by Semantic Scholar id, "DOI:..." or "ARXIV:..." with as few
+        POST /paper/batch requests as possible.
+
+        Returns {id: record, or None if the paper is unknown}. Ids whose batch failed are left
+        out, so callers can fall back to other endpoints. prepaid: a rate limit token was
+        already taken for the first request.
+        """
+        url = f"{self.base_url}/paper/batch"
+        results = {}
+        missing = []
+        for paper_id in dict.fromkeys(paper_ids):
+            hit, value = self.cached_paper(paper_id, fields)
+            if hit:
+                results[paper_id] = value
+            else:
+                missing.append(paper_id)
+
+        for start in range(0, len(missing), BATCH_SIZE):
+            chunk = missing[start:start + BATCH_SIZE]
+            metrics.observe("s2.batch_size", len(chunk))
+            found, data = self._fetch(url, {"fields": fields}, {"ids": chunk}, prepaid=prepaid and start == 0)
+            if not found or not isinstance(data, list):
+                for paper_id in chunk:
+                    # Network trouble: a stale answer is better than none
+                    if self.cache is not None:
+                        hit, value = self.cache.get(self._paper_key(paper_id, fields), allow_stale=True)
+                        if hit:
+                            results[paper_id] = value
+                continue
+            for paper_id, record in zip(chunk, data):
+                results[paper_id] = record
+                if self.cache is not None:
+                    self.cache.put(self._paper_key(paper_id, fields), url, record, CACHE_TTL if record else NOT_FOUND_TTL)
+        return results
+
+    def paper_references(self, record):
+        """Reference list of a batch record, paging through the references endpoint if the
+        embedded list was cut off."""
+        references = record.get("references")
+        if references is None or len(references) >= BATCH_REFERENCE_LIMIT:
+            return self.fetch_references(record.get("paperId"))
+        return [format_reference(cp) for cp in references if cp]
+
+
+class PaperBatcher:
+    """Coalesces paper lookups from concurrent API workers into shared batch requests.
+
+    The first lookup to arrive waits BATCH_WINDOW seconds (or until a batch is full), and
+    then for a rate limit token, for others to join; then it sends them all in one request
+    and hands every worker its record.
+    """
+
+    def __init__(self, client, window=BATCH_WINDOW, batch_size=BATCH_SIZE):
+        self.client = client
+        self.window = window
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pending = {}   # paper id -> _Lookup
+        self._collecting = False
+        self._full = threading.Event()
+
+    def get(self, paper_id):
+        """Record for paper_id (see SemanticScholarClient.fetch_papers), or None."""
+        hit, record = self.client.cached_paper(paper_id)
+        if hit:
+            return record
+        with self._lock:
+            lookup = self._pending.get(paper_id)
+            if lookup is None:
+                lookup = self._pending[paper_id] = _Lookup()
+            leader = not self._collecting
+            self._collecting = True
+            if len(self._pending) >= self.batch_size:
+                self._full.set()
+        if leader:
+            self._full.wait(self.window)
+            # Lookups keep joining while the rate limit holds the request back
+            with metrics.timer("s2.rate_limit_wait"):
+                self.client.limiter.acquire()
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._collecting = False
+                self._full.clear()
+            try:
+                results = self.client.fetch_papers(list(batch), prepaid=True)
+            except Exception as e:
+                print(f"Error in Semantic Scholar batch lookup: {e}")
+                results = {}
+            for key, waiting in batch.items():
+                waiting.record = results.get(key)
+                waiting.done.set()
+        lookup.done.wait()
+        return lookup.record
+
+
+class _Lookup:
+    __slots__ = ("done", "record")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.record = None
+
+
+def format_reference(cp):
+    """Formats a Semantic Scholar paper record into our standard reference dictionary."""
+    author_str = ", ".join([a.get("name", "") for a in cp.get("authors") or [] if a.get("name")])
+    title_str = cp.get("title") or ""
+    year_str = str(cp.get("year") or "")
+    text_rep = f"{author_str} ({year_str}). {title_str}"
+    return {
+        "text": text_rep,
+        "title": title_str, # Store raw title for easier matching later
+        "semantic_scholar_id": cp.get("paperId")
+    }
@@ -0,0 +1,90 @@
+import os
+import time
+
+THUMBNAIL_WIDTH = 160  # px; about twice the sidebar size so it stays sharp on HiDPI screens
+JPEG_QUALITY = 70
+
+
+class ThumbnailCache:
+    """First-page JPEG thumbnails keyed by PDF content hash, under a total size budget.
+
+    Rendering happens in indexing worker processes (render_thumbnail), which write files
+    atomically; the app only checks for a file and hands its URL to the UI. Least recently
+    used thumbnails are removed once the directory grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir, max_bytes=64 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def path_for(self, content_hash):
+        return thumbnail_path(self.cache_dir, content_hash)
+
+    def get(self, content_hash):
+        """Path of the cached thumbnail, or None. Touching it marks it recently used."""
+        if not content_hash:
+            return None
+        path = self.path_for(content_hash)
+        try:
+            # Refresh the LRU timestamp at most daily; listings ask for every paper's thumbnail
+            if time.time() - os.stat(path).st_mtime > 86400:
+                os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def enforce_budget(self):
+        """Evicts least recently used thumbnails until the cache fits in max_bytes."""
+        files = []
+        total = 0
+        for root, _dirs, names in os.walk(self.cache_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        if total <= self.max_bytes:
+            return 0
+        removed = 0
+        # Trim to 90% so a busy indexing run doesn't evict on every batch
+        for _mtime, size, path in sorted(files):
+            if total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+def thumbnail_path(cache_dir, content_hash):
+    return os.path.join(cache_dir, content_hash[:2], f"{content_hash}.jpg")
+
+
+def render_thumbnail(pdf_path, content_hash, cache_dir):
+    """Renders the first page of a PDF into the cache (runs in worker processes). Returns the path."""
+    path = thumbnail_path(cache_dir, content_hash)
+    if os.path.exists(path):
+        return path
+    import fitz  # PyMuPDF; only worker processes need it
+    doc = fitz.open(pdf_path)
+    try:
+        if len(doc) == 0:
+            return None
+        page = doc[0]
+        scale = THUMBNAIL_WIDTH / max(page.rect.width, 1)
+        pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
+        data = pix.tobytes("jpeg", jpg_quality=JPEG_QUALITY)
+    finally:
+        doc.close()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return path
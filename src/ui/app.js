@@ -1,12 +1,36 @@
 let pdfDoc = null;
 let highlights = [];
-let lastPapersJson = "";
+let libraryPapers = new Map(); // filename -> paper summary, in library order
+let paperItems = new Map();    // filename -> its <li> in #papers-list, in the same order
+let libraryVersion = -1;
 let initialLoadDone = false;
 let currentSelectionData = null;
 let globalReferences = [];
 let historyStack = [];
 let currentFilePath = null;
 
+// Virtualized viewer: every page gets a sized placeholder, only pages near the viewport are rendered
+const RENDER_ROOT_MARGIN = '1200px 0px'; // start rendering pages this far before they scroll into view
+const MAX_RENDERED_PAGES = 12;           // memory budget: canvases kept alive at once
+let pageSlots = [];                      // index = pageNum - 1 -> { wrapper, state, visible, lastUsed }
+let pageObserver = null;
+let viewerGeneration = 0;                // bumps on every document load so stale renders bail out
+let priorityPages = [];                  // pages the user jumped to; rendered before anything else
+let renderLoopRunning = false;
+let pageTextCache = new Map();           // pageNum -> plain text, for searching pages that are not rendered
+const PAGE_TEXT_CHUNK = 16;              // pages of backend text fetched per request when a search needs them
+let pageTextRequests = new Map();        // first page index of a chunk -> pending get_page_texts request
+let pageTextPath = null;                 // file whose text the backend serves for the current document
+
+// Recently viewed PDF.js documents, so going back to a paper skips fetching and parsing it again
+const DOC_CACHE_SIZE = 3;
+let docCache = new Map();                // "url|size|mtime" -> PDFDocumentProxy, least recently used first
+
+// Page render timings are batched and sent to the backend metrics every few seconds
+const RENDER_METRICS_FLUSH_MS = 5000;
+let pendingRenderTimings = [];
+let renderMetricsTimer = null;
+
 // Global function for cross-paper linking
 async function openPdf(filepath, isGoBack = false) {
     if (window.pywebview) {
@@ -22,7 +46,7 @@ async function openPdf(filepath, isGoBack = false) {
                 updateBackButton();
             }
 
-            handlePdfLoaded(res);
+            await handlePdfLoaded(res);
             // close tooltip if open
             document.getElementById('citation-tooltip').style.display = 'none';
         } catch (err) {
@@ -43,15 +67,16 @@ function updateBackButton() {
 document.addEventListener('DOMContentLoaded', async () => {
     const openBtn = document.getElementById('open-btn');
     const placeholderMsg = document.getElementById('placeholder-msg');
+    document.getElementById('library-search').addEventListener('input', onLibrarySearchInput);
 
-    // Fetch local papers on startup and set polling
+    // Fetch local papers on startup; afterwards the backend pushes deltas via applyLibraryDelta
     if (window.pywebview) {
         await loadLocalPapers();
-        setInterval(loadLocalPapers, 2000);
+        reportUiReady();
     } else {
         window.addEventListener('pywebviewready', async () => {
             await loadLocalPapers();
-            setInterval(loadLocalPapers, 2000);
+            reportUiReady();
         });
     }
 
@@ -86,10 +111,10 @@ document.addEventListener('DOMContentLoaded', async () => {
                     document.getElementById('refs-container') ? document.getElementById('refs-container').style.display = 'none' : null;
                     document.getElementById('right-sidebar').style.display = 'none';
                     pdfDoc = null;
+                    clearDocumentCache();
                     currentFilePath = null;
                     historyStack = [];
                     updateBackButton();
-                    lastPapersJson = ""; // force sidebar reload
 
                     alert(`Library folder changed to:\n${response.new_path}`);
                     await loadLocalPapers();
@@ -180,8 +205,7 @@ document.addEventListener('DOMContentLoaded', async () => {
         renderMemoList();
 
         if (window.pywebview) {
-            await window.pywebview.api.save_highlight(highlightData);
-            loadLocalPapers(); // update memo count display
+            await window.pywebview.api.save_highlight(highlightData); // memo count arrives as a pushed delta
         }
 
         window.getSelection().removeAllRanges();
@@ -226,64 +250,193 @@ async function loadLocalPapers() {
     try {
         const response = await window.pywebview.api.get_local_papers();
         if (response && response.success) {
-            const currentPapersJson = JSON.stringify(response.papers);
-            if (currentPapersJson === lastPapersJson) return;
-            lastPapersJson = currentPapersJson;
+            libraryPapers = new Map(response.papers.map(p => [p.filename, p]));
+            libraryVersion = response.version;
+            renderIndexingProgress(response.progress);
+            renderPapersList();
+        }
+    } catch (e) {
+        console.error("Failed to load local papers", e);
+    }
+}
 
-            const list = document.getElementById('papers-list');
-            list.innerHTML = '';
+// Tells the backend the sidebar is on screen; it loads the full index and starts scanning only then
+function reportUiReady() {
+    requestAnimationFrame(() => setTimeout(() => {
+        window.pywebview.api.ui_ready({ sidebar_painted_ms: Math.round(performance.now()) })
+            .catch(e => console.error("Failed to report startup", e));
+    }, 0));
+}
 
-            if (response.papers.length === 0) {
-                list.innerHTML = '<li class="empty-state">No PDFs in "papers/" folder.</li>';
-                return;
-            }
+// Called by the backend (window.evaluate_js) whenever the library changes
+window.applyLibraryDelta = (delta) => {
+    if (libraryVersion < 0 || delta.version <= libraryVersion) return; // not loaded yet, or already included
+    if (delta.version !== libraryVersion + 1) {
+        // We missed an update; resynchronize from a full listing
+        loadLocalPapers();
+        return;
+    }
+    libraryVersion = delta.version;
+
+    // Only the list items named in the delta are touched; new papers go last, like in libraryPapers
+    const list = document.getElementById('papers-list');
+    delta.changes.forEach(change => {
+        const li = paperItems.get(change.filename);
+        if (change.kind === 'removed') {
+            libraryPapers.delete(change.filename);
+            paperItems.delete(change.filename);
+            if (li) li.remove();
+            return;
+        }
+        libraryPapers.set(change.filename, change.paper);
+        const item = createPaperItem(change.paper);
+        paperItems.set(change.filename, item);
+        if (li) {
+            li.replaceWith(item);
+        } else {
+            list.appendChild(item);
+        }
+    });
+    renderIndexingProgress(delta.progress);
+    updatePapersEmptyState(list);
+    openFirstPaperOnce();
+};
+
+// Full rebuild, for the initial listing and resynchronizing; deltas update single items
+function renderPapersList() {
+    const list = document.getElementById('papers-list');
+    list.innerHTML = '';
+    paperItems = new Map();
+    libraryPapers.forEach(p => {
+        const li = createPaperItem(p);
+        paperItems.set(p.filename, li);
+        list.appendChild(li);
+    });
+    updatePapersEmptyState(list);
+    openFirstPaperOnce();
+}
+
+function updatePapersEmptyState(list) {
+    const empty = list.querySelector('.empty-state');
+    if (libraryPapers.size === 0 && !empty) {
+        list.innerHTML = '<li class="empty-state">No PDFs in "papers/" folder.</li>';
+    } else if (libraryPapers.size > 0 && empty) {
+        empty.remove();
+    }
+}
 
-            let firstPaperPath = null;
+function openFirstPaperOnce() {
+    const first = libraryPapers.values().next().value;
+    if (!initialLoadDone && first && first.status !== 'indexing') {
+        initialLoadDone = true;
+        openPdf(first.filepath);
+    }
+}
 
-            response.papers.forEach((p, idx) => {
-                const li = document.createElement('li');
+function createPaperItem(p) {
+    const li = document.createElement('li');
 
-                if (p.status === 'indexing') {
-                    li.style.opacity = '0.6';
-                    li.style.pointerEvents = 'none';
-                    li.innerHTML = `<strong>${p.filename}</strong><br><span style="font-size: 0.8rem; color: #f59e0b;">⏳ 분석 중 (Indexing...)</span>`;
-                } else {
-                    // Display rich metadata
-                    const titleHtml = p.title !== p.filename ? `<strong>${p.title}</strong><br>` : `<strong>${p.filename}</strong><br>`;
-                    const authorHtml = p.authors ? `<span style="font-size: 0.75rem; color: #64748b">${p.authors} ${p.year ? `(${p.year})` : ''}</span><br>` : '';
-
-                    // Connection badge based on network
-                    let badgesHtml = '';
-                    if (p.cites_count > 0 || p.cited_by_count > 0) {
-                        badgesHtml = `<span style="font-size: 0.7rem; background: #e0f2fe; color: #0284c7; padding: 2px 4px; border-radius: 4px; margin-right: 4px;">🔗 ${p.cites_count + p.cited_by_count} Links</span>`;
-                    }
-                    if (p.memos_count > 0) {
-                        badgesHtml += `<span style="font-size: 0.7rem; background: #fef08a; color: #854d0e; padding: 2px 4px; border-radius: 4px;">📝 ${p.memos_count} Memos</span>`;
-                    }
+    if (p.status === 'indexing') {
+        li.style.opacity = '0.6';
+        li.style.pointerEvents = 'none';
+        li.innerHTML = `<strong>${p.filename}</strong><br><span style="font-size: 0.8rem; color: #f59e0b;">⏳ 분석 중 (Indexing...)</span>`;
+    } else {
+        // Display rich metadata
+        const titleHtml = p.title !== p.filename ? `<strong>${p.title}</strong><br>` : `<strong>${p.filename}</strong><br>`;
+        const authorHtml = p.authors ? `<span style="font-size: 0.75rem; color: #64748b">${p.authors} ${p.year ? `(${p.year})` : ''}</span><br>` : '';
+
+        // Connection badge based on network
+        let badgesHtml = '';
+        if (p.cites_count > 0 || p.cited_by_count > 0) {
+            badgesHtml = `<span style="font-size: 0.7rem; background: #e0f2fe; color: #0284c7; padding: 2px 4px; border-radius: 4px; margin-right: 4px;">🔗 ${p.cites_count + p.cited_by_count} Links</span>`;
+        }
+        if (p.memos_count > 0) {
+            badgesHtml += `<span style="font-size: 0.7rem; background: #fef08a; color: #854d0e; padding: 2px 4px; border-radius: 4px;">📝 ${p.memos_count} Memos</span>`;
+        }
+        if (p.duplicate_of) {
+            badgesHtml += `<span title="${p.duplicate_of}" style="font-size: 0.7rem; background: #f1f5f9; color: #475569; padding: 2px 4px; border-radius: 4px; margin-left: 4px;">📄 Copy</span>`;
+        }
 
-                    li.innerHTML = `${titleHtml}${authorHtml}<div style="margin-top:4px;">${badgesHtml}</div>`;
+        // First-page preview rendered during indexing; the PDF itself is only loaded on open
+        const thumbHtml = p.thumbnail_url ? `<img class="paper-thumb" src="${p.thumbnail_url}" loading="lazy" alt="">` : '';
 
-                    li.addEventListener('click', () => {
-                        openPdf(p.filepath); // Routes through our history-aware method
-                    });
-                }
+        li.innerHTML = `${thumbHtml}${titleHtml}${authorHtml}<div style="margin-top:4px;">${badgesHtml}</div>`;
+
+        li.addEventListener('click', () => {
+            openPdf(p.filepath); // Routes through our history-aware method
+        });
+    }
 
-                list.appendChild(li);
+    return li;
+}
 
-                if (idx === 0 && p.status !== 'indexing' && !firstPaperPath) {
-                    firstPaperPath = p.filepath;
-                }
-            });
+// Full-text search over the library; results replace the paper list while a query is typed
+let searchTimer = null;
+let searchSeq = 0;
+
+function onLibrarySearchInput(e) {
+    clearTimeout(searchTimer);
+    const query = e.target.value.trim();
+    searchTimer = setTimeout(() => runLibrarySearch(query), 250);
+}
+
+async function runLibrarySearch(query) {
+    const results = document.getElementById('search-results');
+    const papersList = document.getElementById('papers-list');
+    const seq = ++searchSeq;
+    if (!query) {
+        results.style.display = 'none';
+        papersList.style.display = '';
+        return;
+    }
+    try {
+        const res = await window.pywebview.api.search(query);
+        if (seq !== searchSeq) return; // a newer query is already on its way
+        renderSearchResults(res && res.success ? res.hits : []);
+        results.style.display = '';
+        papersList.style.display = 'none';
+    } catch (err) {
+        console.error("Search failed", err);
+    }
+}
 
-            // Automatically open the first paper ONCE
-            if (!initialLoadDone && firstPaperPath) {
-                initialLoadDone = true;
-                openPdf(firstPaperPath);
+function renderSearchResults(hits) {
+    const list = document.getElementById('search-results');
+    list.innerHTML = '';
+    if (hits.length === 0) {
+        list.innerHTML = '<li class="empty-state">검색 결과 없음 (No matches)</li>';
+        return;
+    }
+    hits.forEach(hit => {
+        const li = document.createElement('li');
+        const title = document.createElement('strong');
+        title.textContent = hit.title;
+        const page = document.createElement('span');
+        page.style.cssText = 'font-size: 0.7rem; color: #0284c7; margin-left: 4px;';
+        page.textContent = `p. ${hit.page}`;
+        const snippet = document.createElement('div');
+        snippet.style.cssText = 'font-size: 0.75rem; color: #64748b; margin-top: 2px;';
+        snippet.textContent = hit.snippet;
+        li.append(title, page, snippet);
+        li.addEventListener('click', async () => {
+            if (currentFilePath !== hit.filepath) {
+                await openPdf(hit.filepath);
             }
-        }
-    } catch (e) {
-        console.error("Failed to load local papers", e);
+            scrollToPage(hit.page);
+        });
+        list.appendChild(li);
+    });
+}
+
+function renderIndexingProgress(progress) {
+    const el = document.getElementById('indexing-progress');
+    if (!progress || progress.active === 0) {
+        el.style.display = 'none';
+        return;
     }
+    const done = progress.completed + progress.failed;
+    el.style.display = 'block';
+    el.innerText = `⏳ 분석 중 ${done} / ${progress.submitted} (${progress.papers_per_minute} papers/min)`;
 }
 
 async function handlePdfLoaded(response) {
@@ -295,27 +448,18 @@ async function handlePdfLoaded(response) {
         globalReferences = response.references || [];
         const indexData = response.index_data || {};
 
-        const container = document.getElementById('pages-container');
-        container.innerHTML = '';
+        resetViewer();
+
+        // Page text is requested from the backend only when a search reaches those pages
+        pageTextPath = response.filepath;
 
         renderMemoList();
         renderReferences(globalReferences);
         renderNetworkLinks(indexData);
 
-        const binaryString = atob(response.data);
-        const bytes = new Uint8Array(binaryString.length);
-        for (let i = 0; i < binaryString.length; i++) {
-            bytes[i] = binaryString.charCodeAt(i);
-        }
+        pdfDoc = await loadDocument(response);
 
-        const loadingTask = pdfjsLib.getDocument({ data: bytes });
-        pdfDoc = await loadingTask.promise;
-
-        // Render all pages for continuous scrolling
-        // Rendering sequentially to avoid blocking the main thread too hard
-        for (let pageNum = 1; pageNum <= pdfDoc.numPages; pageNum++) {
-            await renderPage(pageNum);
-        }
+        await layoutPages();
 
     } else if (response && response.error) {
         if (response.error !== "No file selected") {
@@ -324,6 +468,37 @@ async function handlePdfLoaded(response) {
     }
 }
 
+async function loadDocument(response) {
+    const key = `${response.url}|${response.file_size}|${response.file_mtime}`;
+    let doc = docCache.get(key);
+    if (doc) {
+        docCache.delete(key);
+        docCache.set(key, doc);
+        return doc;
+    }
+    // Let PDF.js range-fetch the file from the local server; it only pulls the bytes it renders
+    const loadingTask = pdfjsLib.getDocument({
+        url: response.url,
+        length: response.file_size,
+        rangeChunkSize: 256 * 1024,
+        disableAutoFetch: true,
+        disableStream: false
+    });
+    doc = await loadingTask.promise;
+    docCache.set(key, doc);
+    while (docCache.size > DOC_CACHE_SIZE) {
+        const [oldKey, oldDoc] = docCache.entries().next().value;
+        docCache.delete(oldKey);
+        if (oldDoc !== pdfDoc) oldDoc.destroy();
+    }
+    return doc;
+}
+
+function clearDocumentCache() {
+    docCache.forEach(doc => doc.destroy());
+    docCache.clear();
+}
+
 function renderReferences(refs) {
     const sidebar = document.getElementById('right-sidebar');
     const list = document.getElementById('ref-list');
@@ -362,7 +537,7 @@ function renderReferences(refs) {
         }
 
         // Clicking the reference in the sidebar searches for it in the text
-        li.addEventListener('click', () => {
+        li.addEventListener('click', async () => {
             const searchText = `[${index + 1}]`;
             let found = false;
 
@@ -383,35 +558,26 @@ function renderReferences(refs) {
                 }, 2000);
             };
 
-            const spans = Array.from(document.querySelectorAll('.textLayer span'));
-            const validSpans = spans.filter(s => s.textContent.trim().length > 0);
-
-            let fullText = "";
-            const spanMap = [];
-            validSpans.forEach(span => {
-                const start = fullText.length;
-                fullText += span.textContent;
-                spanMap.push({ span, start, end: fullText.length });
-            });
-
             const indexStr = `${index + 1}`;
             const escapedIndex = indexStr.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
             // Check for [1], [ 1 ], [1,, or ,1]
-            const pattern = new RegExp(`\\[\\s*${escapedIndex}\\s*\\]|\\[\\s*${escapedIndex}\\s*,|,\\s*${escapedIndex}\\s*\\]|,\\s*${escapedIndex}\\s*,`, 'g');
-
-            let match;
-            while ((match = pattern.exec(fullText)) !== null) {
-                const matchIndex = match.index;
-                const targetSpanInfo = spanMap.find(info => matchIndex >= info.start && matchIndex < info.end);
-                if (targetSpanInfo) {
-                    highlightSpan(targetSpanInfo.span);
+            const patternSource = `\\[\\s*${escapedIndex}\\s*\\]|\\[\\s*${escapedIndex}\\s*,|,\\s*${escapedIndex}\\s*\\]|,\\s*${escapedIndex}\\s*,`;
+
+            // Most pages are not rendered, so find the first page whose text cites it, then render just that page
+            for (let num = 1; num <= (pdfDoc ? pdfDoc.numPages : 0) && !found; num++) {
+                const pageText = await getPageText(num);
+                if (!new RegExp(patternSource).test(pageText)) continue;
+
+                await ensurePageRendered(num);
+                const span = findSpanMatching(pageSlots[num - 1].wrapper, new RegExp(patternSource, 'g'));
+                if (span) {
+                    highlightSpan(span);
                     found = true;
-                    break;
                 }
             }
 
             if (!found) {
-                for (let span of validSpans) {
+                for (let span of document.querySelectorAll('.textLayer span')) {
                     if (span.textContent.trim() === indexStr) {
                         highlightSpan(span);
                         found = true;
@@ -429,6 +595,27 @@ function renderReferences(refs) {
     });
 }
 
+function findSpanMatching(pageWrapper, pattern) {
+    const spans = Array.from(pageWrapper.querySelectorAll('.textLayer span'));
+    const validSpans = spans.filter(s => s.textContent.trim().length > 0);
+
+    let fullText = "";
+    const spanMap = [];
+    validSpans.forEach(span => {
+        const start = fullText.length;
+        fullText += span.textContent;
+        spanMap.push({ span, start, end: fullText.length });
+    });
+
+    let match;
+    while ((match = pattern.exec(fullText)) !== null) {
+        const matchIndex = match.index;
+        const targetSpanInfo = spanMap.find(info => matchIndex >= info.start && matchIndex < info.end);
+        if (targetSpanInfo) return targetSpanInfo.span;
+    }
+    return null;
+}
+
 function renderNetworkLinks(indexData) {
     const container = document.getElementById('network-container');
     const citesList = document.getElementById('cites-list');
@@ -458,19 +645,14 @@ function renderNetworkLinks(indexData) {
             const li = document.createElement('li');
             li.style.marginBottom = '6px';
 
-            // Try to find full data in lastPapersJson
+            // Try to find full data in the library state
             let title = filename;
             let filepath = filename;
-            try {
-                if (lastPapersJson) {
-                    const allPapers = JSON.parse(lastPapersJson);
-                    const match = allPapers.find(p => p.filename === filename);
-                    if (match) {
-                        title = match.title;
-                        filepath = match.filepath;
-                    }
-                }
-            } catch (e) { }
+            const match = libraryPapers.get(filename);
+            if (match) {
+                title = match.title;
+                filepath = match.filepath;
+            }
 
             li.innerHTML = `<button class="action-btn" style="width: 100%; text-align: left; padding: 6px; font-size: 0.8rem; background: #f8fafc; color: var(--text-color); border: 1px solid #e2e8f0;">📑 ${title}</button>`;
             li.addEventListener('click', () => openPdf(filepath));
@@ -482,60 +664,263 @@ function renderNetworkLinks(indexData) {
     renderItems(citedBy, citedByList);
 }
 
-async function renderPage(num) {
-    if (!pdfDoc) return;
-
-    const page = await pdfDoc.getPage(num);
-
-    const wrapper = document.createElement('div');
-    wrapper.className = 'pdf-page-wrapper';
-    wrapper.dataset.pageNum = num;
-
-    const canvas = document.createElement('canvas');
-    const textLayerDiv = document.createElement('div');
-    textLayerDiv.className = 'textLayer';
-
-    wrapper.appendChild(canvas);
-    wrapper.appendChild(textLayerDiv);
-    document.getElementById('pages-container').appendChild(wrapper);
-
-    const ctx = canvas.getContext('2d');
+function resetViewer() {
+    viewerGeneration++;
+    if (pageObserver) pageObserver.disconnect();
+    pageObserver = null;
+    pageSlots.forEach(releasePage);
+    pageSlots = [];
+    priorityPages = [];
+    pageTextCache = new Map();
+    pageTextRequests = new Map();
+    pageTextPath = null;
+    document.getElementById('pages-container').innerHTML = '';
+}
 
+function computeViewport(page) {
     // Calculate scale to fit viewport width gracefully
     const parentWidth = document.getElementById('pdf-container').clientWidth;
     const unscaledViewport = page.getViewport({ scale: 1.0 });
     const scale = Math.min(parentWidth / unscaledViewport.width, 1.5);
-    const viewport = page.getViewport({ scale: scale });
+    return page.getViewport({ scale: scale });
+}
 
-    canvas.height = viewport.height;
-    canvas.width = viewport.width;
-    textLayerDiv.style.width = `${viewport.width}px`;
-    textLayerDiv.style.height = `${viewport.height}px`;
+function sizeWrapper(wrapper, viewport) {
     wrapper.style.width = `${viewport.width}px`;
     wrapper.style.height = `${viewport.height}px`;
+}
 
-    const renderContext = {
-        canvasContext: ctx,
-        viewport: viewport
-    };
+async function layoutPages() {
+    if (!pdfDoc) return;
+    const generation = viewerGeneration;
+    const container = document.getElementById('pages-container');
+
+    // Size every placeholder from page 1 right away; real sizes are filled in below
+    const firstViewport = computeViewport(await pdfDoc.getPage(1));
+    if (generation !== viewerGeneration) return;
 
-    await page.render(renderContext).promise;
-
-    // Render text layer
-    const textContent = await page.getTextContent();
-    await pdfjsLib.renderTextLayer({
-        textContentSource: textContent,
-        container: textLayerDiv,
-        viewport: viewport,
-        textDivs: []
-    }).promise;
-
-    // Draw existing highlights for this specific page
-    highlights.forEach(h => {
-        if (h.page === num) {
-            drawHighlight(h, wrapper);
+    pageObserver = new IntersectionObserver(onPagesIntersect, {
+        root: document.getElementById('viewer-scroll-container'),
+        rootMargin: RENDER_ROOT_MARGIN
+    });
+
+    for (let num = 1; num <= pdfDoc.numPages; num++) {
+        const wrapper = document.createElement('div');
+        wrapper.className = 'pdf-page-wrapper';
+        wrapper.dataset.pageNum = num;
+        sizeWrapper(wrapper, firstViewport);
+        container.appendChild(wrapper);
+
+        pageSlots.push({ wrapper, state: 'empty', visible: false, lastUsed: 0 });
+        pageObserver.observe(wrapper);
+
+        // Highlights live on the placeholder, so they survive canvases being released
+        highlights.forEach(h => {
+            if (h.page === num) drawHighlight(h, wrapper);
+        });
+    }
+
+    // Correct placeholder sizes for documents with mixed page sizes, without blocking reading
+    for (let num = 2; num <= pdfDoc.numPages; num++) {
+        const page = await pdfDoc.getPage(num);
+        if (generation !== viewerGeneration) return;
+        const slot = pageSlots[num - 1];
+        if (slot.state === 'empty') sizeWrapper(slot.wrapper, computeViewport(page));
+    }
+}
+
+function onPagesIntersect(entries) {
+    entries.forEach(entry => {
+        const slot = pageSlots[parseInt(entry.target.dataset.pageNum) - 1];
+        if (slot) slot.visible = entry.isIntersecting;
+    });
+    pumpRenderQueue();
+}
+
+function distanceFromViewport(slot) {
+    const scroller = document.getElementById('viewer-scroll-container');
+    const center = scroller.scrollTop + scroller.clientHeight / 2;
+    return Math.abs(slot.wrapper.offsetTop + slot.wrapper.offsetHeight / 2 - center);
+}
+
+function nextPageToRender() {
+    while (priorityPages.length > 0) {
+        const num = priorityPages.shift();
+        if (pageSlots[num - 1] && pageSlots[num - 1].state === 'empty') return num;
+    }
+    let best = null;
+    let bestDistance = Infinity;
+    pageSlots.forEach((slot, idx) => {
+        if (!slot.visible || slot.state !== 'empty') return;
+        const distance = distanceFromViewport(slot);
+        if (distance < bestDistance) {
+            best = idx + 1;
+            bestDistance = distance;
         }
     });
+    return best;
+}
+
+async function pumpRenderQueue() {
+    if (renderLoopRunning) return;
+    renderLoopRunning = true;
+    try {
+        let num;
+        while ((num = nextPageToRender()) !== null) {
+            await renderPage(num);
+        }
+    } finally {
+        renderLoopRunning = false;
+    }
+    enforceRenderBudget();
+}
+
+// Renders a page ahead of everything else (reference clicks, memo jumps) and resolves when it is ready
+async function ensurePageRendered(num) {
+    const slot = pageSlots[num - 1];
+    if (!slot) return;
+    if (slot.state === 'empty') {
+        await renderPage(num);
+    }
+    while (slot.state === 'rendering') {
+        await new Promise(resolve => setTimeout(resolve, 30));
+    }
+}
+
+async function scrollToPage(num) {
+    const slot = pageSlots[num - 1];
+    if (!slot) return;
+    priorityPages.unshift(num);
+    slot.wrapper.scrollIntoView({ behavior: 'smooth' });
+    pumpRenderQueue();
+}
+
+function enforceRenderBudget() {
+    const rendered = pageSlots.filter(slot => slot.state === 'rendered');
+    if (rendered.length <= MAX_RENDERED_PAGES) return;
+
+    // Release the pages farthest from the viewport first; pages near the viewport are kept
+    const releasable = rendered
+        .filter(slot => !slot.visible)
+        .sort((a, b) => distanceFromViewport(b) - distanceFromViewport(a));
+    let excess = rendered.length - MAX_RENDERED_PAGES;
+    for (const slot of releasable) {
+        if (excess <= 0) break;
+        releasePage(slot);
+        excess--;
+    }
+}
+
+function releasePage(slot) {
+    const canvas = slot.wrapper.querySelector('canvas');
+    if (canvas) {
+        // Shrinking the canvas frees its backing store immediately
+        canvas.width = 0;
+        canvas.height = 0;
+        canvas.remove();
+    }
+    const textLayerDiv = slot.wrapper.querySelector('.textLayer');
+    if (textLayerDiv) textLayerDiv.remove();
+    slot.state = 'empty';
+}
+
+async function renderPage(num) {
+    if (!pdfDoc) return;
+    const slot = pageSlots[num - 1];
+    if (!slot || slot.state !== 'empty') return;
+
+    const generation = viewerGeneration;
+    slot.state = 'rendering';
+    const renderStarted = performance.now();
+
+    try {
+        const page = await pdfDoc.getPage(num);
+        if (generation !== viewerGeneration) return;
+
+        const wrapper = slot.wrapper;
+        const viewport = computeViewport(page);
+        sizeWrapper(wrapper, viewport);
+
+        const canvas = document.createElement('canvas');
+        const textLayerDiv = document.createElement('div');
+        textLayerDiv.className = 'textLayer';
+
+        canvas.height = viewport.height;
+        canvas.width = viewport.width;
+        textLayerDiv.style.width = `${viewport.width}px`;
+        textLayerDiv.style.height = `${viewport.height}px`;
+
+        // Insert beneath any highlight boxes already on the placeholder
+        wrapper.insertBefore(textLayerDiv, wrapper.firstChild);
+        wrapper.insertBefore(canvas, textLayerDiv);
+
+        const renderContext = {
+            canvasContext: canvas.getContext('2d'),
+            viewport: viewport
+        };
+
+        await page.render(renderContext).promise;
+
+        // Render text layer
+        const textContent = await page.getTextContent();
+        if (generation !== viewerGeneration) return;
+        pageTextCache.set(num, textContent.items.map(item => item.str).join(''));
+        await pdfjsLib.renderTextLayer({
+            textContentSource: textContent,
+            container: textLayerDiv,
+            viewport: viewport,
+            textDivs: []
+        }).promise;
+
+        slot.state = 'rendered';
+        slot.lastUsed = performance.now();
+        recordRenderTiming(num, slot.lastUsed - renderStarted);
+    } catch (err) {
+        console.error(`Failed to render page ${num}`, err);
+        if (generation === viewerGeneration) {
+            releasePage(slot);
+            slot.state = 'failed'; // don't retry in a loop
+        }
+    }
+}
+
+function recordRenderTiming(num, elapsedMs) {
+    pendingRenderTimings.push({ page: num, ms: Math.round(elapsedMs * 10) / 10 });
+    if (renderMetricsTimer) return;
+    renderMetricsTimer = setTimeout(() => {
+        const batch = pendingRenderTimings;
+        pendingRenderTimings = [];
+        renderMetricsTimer = null;
+        window.pywebview.api.record_render_timings(batch).catch(() => {});
+    }, RENDER_METRICS_FLUSH_MS);
+}
+
+async function getPageText(num) {
+    if (!pageTextCache.has(num) && pageTextPath) await loadBackendPageTexts(num);
+    if (!pageTextCache.has(num)) {
+        // Not available from the backend: let PDF.js extract it
+        const page = await pdfDoc.getPage(num);
+        const textContent = await page.getTextContent();
+        pageTextCache.set(num, textContent.items.map(item => item.str).join(''));
+    }
+    return pageTextCache.get(num);
+}
+
+// Page text comes from the backend's per-document cache one chunk at a time, so searching
+// unrendered pages neither makes PDF.js fetch and parse them nor ships the whole text on open
+function loadBackendPageTexts(num) {
+    const start = Math.floor((num - 1) / PAGE_TEXT_CHUNK) * PAGE_TEXT_CHUNK;
+    if (!pageTextRequests.has(start)) {
+        const generation = viewerGeneration;
+        const request = window.pywebview.api.get_page_texts(pageTextPath, start, PAGE_TEXT_CHUNK).then(res => {
+            if (!res || !res.success || generation !== viewerGeneration) return;
+            res.pages.forEach((text, idx) => {
+                if (!pageTextCache.has(res.start + idx + 1)) pageTextCache.set(res.start + idx + 1, text);
+            });
+        }).catch(err => console.error("Failed to load page text", err));
+        pageTextRequests.set(start, request);
+    }
+    return pageTextRequests.get(start);
 }
 
 function drawHighlight(h, wrapperElement) {
@@ -605,8 +990,6 @@ function renderMemoList() {
                     // Remove highlight DOM box efficiently without re-rendering the whole page
                     const box = document.querySelector(`.highlight-box[data-timestamp="${h.timestamp}"]`);
                     if (box) box.remove();
-
-                    loadLocalPapers(); // File list update
                 } else {
                     console.error("Failed to delete memo");
                 }
@@ -619,8 +1002,7 @@ function renderMemoList() {
 
         // Clicking a memo ideally scrolls to the page (optional enhancement)
         li.addEventListener('dblclick', () => {
-            const pageDiv = document.querySelector(`.pdf-page-wrapper[data-page-num="${h.page}"]`);
-            if (pageDiv) pageDiv.scrollIntoView({ behavior: 'smooth' });
+            scrollToPage(h.page);
         });
 
         list.appendChild(li);
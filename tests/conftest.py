@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The app runs from src/ with flat imports; tests import its modules the same way
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks"))
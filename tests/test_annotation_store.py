@@ -0,0 +1,115 @@
+import os
+import json
+import time
+
+import annotation_store
+from annotation_store import AnnotationStore, count_highlights, journal_path, sidecar_path
+
+
+def _pdf(tmp_path, highlights=None):
+    pdf = str(tmp_path / "paper.pdf")
+    if highlights is not None:
+        with open(sidecar_path(pdf), "w", encoding="utf-8") as f:
+            json.dump({"highlights": highlights, "memos": []}, f)
+    return pdf
+
+
+def _journal(pdf, *lines):
+    with open(journal_path(pdf), "a", encoding="utf-8") as f:
+        f.write("".join(lines))
+
+
+def _op(op):
+    return json.dumps(op) + "\n"
+
+
+def _sidecar(pdf):
+    with open(sidecar_path(pdf), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_journal_left_by_a_crash_is_replayed_and_folded_in(tmp_path):
+    pdf = _pdf(tmp_path, [{"timestamp": 1, "text": "kept"}, {"timestamp": 2, "text": "deleted"}])
+    _journal(pdf, _op({"op": "add", "highlight": {"timestamp": 3, "text": "added"}}),
+             _op({"op": "delete", "timestamp": 2}))
+    assert count_highlights(pdf) == 2
+
+    store = AnnotationStore(compact_delay=60)
+    assert [h["text"] for h in store.load(pdf)["highlights"]] == ["kept", "added"]
+    assert not os.path.exists(journal_path(pdf))
+    assert [h["text"] for h in _sidecar(pdf)["highlights"]] == ["kept", "added"]
+    store.close()
+
+
+def test_torn_last_line_is_ignored_and_not_glued_to_the_next_edit(tmp_path, monkeypatch):
+    pdf = _pdf(tmp_path)
+    _journal(pdf, _op({"op": "add", "highlight": {"timestamp": 1}}), '{"op": "add", "highl')
+    assert count_highlights(pdf) == 1
+
+    # Compaction keeps failing, so the torn journal stays and the next edit is appended to it
+    def fail(src, dst):
+        raise OSError("disk full")
+    monkeypatch.setattr(annotation_store.os, "replace", fail)
+    store = AnnotationStore(compact_delay=60)
+    assert store.count(pdf) == 1
+    assert store.add_highlight(pdf, {"timestamp": 2}) == 2
+    assert count_highlights(pdf) == 2  # read from disk, as after another crash
+
+    monkeypatch.undo()
+    store.close()
+    assert len(_sidecar(pdf)["highlights"]) == 2
+    assert not os.path.exists(journal_path(pdf))
+
+
+def test_edits_are_compacted_once_they_go_quiet(tmp_path):
+    pdf = _pdf(tmp_path)
+    store = AnnotationStore(compact_delay=0.05)
+    store.add_highlight(pdf, {"timestamp": 1, "text": "a"})
+    store.add_highlight(pdf, {"timestamp": 2, "text": "b"})
+    assert store.delete_highlight(pdf, 1) == (True, 1)
+    assert store.delete_highlight(pdf, 1) == (False, 1)
+    deadline = time.time() + 5
+    while os.path.exists(journal_path(pdf)) and time.time() < deadline:
+        time.sleep(0.02)
+    assert not os.path.exists(journal_path(pdf))
+    assert _sidecar(pdf)["highlights"] == [{"timestamp": 2, "text": "b"}]
+    store.close()
+
+
+def test_legacy_highlights_without_timestamps(tmp_path):
+    pdf = _pdf(tmp_path, [{"timestamp": 1, "text": "dated"}, {"text": "old"}, {"text": "old"}])
+    store = AnnotationStore(compact_delay=60)
+    assert store.count(pdf) == 3  # identical legacy highlights are all kept
+    store.delete_highlight(pdf, 1)
+    # Used to be keyed by position and could replace an existing legacy highlight
+    assert store.add_highlight(pdf, {"text": "new"}) == 3
+    store.close()
+    saved = _sidecar(pdf)["highlights"]
+    assert sorted(h["text"] for h in saved) == ["new", "old", "old"]
+
+    # A crash mid-compaction leaves the folded journal behind; replaying it adds nothing
+    _journal(pdf, _op({"op": "add", "highlight": {"text": "new"}}))
+    assert count_highlights(pdf) == 3
+
+
+def test_edits_do_not_wait_for_a_compaction_writing_the_sidecar(tmp_path, monkeypatch):
+    import threading
+    pdf = _pdf(tmp_path)
+    store = AnnotationStore(compact_delay=0)
+    writing, release = threading.Event(), threading.Event()
+    real_dump = annotation_store.json.dump
+
+    def slow_dump(*args, **kwargs):
+        writing.set()
+        release.wait(5)
+        real_dump(*args, **kwargs)
+    monkeypatch.setattr(annotation_store.json, "dump", slow_dump)
+
+    store.add_highlight(pdf, {"timestamp": 1})
+    assert writing.wait(5)
+    assert store.add_highlight(pdf, {"timestamp": 2}) == 2  # while the sidecar is being written
+    release.set()
+    store.close()
+    monkeypatch.undo()
+    assert count_highlights(pdf) == 2
+    assert len(_sidecar(pdf)["highlights"]) == 2
@@ -0,0 +1,83 @@
+from citation_graph import CitationGraph
+from library_view import LibraryView
+
+
+def _index(links):
+    return {name: {"filename": name, "cites": list(cites)} for name, cites in links.items()}
+
+
+def _graph(links):
+    state = {"view": LibraryView().updated(_index(links), list(links))}
+    graph = CitationGraph(lambda: state["view"])
+    return graph, state
+
+
+def _update(graph, state, links):
+    """Publishes the next view, the way IndexManager does, and delivers its events."""
+    old = state["view"]
+    changed = set(old.entries) ^ set(links) | {f for f in links if f in old and old.get(f)["cites"] != links[f]}
+    state["view"] = old.updated(_index(links), changed)
+    graph.on_library_events([("updated", f) for f in changed])
+
+
+def test_queries_on_the_built_graph():
+    graph, _ = _graph({"a": ["b"], "b": ["c"], "c": [], "d": ["b", "c"]})
+    assert graph.shortest_path("a", "c") == ["a", "b", "c"]
+    assert graph.shortest_path("c", "a") is None
+    assert graph.shortest_path("c", "a", directed=False) == ["c", "b", "a"]
+    assert graph.co_citation("b") == [("c", 1)]
+    assert graph.bibliographic_coupling("a") == [("d", 1)]
+    assert graph.neighborhood("a", hops=1) == {"b": 1}
+    top = graph.top_influential(limit=1)
+    assert top[0][0] == "c"
+    assert abs(sum(graph.pagerank().values()) - 1.0) < 1e-6
+
+
+def test_links_between_papers_added_in_the_same_batch():
+    # Regression: a link to a paper that is new in the same batch was dropped when the
+    # citing paper happened to be processed first
+    for trial in range(50):
+        graph, state = _graph({"base": []})
+        graph.shortest_path("base", "base")  # builds the graph
+        new = {f"n{trial}_{k}": [] for k in range(6)}
+        names = list(new)
+        for k in range(len(names) - 1):
+            new[names[k]] = [names[k + 1]]
+        _update(graph, state, dict(new, base=[names[0]]))
+        assert graph.shortest_path("base", names[-1]) == ["base"] + names
+
+
+def test_patches_follow_changes_and_removals():
+    graph, state = _graph({"a": ["b"], "b": [], "c": []})
+    assert graph.co_citation("b") == []
+    _update(graph, state, {"a": ["b", "c"], "b": [], "c": []})
+    assert graph.co_citation("b") == [("c", 1)]  # cached result was evicted by the change
+    _update(graph, state, {"a": ["c"], "c": []})
+    assert graph.shortest_path("a", "b") is None
+    assert graph.co_citation("c") == []
+    assert "b" not in graph.pagerank()
+
+
+def test_patched_graph_matches_a_rebuilt_one():
+    import random
+    rng = random.Random(7)
+    links = {f"p{i}": [] for i in range(20)}
+    graph, state = _graph(links)
+    graph.pagerank()
+    for _ in range(30):
+        links = {name: list(cites) for name, cites in links.items()}
+        name = rng.choice(list(links) + [f"p{rng.randrange(20, 30)}"])
+        if name in links and rng.random() < 0.2:
+            del links[name]
+        else:
+            links[name] = rng.sample([other for other in links if other != name], 3)
+        links = {name: [c for c in cites if c in links] for name, cites in links.items()}
+        _update(graph, state, links)
+
+        fresh, _ = _graph(links)
+        ranks, fresh_ranks = graph.pagerank(), fresh.pagerank()
+        assert ranks.keys() == fresh_ranks.keys()
+        assert all(abs(ranks[name] - fresh_ranks[name]) < 1e-9 for name in ranks)
+        for name in links:
+            assert graph.neighborhood(name, hops=2) == fresh.neighborhood(name, hops=2)
+            assert graph.co_citation(name) == fresh.co_citation(name)
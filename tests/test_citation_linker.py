@@ -0,0 +1,78 @@
+import sqlite3
+
+from citation_linker import CitationLinker
+from index_store import IndexStore
+
+
+def _paper(filename, title, paper_id=None, references=()):
+    return {"filename": filename, "title": title, "semantic_scholar_id": paper_id, "status": "ready",
+            "references": [{"text": text, "semantic_scholar_id": ref_id} for text, ref_id in references]}
+
+
+def _linker(store, papers):
+    store.apply(upserts=papers)
+    linker = CitationLinker(store.find_citing)
+    linker.rebuild(((p["filename"], p) for p in papers), store.iter_references())
+    return linker
+
+
+def test_rebuild_links_by_id_and_title(tmp_path):
+    store = IndexStore(str(tmp_path / "index.db"))
+    linker = _linker(store, [
+        _paper("a.pdf", "Attention Is All You Need", "s-a"),
+        _paper("b.pdf", "Deep Residual Learning for Image Recognition"),
+        _paper("c.pdf", "A Survey", references=[
+            ("A. Vaswani et al. Attention is all\nyou need. NeurIPS 2017.", None),
+            ("Something else entirely, 2019.", "s-b")
+        ]),
+        _paper("d.pdf", "Another Survey", references=[("Some paper", "s-a")])
+    ])
+    assert linker.cites_of("c.pdf") == ["a.pdf"]
+    assert linker.cited_by_of("a.pdf") == ["c.pdf", "d.pdf"]
+    assert linker.cites_of("b.pdf") == []
+    store.close()
+
+
+def test_new_paper_is_found_in_stored_references(tmp_path):
+    store = IndexStore(str(tmp_path / "index.db"))
+    linker = _linker(store, [
+        _paper("c.pdf", "A Survey", references=[("K. He et al. Deep residual learning for image recognition. CVPR.", None)]),
+        _paper("d.pdf", "Another Survey", references=[("Some paper", "s-b")])
+    ])
+    # The linker keeps no reference texts; the citing papers come from the store
+    assert not hasattr(linker, "ref_trigrams")
+    touched = linker.add("b.pdf", _paper("b.pdf", "Deep Residual Learning for Image Recognition", "s-b"))
+    assert touched == {"b.pdf", "c.pdf", "d.pdf"}
+    assert linker.cited_by_of("b.pdf") == ["c.pdf", "d.pdf"]
+
+    assert linker.remove("b.pdf") == {"b.pdf", "c.pdf", "d.pdf"}
+    assert linker.cites_of("c.pdf") == []
+    store.close()
+
+
+def test_reference_texts_follow_store_changes(tmp_path):
+    store = IndexStore(str(tmp_path / "index.db"))
+    title = "deep residual learning for image recognition"
+    store.apply(upserts=[_paper("c.pdf", "A Survey", references=[("He. Deep Residual  Learning for Image Recognition.", None)])])
+    assert store.find_citing(None, title) == {"c.pdf"}
+    store.apply(upserts=[_paper("c.pdf", "A Survey", references=[("Unrelated", None)])])
+    assert store.find_citing(None, title) == set()
+    store.apply(upserts=[_paper("e.pdf", "E", references=[("deep residual learning for image recognition", "s-b")])])
+    store.apply(deletes=["e.pdf"])
+    assert store.find_citing("s-b", title) == set()
+    store.close()
+
+
+def test_text_index_is_backfilled_for_existing_libraries(tmp_path):
+    path = str(tmp_path / "index.db")
+    store = IndexStore(path)
+    store.apply(upserts=[_paper("c.pdf", "A Survey", references=[("Deep residual learning for image recognition", None)])])
+    store.close()
+    conn = sqlite3.connect(path)
+    conn.execute("DROP TABLE reference_texts")
+    conn.commit()
+    conn.close()
+
+    store = IndexStore(path)
+    assert store.find_citing(None, "deep residual learning for image recognition") == {"c.pdf"}
+    store.close()
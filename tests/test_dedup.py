@@ -0,0 +1,95 @@
+import os
+import json
+import shutil
+import sqlite3
+import time
+import pytest
+from array import array
+
+from dedup import DuplicateIndex, minhash_signature
+from index_store import IndexStore
+
+TEXT = " ".join(f"word{i} appears in sentence {i % 7} of the first page" for i in range(40))
+
+
+def test_only_canonical_papers_are_found():
+    signature = minhash_signature(TEXT)
+    index = DuplicateIndex()
+    index.add("copy.pdf", signature, canonical=False)
+    assert index.find(signature) is None
+    assert index.signature("copy.pdf") == array('I', signature)
+
+    index.add("original.pdf", signature)
+    assert index.find(signature) == ("original.pdf", 1.0)
+    assert index.find(signature, exclude="original.pdf") is None
+    index.remove("original.pdf")
+    assert index.find(signature) is None and not index.buckets
+
+
+def test_signatures_are_stored_apart_from_the_entry(tmp_path):
+    store = IndexStore(str(tmp_path / "index.db"))
+    signature = minhash_signature(TEXT)
+    store.apply(upserts=[{"filename": "a.pdf", "status": "ready", "minhash": signature}])
+    # Saving the entry again without its signature keeps the stored one
+    store.apply(upserts=[{"filename": "a.pdf", "status": "ready"}])
+    assert "minhash" not in store.load_all()["a.pdf"]
+    assert dict(store.iter_signatures()) == {"a.pdf": array('I', signature)}
+
+    store.apply(deletes=["a.pdf"])
+    assert list(store.iter_signatures()) == []
+    store.close()
+
+
+def test_signatures_move_out_of_legacy_extra(tmp_path):
+    path = str(tmp_path / "index.db")
+    IndexStore(path).close()
+    signature = minhash_signature(TEXT)
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO papers (filename, status, extra) VALUES (?, ?, ?)",
+                 ("a.pdf", "ready", json.dumps({"minhash": signature, "memos_count": 2})))
+    conn.commit()
+    conn.close()
+
+    store = IndexStore(path)
+    assert dict(store.iter_signatures()) == {"a.pdf": array('I', signature)}
+    entry = store.load_all()["a.pdf"]
+    assert "minhash" not in entry and entry["memos_count"] == 2
+    store.close()
+
+
+def test_copies_keep_matching_across_restarts(tmp_path):
+    pytest.importorskip("fitz")
+    pytest.importorskip("requests")
+    from index_cli import build_index
+    from index_manager import IndexManager
+    from library_generator import generate_library
+    from stub_semantic_scholar import StubSemanticScholar
+
+    papers_dir = str(tmp_path / "papers")
+    manifest = generate_library(papers_dir, 4, body_pages=1)
+    os.remove(os.path.join(papers_dir, "manifest.json"))
+    original = sorted(os.listdir(papers_dir))[0]
+    shutil.copy(os.path.join(papers_dir, original), os.path.join(papers_dir, "copy.pdf"))
+    for name in os.listdir(papers_dir):
+        os.utime(os.path.join(papers_dir, name), (time.time() - 3600,) * 2)
+    stub = StubSemanticScholar(manifest, latency_ms=1)
+    options = {
+        "semantic_scholar_api_url": stub.url,
+        "semantic_scholar_requests_per_second": 1000,
+        "indexing_workers": 1,
+        "response_cache_path": str(tmp_path / "cache" / "responses.sqlite"),
+        "thumbnail_cache_path": str(tmp_path / "cache" / "thumbnails")
+    }
+    try:
+        assert build_index(papers_dir, options, progress_interval=0.1)["ready"] == 5
+    finally:
+        stub.shutdown()
+
+    manager = IndexManager(papers_dir, autostart=False, options=options)
+    try:
+        assert manager.index_data["copy.pdf"].get("duplicate_of") == original
+        assert not any("minhash" in entry for entry in manager.index_data.values())
+        assert len(manager.duplicates.signatures) == 5
+        assert manager.duplicates.canonical == set(manager.index_data) - {"copy.pdf"}
+    finally:
+        manager.close()
@@ -0,0 +1,84 @@
+import time
+import threading
+
+import document_cache
+from document_cache import DocumentCache
+from library_view import LibraryView
+
+
+class _Manager:
+    def __init__(self, names):
+        self.closed = False
+        self._view = LibraryView().updated({name: {"title": name} for name in names}, names)
+
+    def view(self):
+        return self._view
+
+
+class _Builder:
+    def __init__(self):
+        self.calls = []
+        self.started = threading.Event()
+        self.release = None
+
+    def __call__(self, file_path, manager, view):
+        self.calls.append((file_path, manager))
+        self.started.set()
+        if self.release is not None:
+            self.release.wait(5)
+        if manager.closed:
+            raise RuntimeError("Cannot operate on a closed database.")
+        return {"path": file_path}, []
+
+
+def _paths(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"p{i}.pdf"
+        path.write_bytes(b"%PDF")
+        paths.append(str(path))
+    return paths
+
+
+def test_payloads_are_only_reused_by_their_manager(tmp_path):
+    path, = _paths(tmp_path, 1)
+    build = _Builder()
+    cache = DocumentCache(build)
+    first, second = _Manager(["p0.pdf"]), _Manager(["p0.pdf"])
+    cache.get(path, first)
+    cache.get(path, first)
+    cache.get(path, second)
+    assert build.calls == [(path, first), (path, second)]
+
+
+def test_prefetch_is_cancelled_by_clear_and_close(tmp_path, monkeypatch):
+    monkeypatch.setattr(document_cache, "PREFETCH_DELAY", 0.05)
+    paths = _paths(tmp_path, 2)
+    build = _Builder()
+    cache = DocumentCache(build)
+    manager = _Manager([])
+
+    cache.prefetch(paths, manager)
+    cache.clear()
+    manager2 = _Manager([])
+    cache.prefetch(paths, manager2)
+    manager2.closed = True
+    time.sleep(0.2)
+    assert build.calls == []
+
+
+def test_prefetch_in_flight_stops_quietly_when_its_manager_closes(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(document_cache, "PREFETCH_DELAY", 0.0)
+    paths = _paths(tmp_path, 3)
+    build = _Builder()
+    build.release = threading.Event()
+    cache = DocumentCache(build)
+    manager = _Manager([])
+
+    cache.prefetch(paths, manager)
+    assert build.started.wait(5)
+    manager.closed = True
+    build.release.set()
+    time.sleep(0.1)
+    assert build.calls == [(paths[0], manager)]
+    assert "Could not prefetch" not in capsys.readouterr().out
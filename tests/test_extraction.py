@@ -0,0 +1,32 @@
+from extraction import find_paper_id, first_page_header, title_matches
+
+FIRST_PAGE = """Attention Over Citation Graphs
+Alice Kim, Bob Lee
+University of Somewhere
+Abstract
+We extend the model of prior work (doi:10.1000/foreign.2019) and arXiv:1901.00001.
+"""
+
+
+def test_identifiers_cited_on_the_first_page_are_ignored():
+    assert find_paper_id("paper.pdf", FIRST_PAGE) is None
+    footnote = "Title\nAuthor\n" + "body text\n" * 20 + "1 See https://doi.org/10.1000/foreign\n"
+    assert find_paper_id("paper.pdf", footnote) is None
+
+
+def test_identifiers_in_the_header_and_margin_stamp():
+    journal = "Journal of Tests 12 (2020) 1-9\nhttps://doi.org/10.1000/own.2020.\n" + FIRST_PAGE
+    assert find_paper_id("paper.pdf", journal) == "DOI:10.1000/own.2020"
+    assert find_paper_id("paper.pdf", "Title\narXiv:2101.00042v1\n" + FIRST_PAGE) == "ARXIV:2101.00042"
+    stamp = FIRST_PAGE + "body text\n" * 40 + "arXiv:2106.01234v2 [cs.CL] 3 Jun 2021\n"
+    assert find_paper_id("paper.pdf", stamp) == "ARXIV:2106.01234"
+    assert find_paper_id("2106.01234v2.pdf", "") == "ARXIV:2106.01234"
+
+
+def test_title_matches_the_header_or_the_guess():
+    header = first_page_header(FIRST_PAGE)
+    assert "Abstract" not in header and "foreign" not in header
+    assert title_matches("Attention over citation graphs.", "kim2020", header)
+    assert title_matches("Attention Over Citation Graphs", "Attention over Citation Graphs", "")
+    assert not title_matches("A Foreign Paper", "kim2020", header)
+    assert not title_matches(None, "kim2020", header)
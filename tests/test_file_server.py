@@ -0,0 +1,88 @@
+import http.client
+from urllib.parse import urlparse
+
+import pytest
+
+from file_server import LocalFileServer
+
+DATA = bytes(range(256)) * 4  # 1024 bytes
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = LocalFileServer()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def served(server, tmp_path):
+    path = tmp_path / "paper.pdf"
+    path.write_bytes(DATA)
+    return server, path, urlparse(server.url_for(str(path))).path
+
+
+def _request(server, path, headers=None, method="GET"):
+    conn = http.client.HTTPConnection(server.host, server.port, timeout=5)
+    try:
+        conn.request(method, path, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        conn.close()
+
+
+def test_whole_file(served):
+    server, _, path = served
+    status, headers, body = _request(server, path)
+    assert status == 200 and body == DATA
+    assert headers["Accept-Ranges"] == "bytes" and headers["Content-Type"] == "application/pdf"
+    status, headers, body = _request(server, path, method="HEAD")
+    assert status == 200 and headers["Content-Length"] == str(len(DATA)) and body == b""
+
+
+def test_closed_range(served):
+    server, _, path = served
+    status, headers, body = _request(server, path, {"Range": "bytes=10-19"})
+    assert status == 206 and body == DATA[10:20]
+    assert headers["Content-Range"] == "bytes 10-19/1024" and headers["Content-Length"] == "10"
+    # An end past the file is clamped
+    status, headers, body = _request(server, path, {"Range": "bytes=1000-5000"})
+    assert status == 206 and body == DATA[1000:]
+    assert headers["Content-Range"] == "bytes 1000-1023/1024"
+
+
+def test_open_ended_range(served):
+    server, _, path = served
+    status, headers, body = _request(server, path, {"Range": "bytes=1000-"})
+    assert status == 206 and body == DATA[1000:]
+    assert headers["Content-Range"] == "bytes 1000-1023/1024"
+
+
+def test_suffix_range(served):
+    server, _, path = served
+    status, headers, body = _request(server, path, {"Range": "bytes=-24"})
+    assert status == 206 and body == DATA[-24:]
+    assert headers["Content-Range"] == "bytes 1000-1023/1024"
+    # A suffix longer than the file is the whole file
+    status, _, body = _request(server, path, {"Range": "bytes=-5000"})
+    assert status == 206 and body == DATA
+
+
+@pytest.mark.parametrize("header", ["bytes=1024-", "bytes=2000-3000", "bytes=20-10", "bytes=-", "items=0-10"])
+def test_unsatisfiable_range(served, header):
+    server, _, path = served
+    status, headers, body = _request(server, path, {"Range": header})
+    assert status == 416 and body == b""
+    assert headers["Content-Range"] == "bytes */1024"
+
+
+def test_unknown_or_revoked_token(served):
+    server, file_path, path = served
+    token = path.split("/")[2]
+    assert _request(server, path.replace(token, "not-a-token"))[0] == 404
+    assert _request(server, "/other/" + token + "/paper.pdf")[0] == 404
+    # The token of a file that is gone no longer serves anything
+    file_path.unlink()
+    assert _request(server, path)[0] == 404
+    assert server.resolve(token) == str(file_path)
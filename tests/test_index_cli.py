@@ -0,0 +1,67 @@
+import os
+import time
+import logging
+import pytest
+
+pytest.importorskip("fitz")
+pytest.importorskip("requests")
+
+import index_cli  # noqa: E402
+from index_manager import IndexManager  # noqa: E402
+from library_generator import generate_library  # noqa: E402
+from stub_semantic_scholar import StubSemanticScholar  # noqa: E402
+
+
+@pytest.fixture
+def library(tmp_path):
+    papers_dir = str(tmp_path / "papers")
+    manifest = generate_library(papers_dir, 24, body_pages=1)
+    os.remove(os.path.join(papers_dir, "manifest.json"))
+    # Old enough that the scan does not wait for them to settle
+    for name in os.listdir(papers_dir):
+        os.utime(os.path.join(papers_dir, name), (time.time() - 3600,) * 2)
+    stub = StubSemanticScholar(manifest, latency_ms=5)
+    options = {
+        "semantic_scholar_api_url": stub.url,
+        "semantic_scholar_requests_per_second": 1000,
+        "indexing_workers": 2,
+        "api_workers": 2,
+        "response_cache_path": str(tmp_path / "cache" / "responses.sqlite"),
+        "thumbnail_cache_path": str(tmp_path / "cache" / "thumbnails")
+    }
+    yield papers_dir, options
+    stub.shutdown()
+
+
+def _statuses(papers_dir, options):
+    manager = IndexManager(papers_dir, autostart=False, options=options)
+    try:
+        return {f: e.get("status") for f, e in manager.index_data.items()}
+    finally:
+        manager.close()
+
+
+def test_interrupted_run_resumes_to_a_complete_index(library, monkeypatch, caplog):
+    papers_dir, options = library
+    real_wait = IndexManager.wait_until_idle
+
+    def interrupted_wait(self, poll_interval=0.5, timeout=None):
+        real_wait(self, poll_interval=0.05, timeout=0.3)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(IndexManager, "wait_until_idle", interrupted_wait)
+    with caplog.at_level(logging.ERROR), pytest.raises(KeyboardInterrupt):
+        index_cli.build_index(papers_dir, options, progress_interval=0.1)
+    monkeypatch.undo()
+    # close() let running work finish instead of failing it mid-shutdown
+    assert "exception calling callback" not in caplog.text
+
+    # The checkpoint is consistent: every paper is either finished or queued again on resume
+    interrupted = _statuses(papers_dir, options)
+    assert len(interrupted) == 24
+    assert set(interrupted.values()) <= {"ready", "indexing"}
+
+    summary = index_cli.build_index(papers_dir, options, progress_interval=0.1)
+    assert summary["ready"] == 24
+    assert summary["still_indexing"] == 0
+    assert set(_statuses(papers_dir, options).values()) == {"ready"}
@@ -0,0 +1,177 @@
+import pytest
+
+from index_manager import IndexManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    papers_dir = tmp_path / "papers"
+    papers_dir.mkdir()
+    manager = IndexManager(str(papers_dir), autostart=False, options={
+        "response_cache_path": str(tmp_path / "cache" / "responses.sqlite"),
+        "thumbnail_cache_path": str(tmp_path / "cache" / "thumbnails")
+    })
+    yield manager
+    if not manager.closed:
+        manager.close()
+
+
+class _StuckThread:
+    def join(self, timeout=None):
+        pass
+
+    def is_alive(self):
+        return True
+
+
+class _Watcher:
+    def stop(self):
+        pass
+
+
+def test_close_stops_the_search_worker(manager):
+    if manager.search_index is None:
+        pytest.skip("search index unavailable")
+    worker = manager._search_thread
+    for i in range(100):
+        manager._search_queue.put(f"missing{i}.pdf")
+    assert worker.is_alive()
+    manager.close()
+    assert not worker.is_alive()
+
+
+def test_stop_keeps_a_scanner_that_is_still_running(manager, capsys):
+    stuck = manager.scanner_thread = _StuckThread()
+    manager.watcher = _Watcher()
+    manager.stop()
+    assert manager.scanner_thread is stuck
+    assert "did not stop" in capsys.readouterr().out
+
+    # No second scanner next to the one that is still finishing its pass
+    manager.start()
+    assert manager.scanner_thread is stuck
+    manager.scanner_thread = None
+
+
+def test_pdfs_outside_the_library_leave_no_derived_data(manager, tmp_path, monkeypatch):
+    import index_manager
+    calls = []
+    monkeypatch.setattr(index_manager, "build_derived", lambda path: calls.append(path) or {"page_texts": ["one", "two"]})
+    monkeypatch.setattr(index_manager, "hash_file", lambda path: pytest.fail("outside PDFs are not hashed"))
+    outside = tmp_path / "elsewhere" / "paper.pdf"
+    outside.parent.mkdir()
+    outside.write_bytes(b"%PDF")
+
+    assert not manager.contains(str(outside))
+    assert manager.get_derived(str(outside))["page_texts"] == ["one", "two"]
+    assert manager.get_derived(str(outside))["page_texts"] == ["one", "two"]
+    assert calls == [str(outside)]
+    derived_dir = tmp_path / "papers" / ".paper_reader" / "derived"
+    assert not derived_dir.exists() or not any(derived_dir.iterdir())
+
+
+def test_idle_without_a_search_index(tmp_path, monkeypatch):
+    import json
+    import os
+    import time
+    monkeypatch.setattr(IndexManager, "_open_search_index", lambda self: None)
+    papers_dir = tmp_path / "papers"
+    papers_dir.mkdir()
+    pdf = papers_dir / "a.pdf"
+    pdf.write_bytes(b"%PDF-1.4 test")
+    os.utime(pdf, (time.time() - 3600,) * 2)
+    # A migrated entry without a fingerprint: the scan only adopts one
+    (papers_dir / "papers_index.json").write_text(json.dumps({"a.pdf": {"title": "A", "status": "ready"}}))
+    manager = IndexManager(str(papers_dir), autostart=False, options={
+        "response_cache_path": str(tmp_path / "cache" / "responses.sqlite"),
+        "thumbnail_cache_path": str(tmp_path / "cache" / "thumbnails")
+    })
+    try:
+        assert manager.scan_now()
+        assert manager.index_data["a.pdf"]["fingerprint"]
+        assert manager.wait_until_idle(poll_interval=0.05, timeout=3)
+
+        # A stray item (nobody drains the queue) does not block either
+        manager._search_queue.put("a.pdf")
+        assert manager.wait_until_idle(poll_interval=0.05, timeout=3)
+    finally:
+        manager.close()
+
+
+def test_a_foreign_identifier_falls_back_to_the_title_search(tmp_path):
+    pytest.importorskip("requests")
+    from stub_semantic_scholar import StubSemanticScholar
+    stub = StubSemanticScholar({"papers": [
+        {"paperId": "OWN", "title": "Own paper", "filename": "Own paper.pdf", "references": []},
+        {"paperId": "FOREIGN", "title": "Foreign paper", "filename": "Foreign paper.pdf",
+         "externalIds": {"DOI": "10.1000/foreign"}, "references": []}
+    ]})
+    papers_dir = tmp_path / "papers"
+    papers_dir.mkdir()
+    manager = IndexManager(str(papers_dir), autostart=False, options={
+        "semantic_scholar_api_url": stub.url,
+        "semantic_scholar_requests_per_second": 1000,
+        "response_cache_path": str(tmp_path / "cache" / "responses.sqlite"),
+        "thumbnail_cache_path": str(tmp_path / "cache" / "thumbnails")
+    })
+    try:
+        job = {"filepath": str(papers_dir / "Own paper.pdf"), "filename": "Own paper.pdf", "fingerprint": None}
+        local = {"title": "Own paper", "paper_id": "DOI:10.1000/foreign", "header": "Own paper\nAlice Kim"}
+        assert manager._resolve_remote(job, local)["semantic_scholar_id"] == "OWN"
+        # The paper's own identifier is used as before
+        local = {"title": "Own paper", "paper_id": "DOI:10.1000/foreign", "header": "Foreign paper\nBob Lee"}
+        assert manager._resolve_remote(job, local)["semantic_scholar_id"] == "FOREIGN"
+    finally:
+        manager.close()
+        stub.shutdown()
+
+
+def _copies(manager, tmp_path, monkeypatch):
+    """a.pdf and its copy b.pdf, scanned while one of them is indexing. Returns that one, the
+    copy, the names submitted so far and the names whose jobs are to count as failed."""
+    import os
+    import time
+    submitted, failed = [], set()
+    monkeypatch.setattr(manager.pool, "submit", lambda filename, filepath, fingerprint=None: submitted.append(filename))
+    # Submitted papers stay pending (the jobs never finish) unless a test says they failed
+    monkeypatch.setattr(manager.pool, "is_pending", lambda filename: filename in submitted and filename not in failed)
+    for name in ("a.pdf", "b.pdf"):
+        path = tmp_path / "papers" / name
+        path.write_bytes(b"%PDF-1.4 same content")
+        os.utime(path, (time.time() - 3600,) * 2)
+    manager.scan_now()
+    assert len(submitted) == 1
+    first, copy = submitted[0], ({"a.pdf", "b.pdf"} - set(submitted)).pop()
+    manager.scan_now()  # rescanning while the copy waits changes nothing
+    assert submitted == [first]
+    return first, copy, submitted, failed
+
+
+def test_copies_are_indexed_when_their_original_is_removed(manager, tmp_path, monkeypatch):
+    first, copy, submitted, _ = _copies(manager, tmp_path, monkeypatch)
+    (tmp_path / "papers" / first).unlink()
+    manager.scan_now()
+    assert submitted == [first, copy]
+
+
+def test_copies_are_indexed_when_their_original_changes(manager, tmp_path, monkeypatch):
+    import os
+    import time
+    first, copy, submitted, _ = _copies(manager, tmp_path, monkeypatch)
+    path = tmp_path / "papers" / first
+    path.write_bytes(b"%PDF-1.4 other content")
+    os.utime(path, (time.time() - 1800,) * 2)
+    manager.scan_now()
+    assert sorted(submitted[1:]) == sorted([first, copy])
+
+
+def test_copies_are_indexed_when_their_original_fails(manager, tmp_path, monkeypatch):
+    first, copy, submitted, failed = _copies(manager, tmp_path, monkeypatch)
+    entry = manager.index_data[first]
+    failed.add(first)
+    manager._on_index_failed({"filename": first, "filepath": entry["filepath"], "fingerprint": entry["fingerprint"]})
+    assert submitted == [first, copy]
+    # The next scan retries the failed paper as a copy waiting for the new original
+    manager.scan_now()
+    assert submitted == [first, copy]
+    assert manager._waiting_duplicates == {entry["fingerprint"]["hash"]: [first]}
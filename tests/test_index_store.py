@@ -0,0 +1,47 @@
+import os
+import json
+
+from index_store import IndexStore
+
+
+def _legacy(tmp_path, data):
+    path = str(tmp_path / "papers_index.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return path
+
+
+def test_legacy_json_is_migrated_once(tmp_path):
+    json_path = _legacy(tmp_path, {
+        "a.pdf": {"title": "A", "status": "ready", "cites": ["b.pdf"]},
+        "b.pdf": {"title": "B", "status": "ready"},
+        "broken.pdf": "not an entry"
+    })
+    store = IndexStore(str(tmp_path / "index.db"), legacy_json_path=json_path)
+    index = store.load_all()
+    store.close()
+    assert sorted(index) == ["a.pdf", "b.pdf"]
+    assert index["b.pdf"]["cited_by"] == ["a.pdf"]
+    assert not os.path.exists(json_path) and os.path.exists(json_path + ".migrated")
+
+
+def test_unexpected_legacy_json_is_left_alone(tmp_path):
+    json_path = _legacy(tmp_path, ["a.pdf", "b.pdf"])
+    store = IndexStore(str(tmp_path / "index.db"), legacy_json_path=json_path)
+    assert store.load_all() == {}
+    store.close()
+    assert os.path.exists(json_path)
+
+
+def test_failed_migration_is_retried(tmp_path, monkeypatch):
+    json_path = _legacy(tmp_path, {"a.pdf": {"title": "A", "status": "ready"}})
+    db_path = str(tmp_path / "index.db")
+    monkeypatch.setattr(IndexStore, "apply", lambda self, **changes: False)
+    IndexStore(db_path, legacy_json_path=json_path).close()
+    assert os.path.exists(json_path)
+
+    monkeypatch.undo()
+    store = IndexStore(db_path, legacy_json_path=json_path)
+    assert list(store.load_all()) == ["a.pdf"]
+    store.close()
+    assert os.path.exists(json_path + ".migrated")
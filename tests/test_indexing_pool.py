@@ -0,0 +1,69 @@
+import time
+import logging
+from indexing_pool import IndexingPool
+
+
+def _slow_local(filepath, filename, fingerprint):
+    time.sleep(0.05)
+    return {"title": filename}
+
+
+def _make_pool(done):
+    return IndexingPool(
+        _slow_local,
+        lambda job, local: {"filename": job["filename"], "title": local["title"]},
+        lambda job, entry: done.append(entry["filename"]),
+        process_workers=2,
+        api_workers=2
+    )
+
+
+def _wait_idle(pool, timeout=5):
+    deadline = time.time() + timeout
+    while not pool.is_idle() and time.time() < deadline:
+        time.sleep(0.02)
+    return pool.is_idle()
+
+
+def test_shutdown_wait_finishes_running_jobs_and_drops_the_rest(caplog, capsys):
+    done = []
+    pool = _make_pool(done)
+    for i in range(30):
+        pool.submit(f"p{i}.pdf", f"/library/p{i}.pdf")
+    time.sleep(0.15)
+    with caplog.at_level(logging.ERROR):
+        pool.shutdown(wait=True)
+
+    # Every job either committed or was dropped; none is left counted as in flight
+    assert pool.is_idle()
+    assert 0 < len(done) < 30
+    assert not any(pool.is_pending(f"p{i}.pdf") for i in range(30))
+    assert "exception calling callback" not in caplog.text
+    assert "Indexing failed" not in capsys.readouterr().out
+
+    pool.submit("late.pdf", "/library/late.pdf")
+    assert pool.is_idle()
+
+
+def test_extractions_finishing_after_shutdown_are_dropped(caplog):
+    done = []
+    pool = _make_pool(done)
+    for i in range(6):
+        pool.submit(f"p{i}.pdf", f"/library/p{i}.pdf")
+    time.sleep(0.02)  # extractions are running
+    with caplog.at_level(logging.ERROR):
+        pool.shutdown(wait=False)
+        assert _wait_idle(pool)
+    assert "cannot schedule new futures" not in caplog.text
+    assert "exception calling callback" not in caplog.text
+
+
+def test_shutdown_drops_jobs_held_by_pause():
+    done = []
+    pool = _make_pool(done)
+    pool.pause()
+    for i in range(4):
+        pool.submit(f"p{i}.pdf", f"/library/p{i}.pdf")
+    pool.shutdown(wait=True)
+    assert pool.is_idle()
+    assert done == []
@@ -0,0 +1,45 @@
+import pytest
+
+fitz = pytest.importorskip("fitz")
+
+from reference_extractor import extract_references  # noqa: E402
+
+ENTRIES = [
+    ["Kim, A. (2019). Efficient graph retrieval for citation analysis.", "Journal of Data, 3(2), 1-20."],
+    ["Lee, B. (2020). A short paper."],
+    ["Park, C., Chen, D. (2021). Robust language models for document", "understanding at scale. Journal of Neural Systems,", "12(4), 100-140."],
+    ["Smith, E. (2018). Another single line reference entry."]
+]
+
+
+def _write(entries, indent=0, entry_gap=0.0, lines_per_page=None, path=None):
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 60), "References", fontname="hebo", fontsize=14)
+    y, written = 90, 0
+    for entry in entries:
+        for i, part in enumerate(entry):
+            if lines_per_page and written == lines_per_page:
+                page, y, written = doc.new_page(), 72, 0
+            page.insert_text((72 + (indent if i else 0), y), part, fontname="helv", fontsize=10)
+            y += 13
+            written += 1
+        y += entry_gap
+    doc.save(path)
+    doc.close()
+    return [" ".join(entry) for entry in entries]
+
+
+@pytest.mark.parametrize("layout", [
+    {"indent": 18},                          # hanging indent, no extra space
+    {"entry_gap": 8},                        # flush left, extra space between entries
+    {"indent": 18, "entry_gap": 8},
+    {"indent": 18, "lines_per_page": 3},     # entries continue on the next page
+])
+def test_unnumbered_entries_follow_the_layout(tmp_path, layout):
+    path = str(tmp_path / "paper.pdf")
+    expected = _write(ENTRIES, path=path, **layout)
+    doc = fitz.open(path)
+    _, references = extract_references(doc)
+    doc.close()
+    assert [r["text"] for r in references] == expected
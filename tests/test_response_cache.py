@@ -0,0 +1,82 @@
+import sqlite3
+
+import response_cache
+from response_cache import DAY, ResponseCache
+
+
+def _last_access(path, key):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT last_access FROM responses WHERE key = ?", (key,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_hits_do_not_write_until_flushed(tmp_path, monkeypatch):
+    path = str(tmp_path / "responses.sqlite")
+    cache = ResponseCache(path)
+    cache.put("k", "https://api/paper/1", {"title": "A"}, ttl=DAY)
+    written = _last_access(path, "k")
+
+    clock = [written + 5]
+    monkeypatch.setattr(response_cache.time, "time", lambda: clock[0])
+    assert cache.get("k") == (True, {"title": "A"})
+    assert _last_access(path, "k") == written
+
+    clock[0] += response_cache.ACCESS_FLUSH_SECONDS
+    cache.get("k")
+    assert _last_access(path, "k") == clock[0]
+
+    clock[0] += 1
+    cache.get("k")
+    cache.close()
+    assert _last_access(path, "k") == clock[0]
+
+
+def test_eviction_sees_pending_access_times(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(response_cache.time, "time", lambda: clock[0])
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), max_bytes=250)
+    for key in ("a", "b"):
+        clock[0] += 1
+        cache.put(key, "https://api/" + key, {"body": "x" * 80}, ttl=DAY)
+    clock[0] += 1
+    assert cache.get("a")[0]  # only noted in memory
+
+    clock[0] += 1
+    cache.put("c", "https://api/c", {"body": "x" * 80}, ttl=DAY)
+    assert cache.get("a")[0]
+    assert cache.get("b") == (False, None)  # least recently used
+    cache.close()
+
+
+def test_expired_entries_are_only_served_stale(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(response_cache.time, "time", lambda: clock[0])
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"))
+    key = ResponseCache.make_key("https://api/paper/1", {"fields": "title"})
+    assert key == ResponseCache.make_key("https://api/paper/1", {"fields": "title"})
+    assert key != ResponseCache.make_key("https://api/paper/1", {"fields": "year"})
+
+    cache.put(key, "https://api/paper/1", None, ttl=10)  # a cached "not found"
+    assert cache.get(key) == (True, None)
+    clock[0] += 11
+    assert cache.get(key) == (False, None)
+    assert cache.get(key, allow_stale=True) == (True, None)
+
+    cache.put(key, "https://api/paper/1", {"title": "A"}, ttl=10)
+    assert cache.get(key) == (True, {"title": "A"})
+    assert cache.stats()["entries"] == 1
+    cache.close()
+
+
+def test_size_is_tracked_across_restarts(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    cache = ResponseCache(path)
+    cache.put("a", "https://api/a", {"body": "x" * 100}, ttl=DAY)
+    cache.put("a", "https://api/a", {"body": "x" * 10}, ttl=DAY)
+    size = cache.stats()["bytes"]
+    cache.close()
+    cache = ResponseCache(path)
+    assert cache.stats()["bytes"] == size == len('{"body": "' + "x" * 10 + '"}')
+    cache.close()
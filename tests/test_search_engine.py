@@ -0,0 +1,55 @@
+from search_engine import SearchIndex, parse_query, tokenize
+
+
+def _index(tmp_path, documents):
+    index = SearchIndex(str(tmp_path / "search.db"))
+    for filename, pages in documents.items():
+        index.index_document(filename, "hash-" + filename, pages)
+    return index
+
+
+def test_korean_words_match_with_any_particle():
+    # Bigrams of the stem are shared by every inflected form
+    stem = set(tokenize("그래프"))
+    assert stem == {"그래", "래프"}
+    assert stem <= set(tokenize("그래프는")) and stem <= set(tokenize("그래프를"))
+    assert tokenize("Citation 그래프는, graphs!") == ["citation", "그래", "래프", "프는", "graphs"]
+
+
+def test_parse_query_keeps_quoted_phrases():
+    terms, phrases = parse_query('"Neural Network" 그래프 "single"')
+    assert terms == ["neural", "network", "그래", "래프", "single"]
+    assert phrases == [["neural", "network"]]  # one-token quotes are plain terms
+
+
+def test_korean_search_ignores_particles(tmp_path):
+    index = _index(tmp_path, {"ko.pdf": ["인용 그래프는 논문을 연결한다"], "en.pdf": ["citation graphs"]})
+    hits = index.search("그래프를")
+    index.close()
+    assert [(hit["filename"], hit["page"]) for hit in hits] == [("ko.pdf", 1)]
+
+
+def test_phrases_need_consecutive_tokens(tmp_path):
+    index = _index(tmp_path, {"a.pdf": ["a neural network model", "the network of neural cells"]})
+    assert {hit["page"] for hit in index.search("neural network")} == {1, 2}
+    assert [hit["page"] for hit in index.search('"neural network"')] == [1]
+    assert index.search('"network neural"') == []
+    index.close()
+
+
+def test_reindexing_replaces_the_document(tmp_path):
+    index = _index(tmp_path, {"a.pdf": ["alpha", "alpha again"], "b.pdf": ["alpha"]})
+    index.index_document("a.pdf", "hash-2", ["beta"])
+    assert index.indexed_hash("a.pdf") == "hash-2"
+    assert [hit["filename"] for hit in index.search("alpha")] == ["b.pdf"]
+    assert [(hit["filename"], hit["page"]) for hit in index.search("beta")] == [("a.pdf", 1)]
+
+    index.remove_document("a.pdf")
+    assert index.search("beta") == [] and index.indexed_filenames() == ["b.pdf"]
+    index.close()
+
+    # Survives a restart
+    index = SearchIndex(str(tmp_path / "search.db"))
+    assert index.indexed_filenames() == ["b.pdf"]
+    assert [hit["filename"] for hit in index.search("alpha")] == ["b.pdf"]
+    index.close()
@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+
+import semantic_scholar
+import stub_semantic_scholar
+from response_cache import ResponseCache
+from semantic_scholar import PaperBatcher, SemanticScholarClient
+from stub_semantic_scholar import StubSemanticScholar
+
+EXTERNAL = [{"paperId": f"E{i}", "title": f"Ext {i}", "authors": [{"name": "A"}], "year": 2000} for i in range(2500)]
+PAPERS = [
+    {"paperId": "BIG", "title": "Big survey", "filename": "Big survey.pdf",
+     "externalIds": {"ArXiv": "2101.00001", "DOI": "10.1/big"}, "references": [e["paperId"] for e in EXTERNAL]},
+    {"paperId": "SMALL", "title": "Small", "filename": "Small.pdf", "references": ["E1", "E2"]}
+]
+
+
+@pytest.fixture
+def stub():
+    stub = StubSemanticScholar({"papers": PAPERS, "external": EXTERNAL})
+    yield stub
+    stub.shutdown()
+
+
+def _client(stub, cache=None, **kwargs):
+    return SemanticScholarClient(stub.url, requests_per_second=1000, cache=cache, **kwargs)
+
+
+def test_reference_lists_are_paged(stub):
+    references = _client(stub).fetch_references("BIG")
+    assert len(references) == 2500
+    assert references[-1] == {"text": "A (2000). Ext 2499", "title": "Ext 2499", "semantic_scholar_id": "E2499"}
+    assert stub.requests == 3  # REFERENCE_PAGE_SIZE 1000
+
+
+def test_one_batch_request_for_every_kind_of_id(stub, tmp_path):
+    client = _client(stub, cache=ResponseCache(str(tmp_path / "responses.sqlite")))
+    ids = ["ARXIV:2101.00001", "DOI:10.1/big", "SMALL", "NOPE"]
+    results = client.fetch_papers(ids)
+    assert stub.requests == 1
+    assert results["ARXIV:2101.00001"]["paperId"] == results["DOI:10.1/big"]["paperId"] == "BIG"
+    assert len(results["SMALL"]["references"]) == 2
+    assert results["NOPE"] is None
+
+    # Found and unknown papers are both answered from the cache
+    assert client.fetch_papers(ids) == results
+    assert stub.requests == 1
+    client.close()
+
+    offline = _client(stub, cache=ResponseCache(str(tmp_path / "responses.sqlite")), offline=True)
+    results = offline.fetch_papers(["SMALL", "UNSEEN"])
+    assert results["SMALL"]["paperId"] == "SMALL" and results["UNSEEN"] is None
+    assert stub.requests == 1
+    offline.close()
+
+
+def test_cut_off_reference_lists_are_paged(stub, monkeypatch):
+    monkeypatch.setattr(semantic_scholar, "BATCH_REFERENCE_LIMIT", 2000)
+    monkeypatch.setattr(stub_semantic_scholar, "BATCH_REFERENCE_LIMIT", 2000)
+    client = _client(stub)
+    record = client.fetch_papers(["BIG"])["BIG"]
+    assert len(record["references"]) == 2000
+    assert len(client.paper_references(record)) == 2500
+    small = client.fetch_papers(["SMALL"])["SMALL"]
+    requests = stub.requests
+    assert [ref["title"] for ref in client.paper_references(small)] == ["Ext 1", "Ext 2"]
+    assert stub.requests == requests
+
+
+def test_concurrent_lookups_share_a_batch(stub):
+    batcher = PaperBatcher(_client(stub), window=0.2)
+    results = {}
+
+    def lookup(i):
+        results[i] = batcher.get("SMALL" if i % 2 else "NOPE")
+
+    threads = [threading.Thread(target=lookup, args=(i,)) for i in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert stub.requests == 1
+    assert [results[i] and results[i]["paperId"] for i in range(4)] == [None, "SMALL", None, "SMALL"]
+
+
+def test_offline_without_a_cache_makes_no_requests(stub):
+    client = _client(stub, offline=True)
+    assert client.search_by_title("Small") is None
+    assert client.fetch_references("BIG") == []
+    assert client.fetch_papers(["SMALL", "DOI:10.1/big"]) == {"SMALL": None, "DOI:10.1/big": None}
+    assert PaperBatcher(client, window=0).get("SMALL") is None
+    assert stub.requests == 0